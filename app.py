@@ -5,14 +5,18 @@ A web application for managing and reading PDF books converted to markdown.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pathlib import Path
 import uvicorn
 import logging
 
 from backend.api import router as api_router, extract_service
+from backend.render_service import render_service
+from backend.llm_clients import llm_clients
+from backend.metrics import metrics, MetricsMiddleware
+from backend.profiling import request_profiler, TimingMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,8 @@ async def lifespan(app: FastAPI):
     # Shutdown: clean up any in-progress tasks
     logger.info("[App] Shutting down, cleaning up extraction tasks...")
     extract_service.cleanup_on_shutdown()
+    render_service.shutdown()
+    await llm_clients.aclose()
     logger.info("[App] Cleanup complete")
 
 
@@ -42,9 +48,33 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-route latency / in-flight metrics
+app.add_middleware(MetricsMiddleware)
+
+# Server-Timing header and admin-triggered request profiles
+app.add_middleware(TimingMiddleware)
+
 # Include API routes
 app.include_router(api_router)
 
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Operational metrics in the Prometheus text format."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, profile: str = None, x_profile: str = Header(None)):
+    """Download a request profile (collapsed stacks, for speedscope / flamegraph.pl)."""
+    if not request_profiler.authorized(x_profile or profile):
+        raise HTTPException(status_code=403, detail="Profiling not enabled or invalid token")
+    content = request_profiler.get(profile_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content, media_type="text/plain; charset=utf-8")
+
+
 # Serve frontend static files
 FRONTEND_DIR = Path(__file__).parent / "frontend" / "dist"
 
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+整章有声书生成：分段并发合成 + 无缝拼接
+
+流程:
+1. 把章节 Markdown 转成纯文本（去掉图片、链接地址、代码块、表格符号等）
+2. 按句子边界切分为若干段（每段不超过 --max-chars 个字符）
+3. 以有限并发调用 edge-tts 合成每一段
+4. 按帧直接拼接所有分段为一个章节 MP3（无需解码，无缝）
+
+分段文件和清单保存在 <输出文件>.segments/ 目录中：
+- 清单记录每段文本的哈希和对应文件
+- 重新运行时只合成缺失或文本已改变的分段，失败的分段下次自动补齐
+
+使用方法:
+    python audiobook.py chapter.md
+    python audiobook.py chapter.md -o chapter.mp3 -v en-US-GuyNeural -j 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Callable, List, Optional
+
+from mp3_concat import concat_mp3_files
+from text_to_speech import DEFAULT_RETRIES, synthesize_with_retry
+
+# 每段最大字符数（中文约 1 分钟语音）
+DEFAULT_MAX_CHARS = 600
+
+# 默认并发合成数
+DEFAULT_CONCURRENCY = 4
+
+# 小于等于该大小的分段文件视为无效
+MIN_SEGMENT_SIZE = 1024
+
+SEGMENT_MANIFEST = "manifest.json"
+
+# 句子：到句末标点（含其后的引号/括号）为止；英文句点后需跟空白
+_SENTENCE_RE = re.compile(r'.*?(?:[。！？!?；;…]+[”’"」』）)]*|\.[”’"」』）)]*(?=\s)|$)', re.S)
+
+# 超长句子再按逗号等次级停顿切分
+_CLAUSE_RE = re.compile(r'.*?(?:[，,、：:]+|$)', re.S)
+
+
+def markdown_to_text(md_content: str) -> str:
+    """
+    把 Markdown 转成适合朗读的纯文本
+    """
+    text = re.sub(r'```.*?```', '', md_content, flags=re.S)        # 代码块
+    text = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', text)                # 图片
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)            # 链接只保留文字
+    text = re.sub(r'<[^>]+>', '', text)                             # HTML 标签
+    text = re.sub(r'`([^`]*)`', r'\1', text)                        # 行内代码
+
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if re.fullmatch(r'[-*_=|:\s]{3,}', line):                   # 分隔线 / 表格分隔行
+            continue
+        line = re.sub(r'^#{1,6}\s*', '', line)                      # 标题
+        line = re.sub(r'^>\s*', '', line)                           # 引用
+        line = re.sub(r'^([-*+]|\d+[.)])\s+', '', line)             # 列表标记
+        line = line.replace('|', ' ')                               # 表格
+        line = re.sub(r'(\*\*|__|\*|_)(\S.*?\S|\S)\1', r'\2', line)  # 粗体/斜体
+        if line:
+            lines.append(line)
+
+    return '\n'.join(lines)
+
+
+def split_sentences(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[str]:
+    """
+    按句子边界切分文本；每行（段落）单独切分，超长句子再按逗号切分
+    """
+    sentences = []
+    for paragraph in text.split('\n'):
+        for sentence in _SENTENCE_RE.findall(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if len(sentence) <= max_chars:
+                sentences.append(sentence)
+                continue
+            # 超长句子：按逗号切分，仍超长则硬切
+            for clause in _CLAUSE_RE.findall(sentence):
+                clause = clause.strip()
+                while len(clause) > max_chars:
+                    sentences.append(clause[:max_chars])
+                    clause = clause[max_chars:]
+                if clause:
+                    sentences.append(clause)
+    return sentences
+
+
+def build_segments(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[str]:
+    """
+    把连续的句子合并成不超过 max_chars 的分段（分段只在句子边界处断开）
+    """
+    segments = []
+    current = ''
+    for sentence in split_sentences(text, max_chars):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _segment_hash(text: str, voice: str) -> str:
+    return hashlib.sha256(f"{voice}\n{text}".encode('utf-8')).hexdigest()
+
+
+def _read_segment_manifest(segments_dir: str) -> dict:
+    try:
+        with open(os.path.join(segments_dir, SEGMENT_MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_segment_manifest(segments_dir: str, manifest: dict):
+    path = os.path.join(segments_dir, SEGMENT_MANIFEST)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def generate_audiobook(
+    text: str,
+    output_file: str,
+    voice: str,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    分段并发合成整段文本，并拼接为一个 MP3
+
+    参数:
+        text: 纯文本（用 markdown_to_text 预处理 Markdown）
+        output_file: 输出 MP3 路径；分段保存在 <output_file>.segments/
+        voice: 语音名称
+        max_chars: 每段最大字符数
+        concurrency: 同时合成的分段数
+        retries: 每段失败后的最大重试次数
+        on_progress: 进度回调 (已完成分段数, 总分段数)
+
+    返回:
+        {"segments": 总分段数, "synthesized": 本次合成数, "duration": 时长（秒）}
+
+    有分段合成失败时抛出 RuntimeError；已成功的分段会保留，下次只补齐缺失部分。
+    """
+    segments = build_segments(text, max_chars)
+    if not segments:
+        raise ValueError("没有可朗读的文本")
+
+    segments_dir = f"{output_file}.segments"
+    os.makedirs(segments_dir, exist_ok=True)
+
+    manifest = {
+        "voice": voice,
+        "max_chars": max_chars,
+        "segments": [],
+    }
+    previous = {s["hash"]: s for s in _read_segment_manifest(segments_dir).get("segments", [])}
+
+    # 相同文本的分段只合成一次：hash -> (分段条目列表, 文本, 文件路径)
+    pending = {}
+    for index, segment in enumerate(segments):
+        seg_hash = _segment_hash(segment, voice)
+        entry = {
+            "index": index,
+            "hash": seg_hash,
+            "chars": len(segment),
+            "file": f"{seg_hash[:16]}.mp3",
+        }
+        path = os.path.join(segments_dir, entry["file"])
+        if seg_hash in previous and os.path.exists(path) and os.path.getsize(path) > MIN_SEGMENT_SIZE:
+            entry["size"] = os.path.getsize(path)
+        elif seg_hash in pending:
+            pending[seg_hash][0].append(entry)
+        else:
+            pending[seg_hash] = ([entry], segment, path)
+        manifest["segments"].append(entry)
+
+    # 删除不再使用的分段文件（文本已改变）
+    keep = {entry["file"] for entry in manifest["segments"]} | {SEGMENT_MANIFEST}
+    for name in os.listdir(segments_dir):
+        if name not in keep:
+            os.remove(os.path.join(segments_dir, name))
+
+    total = len(segments)
+    done = total - sum(len(entries) for entries, _, _ in pending.values())
+    _write_segment_manifest(segments_dir, manifest)
+    if on_progress:
+        on_progress(done, total)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failures = []
+
+    async def synthesize(entries: List[dict], segment: str, path: str):
+        nonlocal done
+        index = entries[0]["index"]
+        async with semaphore:
+            try:
+                await synthesize_with_retry(segment, path, voice, retries,
+                                            label=f"[分段 {index + 1}/{total}]")
+            except Exception as e:
+                failures.append((index, e))
+                return
+        for entry in entries:
+            entry["size"] = os.path.getsize(path)
+        done += len(entries)
+        _write_segment_manifest(segments_dir, manifest)
+        if on_progress:
+            on_progress(done, total)
+
+    await asyncio.gather(*(synthesize(*job) for job in pending.values()))
+
+    if failures:
+        index, error = min(failures, key=lambda f: f[0])
+        raise RuntimeError(f"{len(failures)} 个分段合成失败（共 {total} 段，第 {index + 1} 段: {error}），"
+                           f"重新运行将只补齐缺失分段")
+
+    result = concat_mp3_files(
+        [os.path.join(segments_dir, entry["file"]) for entry in manifest["segments"]],
+        output_file,
+    )
+    return {
+        "segments": total,
+        "synthesized": len(pending),
+        "duration": result["duration"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='整章有声书生成：分段并发合成，无缝拼接为一个 MP3',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('input', help='章节 Markdown 或文本文件')
+    parser.add_argument('-o', '--output', help='输出 MP3 文件（默认: 与输入同名的 .mp3）')
+    parser.add_argument('-v', '--voice', default='zh-CN-YunjianNeural',
+                        help='语音名称（默认: zh-CN-YunjianNeural）')
+    parser.add_argument('-j', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'同时合成的分段数（默认: {DEFAULT_CONCURRENCY}）')
+    parser.add_argument('--max-chars', type=int, default=DEFAULT_MAX_CHARS,
+                        help=f'每段最大字符数（默认: {DEFAULT_MAX_CHARS}）')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'每段失败后的重试次数（默认: {DEFAULT_RETRIES}）')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        text = markdown_to_text(f.read())
+    output = args.output or os.path.splitext(args.input)[0] + '.mp3'
+
+    print(f"输入文件: {args.input}")
+    print(f"输出文件: {output}")
+    print(f"语音: {args.voice}，并发数: {args.concurrency}")
+    print("=" * 60)
+
+    def report(done: int, total: int):
+        print(f"  进度: {done}/{total} 段")
+
+    try:
+        result = asyncio.run(generate_audiobook(
+            text, output, args.voice,
+            max_chars=args.max_chars,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            on_progress=report,
+        ))
+    except (RuntimeError, ValueError) as e:
+        print(f"\n✗ 生成失败: {e}")
+        raise SystemExit(1)
+
+    print("=" * 60)
+    print("✓ 有声书生成完成！")
+    print(f"  分段数: {result['segments']}（本次合成 {result['synthesized']} 段）")
+    print(f"  时长: {result['duration'] / 60:.1f} 分钟")
+    print(f"  文件大小: {os.path.getsize(output) / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
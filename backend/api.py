@@ -13,6 +13,13 @@ from .models import Book, Chapter, BookDetail, ExtractProgress, ExtractResult
 from .services import BookService, ExtractService
 from .translation_service import translation_service, LANG_ZH, LANG_EN
 from .summary_service import summary_service
+from .render_service import render_service
+from .audiobook_service import audiobook_service
+from .podcast_service import podcast_service
+from .llm_usage import llm_usage
+from .metrics import metrics
+from .profiling import TimedRoute
+from .async_utils import iter_queue_until
 
 # Get resources directory
 RESOURCES_DIR = Path(__file__).parent.parent / "resources"
@@ -20,9 +27,10 @@ RESOURCES_DIR = Path(__file__).parent.parent / "resources"
 # Initialize services
 book_service = BookService(RESOURCES_DIR)
 extract_service = ExtractService(RESOURCES_DIR)
+metrics.register_cache("book_domain", lambda: book_service.domain_cache_stats)
 
 # Create router
-router = APIRouter(prefix="/api", tags=["books"])
+router = APIRouter(prefix="/api", tags=["books"], route_class=TimedRoute)
 
 
 @router.get("/books", response_model=List[Book])
@@ -40,6 +48,25 @@ async def get_book(book_id: str):
     return book
 
 
+@router.get("/books/{book_id}/bootstrap")
+async def get_book_bootstrap(book_id: str, lang: str = None, include_content: bool = False):
+    """
+    Get everything needed to open a book in one response.
+    
+    Returns the book, its language info, chapters and summary status for
+    `lang` (source language by default), and optionally the first chapter body.
+    """
+    data = book_service.get_bootstrap(book_id, lang, include_content)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    
+    chapter_dir = data.pop("chapter_dir")
+    data["summary_status"] = (
+        _build_summaries_status(data["chapters"], chapter_dir) if chapter_dir else None
+    )
+    return data
+
+
 @router.get("/books/{book_id}/chapters", response_model=List[Chapter])
 async def get_chapters(book_id: str):
     """Get all chapters of a book."""
@@ -234,6 +261,38 @@ async def get_available_models():
     }
 
 
+@router.get("/usage")
+async def get_llm_usage():
+    """LLM token, latency and cost totals per model and per book (finished jobs)."""
+    return llm_usage.get_summary()
+
+
+@router.get("/usage/jobs")
+async def get_llm_usage_jobs(book_id: str = None, limit: int = 50):
+    """Running and recent LLM jobs (translations, summaries) with their totals."""
+    return {"jobs": llm_usage.get_jobs(book_id, limit)}
+
+
+@router.get("/usage/jobs/{job_id}")
+async def get_llm_usage_job(job_id: str):
+    """One job with every LLM call it made."""
+    job = llm_usage.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/books/{book_id}/usage")
+async def get_book_llm_usage(book_id: str, limit: int = 20):
+    """LLM usage totals and recent jobs of a book."""
+    if not book_service.get_book(book_id):
+        raise HTTPException(status_code=404, detail="Book not found")
+    return {
+        "totals": llm_usage.get_book_usage(book_id),
+        "jobs": llm_usage.get_jobs(book_id, limit),
+    }
+
+
 @router.get("/books/{book_id}/languages")
 async def get_book_languages(book_id: str):
     """
@@ -347,6 +406,25 @@ async def get_translated_chapter_content(book_id: str, lang: str, chapter_filena
     return {"content": content}
 
 
+@router.get("/books/{book_id}/chapters/{lang}/{chapter_filename}/html")
+async def get_chapter_html(book_id: str, lang: str, chapter_filename: str):
+    """
+    Get server-rendered HTML of a chapter.
+    Image URLs are already resolved to the book image endpoint.
+    """
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language not found")
+    
+    try:
+        html = await render_service.render_chapter(chapter_dir, chapter_filename, book_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if html is None:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    return {"html": html}
+
+
 # ============ Summary Endpoints ============
 
 @router.get("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary")
@@ -361,17 +439,8 @@ async def get_chapter_summary(book_id: str, lang: str, chapter_filename: str):
     return {"summary": summary, "has_mp3": has_mp3}
 
 
-@router.post("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary")
-async def generate_chapter_summary(
-    book_id: str, 
-    lang: str, 
-    chapter_filename: str,
-    model: str = None
-):
-    """Generate a new summary for a chapter using LLM."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
+def _summary_context(book_id: str, lang: str, chapter_filename: str):
+    """Get (content, chapter_dir, chapter_title, domain) for summarizing a chapter."""
     # Get chapter content
     content = book_service.get_chapter_content_for_lang(book_id, lang, chapter_filename)
     if content is None:
@@ -390,31 +459,45 @@ async def generate_chapter_summary(
             chapter_title = line[2:].strip()
             break
     
-    # Detect domain (simple heuristic from book name)
-    book = book_service.get_book(book_id)
-    domain = "general knowledge"
-    if book:
-        # Use book title as hint for domain
-        title_lower = book.title.lower()
-        if any(kw in title_lower for kw in ["data", "software", "system", "computer", "programming"]):
-            domain = "software engineering"
-        elif any(kw in title_lower for kw in ["business", "management", "marketing"]):
-            domain = "business and management"
-        elif any(kw in title_lower for kw in ["science", "physics", "chemistry", "biology"]):
-            domain = "natural sciences"
+    # Per-book domain (cached in .metadata.json)
+    domain = book_service.get_domain(book_id)
+    return content, chapter_dir, chapter_title, domain
+
+
+@router.post("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary")
+async def generate_chapter_summary(
+    book_id: str, 
+    lang: str, 
+    chapter_filename: str,
+    model: str = None,
+    force: bool = False
+):
+    """
+    Generate a new summary for a chapter using LLM.
+    
+    Identical requests (same content, model, language and domain) are served
+    from the response cache unless force=true.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    content, chapter_dir, chapter_title, domain = _summary_context(book_id, lang, chapter_filename)
     
     try:
         # Delete existing MP3 when regenerating summary
         summary_service.delete_mp3(chapter_dir, chapter_filename)
         
-        # Generate summary
-        summary_data = summary_service.generate_summary(
-            chapter_content=content,
-            chapter_title=chapter_title,
-            domain=domain,
-            target_lang=lang,
-            model=model
-        )
+        # Generate summary (in a thread: the LLM call may wait on the rate limiter)
+        with llm_usage.job("summary", book_id, lang=lang, chapter=chapter_filename):
+            summary_data = await asyncio.to_thread(
+                summary_service.generate_summary,
+                chapter_content=content,
+                chapter_title=chapter_title,
+                domain=domain,
+                target_lang=lang,
+                model=model,
+                force=force
+            )
         
         # Save to file
         summary_service.save_summary(chapter_dir, chapter_filename, summary_data)
@@ -426,6 +509,66 @@ async def generate_chapter_summary(
         raise HTTPException(status_code=500, detail=f"Summary generation failed: {str(e)}")
 
 
+@router.post("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary/stream")
+async def stream_chapter_summary(
+    book_id: str,
+    lang: str,
+    chapter_filename: str,
+    model: str = None,
+    force: bool = False
+):
+    """
+    Generate a new summary, pushing each field as soon as it is complete (SSE).
+    
+    Events: {"type": "field", "field", "index", "value"} for every finished
+    array item (index) or whole field (index null), {"type": "reset"} when a
+    retried LLM call restarts the fields, {"type": "section", "current",
+    "total"} while a long chapter's parts are summarized, then
+    {"type": "complete", "summary", "has_mp3"} or {"type": "error", "message"}.
+    The summary is still generated and saved if the client disconnects.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    content, chapter_dir, chapter_title, domain = _summary_context(book_id, lang, chapter_filename)
+    
+    # Delete existing MP3 when regenerating summary
+    summary_service.delete_mp3(chapter_dir, chapter_filename)
+    
+    events: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    
+    async def run():
+        # The LLM call streams in a worker thread; events hop back to the loop
+        with llm_usage.job("summary", book_id, lang=lang, chapter=chapter_filename):
+            summary_data = await asyncio.to_thread(
+                summary_service.generate_summary,
+                chapter_content=content,
+                chapter_title=chapter_title,
+                domain=domain,
+                target_lang=lang,
+                model=model,
+                force=force,
+                on_event=lambda event: loop.call_soon_threadsafe(events.put_nowait, event),
+            )
+        summary_service.save_summary(chapter_dir, chapter_filename, summary_data)
+        return summary_data
+    
+    task = asyncio.create_task(run())
+    
+    async def generate():
+        try:
+            async for event in iter_queue_until(task, events):
+                yield f"data: {json.dumps(event)}\n\n"
+            summary_data = task.result()
+            yield f"data: {json.dumps({'type': 'complete', 'summary': summary_data, 'has_mp3': False})}\n\n"
+        except Exception as e:
+            logger.error(f"[API] Summary generation failed: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
 @router.put("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary")
 async def update_chapter_summary(
     book_id: str,
@@ -452,7 +595,13 @@ async def update_chapter_summary(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to save summary")
     
-    return {"success": True, "summary": summary_data}
+    # Edited script: drop the stale MP3. Regenerating only synthesizes the
+    # changed sentences, the rest come from the sentence cache.
+    if existing and existing.get("voice_script") != summary_data.get("voice_script"):
+        summary_service.delete_mp3(chapter_dir, chapter_filename)
+    
+    has_mp3 = summary_service.get_mp3_path(chapter_dir, chapter_filename) is not None
+    return {"success": True, "summary": summary_data, "has_mp3": has_mp3}
 
 
 @router.post("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary/mp3")
@@ -506,6 +655,79 @@ async def get_summary_mp3(book_id: str, lang: str, chapter_filename: str):
     )
 
 
+@router.get("/books/{book_id}/chapters/{lang}/{chapter_filename}/summary/mp3/stream")
+async def stream_summary_mp3(book_id: str, lang: str, chapter_filename: str):
+    """
+    Stream MP3 audio while it is being synthesized.
+    
+    Serves the cached file when it exists; otherwise starts (or joins) the
+    chapter's synthesis and forwards audio chunks as edge-tts produces them.
+    """
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language directory not found")
+    
+    synthesis = summary_service.get_mp3_synthesis(chapter_dir, chapter_filename)
+    if synthesis is None:
+        mp3_path = summary_service.get_mp3_path(chapter_dir, chapter_filename)
+        if mp3_path:
+            return FileResponse(path=str(mp3_path), media_type="audio/mpeg", filename=mp3_path.name)
+        
+        summary = summary_service.get_summary(chapter_dir, chapter_filename)
+        if not summary or not summary.get("voice_script"):
+            raise HTTPException(status_code=400, detail="No voice script found. Generate summary first.")
+        
+        synthesis = summary_service.start_mp3_synthesis(
+            chapter_dir=chapter_dir,
+            chapter_filename=chapter_filename,
+            voice_script=summary["voice_script"],
+            lang=lang
+        )
+    
+    return StreamingResponse(
+        synthesis.iter_audio(),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+@router.post("/books/{book_id}/chapters/{lang}/{chapter_filename}/audiobook")
+async def generate_chapter_audiobook(book_id: str, lang: str, chapter_filename: str):
+    """Voice the full chapter text as one MP3, with segment progress (SSE)."""
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language directory not found")
+    if not (chapter_dir / chapter_filename).exists():
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    
+    async def generate():
+        try:
+            async for event in audiobook_service.generate(chapter_dir, chapter_filename, lang):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"[API] Audiobook generation failed for {chapter_filename}: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+@router.get("/books/{book_id}/chapters/{lang}/{chapter_filename}/audiobook")
+async def get_chapter_audiobook(book_id: str, lang: str, chapter_filename: str):
+    """Get the full-chapter audiobook MP3."""
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language directory not found")
+    
+    mp3_path = audiobook_service.get_audiobook_path(chapter_dir, chapter_filename)
+    if not mp3_path:
+        raise HTTPException(status_code=404, detail="Audiobook not found. Generate it first.")
+    
+    return FileResponse(path=str(mp3_path), media_type="audio/mpeg", filename=mp3_path.name)
+
+
 @router.get("/books/{book_id}/summaries/{lang}/status")
 async def get_all_summaries_status(book_id: str, lang: str):
     """Get summary and MP3 status for all chapters."""
@@ -515,13 +737,22 @@ async def get_all_summaries_status(book_id: str, lang: str):
     if not chapter_dir:
         raise HTTPException(status_code=404, detail="Book or language not found")
     
+    return _build_summaries_status(chapters, chapter_dir)
+
+
+def _build_summaries_status(chapters: List[Chapter], chapter_dir: Path) -> dict:
+    """Build summary/MP3 status for the given chapters from the manifest."""
+    # Single manifest read instead of parsing every summary / stat-ing every MP3
+    manifest = summary_service.get_manifest(chapter_dir)
+    
     result = []
     with_summary = 0
     with_mp3 = 0
     
     for ch in chapters:
-        has_summary = summary_service.get_summary(chapter_dir, ch.filename) is not None
-        has_mp3 = summary_service.get_mp3_path(chapter_dir, ch.filename) is not None
+        entry = manifest.get(ch.filename, {})
+        has_summary = entry.get("has_summary", False)
+        has_mp3 = "mp3_size" in entry
         
         if has_summary:
             with_summary += 1
@@ -555,72 +786,131 @@ async def generate_all_summaries(book_id: str, lang: str, model: str = None):
     if not chapter_dir:
         raise HTTPException(status_code=404, detail="Book or language not found")
     
-    # Get book for domain detection
-    book = book_service.get_book(book_id)
-    domain = "general knowledge"
-    if book:
-        title_lower = book.title.lower()
-        if any(kw in title_lower for kw in ["data", "software", "system", "computer", "programming"]):
-            domain = "software engineering"
-        elif any(kw in title_lower for kw in ["business", "management", "marketing"]):
-            domain = "business and management"
+    # Per-book domain (cached in .metadata.json)
+    domain = book_service.get_domain(book_id)
     
     async def generate():
         total = len(chapters)
         generated_summaries = 0
         generated_mp3s = 0
+        # All summaries of the batch are accounted as one usage job
+        usage_job = llm_usage.start_job("summary_batch", book_id, lang=lang)
+        status = "cancelled"
         
-        for idx, ch in enumerate(chapters):
-            current = idx + 1
-            
-            # Check if summary exists
-            existing_summary = summary_service.get_summary(chapter_dir, ch.filename)
-            
-            if not existing_summary:
-                # Generate summary
-                yield f"data: {json.dumps({'type': 'progress', 'current': current, 'total': total, 'chapter': ch.filename, 'step': 'summary'})}\n\n"
+        try:
+            for idx, ch in enumerate(chapters):
+                current = idx + 1
                 
-                try:
-                    content = book_service.get_chapter_content_for_lang(book_id, lang, ch.filename)
-                    if content:
-                        chapter_title = ch.name
-                        summary_data = summary_service.generate_summary(
-                            chapter_content=content,
-                            chapter_title=chapter_title,
-                            domain=domain,
-                            target_lang=lang,
-                            model=model
-                        )
-                        summary_service.save_summary(chapter_dir, ch.filename, summary_data)
-                        generated_summaries += 1
-                        existing_summary = summary_data
-                except Exception as e:
-                    logger.error(f"[Batch] Failed to generate summary for {ch.filename}: {e}")
-                    yield f"data: {json.dumps({'type': 'error', 'chapter': ch.filename, 'step': 'summary', 'message': str(e)})}\n\n"
-                    continue
-            
-            # Check if MP3 exists
-            if not summary_service.get_mp3_path(chapter_dir, ch.filename):
-                # Generate MP3
-                yield f"data: {json.dumps({'type': 'progress', 'current': current, 'total': total, 'chapter': ch.filename, 'step': 'mp3'})}\n\n"
+                # Check if summary exists
+                existing_summary = summary_service.get_summary(chapter_dir, ch.filename)
                 
-                voice_script = existing_summary.get("voice_script") if existing_summary else None
-                if voice_script:
+                if not existing_summary:
+                    # Generate summary
+                    yield f"data: {json.dumps({'type': 'progress', 'current': current, 'total': total, 'chapter': ch.filename, 'step': 'summary'})}\n\n"
+                    
                     try:
-                        await summary_service.generate_mp3(
-                            chapter_dir=chapter_dir,
-                            chapter_filename=ch.filename,
-                            voice_script=voice_script,
-                            lang=lang
-                        )
-                        generated_mp3s += 1
+                        content = book_service.get_chapter_content_for_lang(book_id, lang, ch.filename)
+                        if content:
+                            chapter_title = ch.name
+                            summary_data = await asyncio.to_thread(
+                                llm_usage.run_in,
+                                usage_job,
+                                summary_service.generate_summary,
+                                chapter_content=content,
+                                chapter_title=chapter_title,
+                                domain=domain,
+                                target_lang=lang,
+                                model=model
+                            )
+                            summary_service.save_summary(chapter_dir, ch.filename, summary_data)
+                            generated_summaries += 1
+                            existing_summary = summary_data
                     except Exception as e:
-                        logger.error(f"[Batch] Failed to generate MP3 for {ch.filename}: {e}")
-                        yield f"data: {json.dumps({'type': 'error', 'chapter': ch.filename, 'step': 'mp3', 'message': str(e)})}\n\n"
+                        logger.error(f"[Batch] Failed to generate summary for {ch.filename}: {e}")
+                        yield f"data: {json.dumps({'type': 'error', 'chapter': ch.filename, 'step': 'summary', 'message': str(e)})}\n\n"
+                        continue
+                
+                # Check if MP3 exists
+                if not summary_service.get_mp3_path(chapter_dir, ch.filename):
+                    # Generate MP3
+                    yield f"data: {json.dumps({'type': 'progress', 'current': current, 'total': total, 'chapter': ch.filename, 'step': 'mp3'})}\n\n"
+                    
+                    voice_script = existing_summary.get("voice_script") if existing_summary else None
+                    if voice_script:
+                        try:
+                            await summary_service.generate_mp3(
+                                chapter_dir=chapter_dir,
+                                chapter_filename=ch.filename,
+                                voice_script=voice_script,
+                                lang=lang
+                            )
+                            generated_mp3s += 1
+                        except Exception as e:
+                            logger.error(f"[Batch] Failed to generate MP3 for {ch.filename}: {e}")
+                            yield f"data: {json.dumps({'type': 'error', 'chapter': ch.filename, 'step': 'mp3', 'message': str(e)})}\n\n"
+                
+                # Small delay to allow UI updates
+                await asyncio.sleep(0.1)
             
-            # Small delay to allow UI updates
-            await asyncio.sleep(0.1)
+            status = "completed"
+        finally:
+            llm_usage.finish_job(usage_job, status)
         
         yield f"data: {json.dumps({'type': 'complete', 'generated_summaries': generated_summaries, 'generated_mp3s': generated_mp3s})}\n\n"
     
     return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+@router.post("/books/{book_id}/podcast/{lang}")
+async def generate_podcast(
+    book_id: str,
+    lang: str,
+    video: bool = True,
+    generate_missing: bool = True,
+    personalize_intro: bool = False
+):
+    """
+    Assemble intro + chapter summary MP3s + outro into one audio and video (SSE).
+    
+    Steps whose inputs are unchanged are served from cache, so adding a
+    chapter only re-runs the concat and video steps.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    book = book_service.get_book(book_id)
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not book or not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language directory not found")
+    chapters = book_service.get_chapters_for_lang(book_id, lang)
+    
+    async def generate():
+        try:
+            async for event in podcast_service.generate(
+                chapter_dir, chapters, book.title, lang,
+                video=video, generate_missing=generate_missing,
+                personalize_intro=personalize_intro
+            ):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"[API] Podcast generation failed for {book_id}: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+@router.get("/books/{book_id}/podcast/{lang}/{kind}")
+async def get_podcast(book_id: str, lang: str, kind: str):
+    """Get the whole-book podcast file (kind: audio or video)."""
+    if kind not in ("audio", "video"):
+        raise HTTPException(status_code=404, detail="Unknown podcast file")
+    chapter_dir = book_service.get_chapter_dir(book_id, lang)
+    if not chapter_dir:
+        raise HTTPException(status_code=404, detail="Book or language directory not found")
+    
+    path = podcast_service.get_output_path(chapter_dir, kind)
+    if not path:
+        raise HTTPException(status_code=404, detail="Podcast not found. Generate it first.")
+    
+    media_type = "audio/mpeg" if kind == "audio" else "video/mp4"
+    return FileResponse(path=str(path), media_type=media_type, filename=f"{book_id}_{lang}{path.suffix}")
@@ -0,0 +1,33 @@
+"""
+Async helpers shared by the streaming (SSE) endpoints.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator
+
+
+async def iter_queue_until(task: asyncio.Task, queue: asyncio.Queue) -> AsyncIterator[Any]:
+    """
+    Yield items from `queue` until `task` is done and the queue is drained.
+
+    Used to forward progress events from a background task to a streaming
+    response. The task itself is neither awaited nor cancelled: callers read
+    `task.result()` afterwards, and a task that must outlive a disconnected
+    client keeps running.
+    """
+    getter = None
+    try:
+        while not task.done() or not queue.empty():
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                item = getter.result()
+                getter = None
+                yield item
+            else:
+                getter.cancel()
+                getter = None
+    finally:
+        # Generator closed or cancelled while waiting
+        if getter is not None:
+            getter.cancel()
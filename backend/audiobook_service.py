@@ -0,0 +1,104 @@
+"""
+Audiobook Service - Voice a full chapter as one MP3.
+
+Splits the chapter's plain text into sentence-bounded segments, synthesizes
+them concurrently with edge-tts and stitches them frame-by-frame (see
+audiobook.py). Segments are kept with a manifest so a failed run only
+retries the missing pieces.
+"""
+
+import sys
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncIterator
+
+from .summary_service import TTS_VOICES, DEFAULT_TTS_VOICE
+from .async_utils import iter_queue_until
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from audiobook import generate_audiobook, markdown_to_text  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Audiobook folder inside each chapter directory
+AUDIOBOOK_DIR = "audiobook"
+
+# Concurrent edge-tts requests per chapter
+AUDIOBOOK_CONCURRENCY = 6
+
+# Files at or below this size are treated as empty/partial
+MIN_AUDIOBOOK_SIZE = 1024
+
+
+class AudiobookService:
+    """Service for generating full-chapter audiobook MP3s."""
+
+    def __init__(self):
+        # One generation per chapter at a time (keyed by output path)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_audiobook_file(self, chapter_dir: Path, chapter_filename: str) -> Path:
+        """Get audiobook MP3 path: audiobook/<chapter stem>.mp3"""
+        return chapter_dir / AUDIOBOOK_DIR / f"{Path(chapter_filename).stem}.mp3"
+
+    def get_audiobook_path(self, chapter_dir: Path, chapter_filename: str) -> Optional[Path]:
+        """Get audiobook path if it exists and has valid content."""
+        mp3_file = self._get_audiobook_file(chapter_dir, chapter_filename)
+        if mp3_file.exists() and mp3_file.stat().st_size > MIN_AUDIOBOOK_SIZE:
+            return mp3_file
+        return None
+
+    async def generate(
+        self,
+        chapter_dir: Path,
+        chapter_filename: str,
+        lang: str = 'zh'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate the chapter audiobook, yielding progress events.
+
+        Events: {"type": "progress", "done", "total"}, then
+        {"type": "complete", "segments", "synthesized", "duration"}.
+        Generation keeps running if the caller stops iterating.
+        """
+        chapter_file = chapter_dir / chapter_filename
+        if not chapter_file.exists():
+            raise FileNotFoundError(f"Chapter not found: {chapter_filename}")
+
+        mp3_file = self._get_audiobook_file(chapter_dir, chapter_filename)
+        lock = self._locks.setdefault(str(mp3_file), asyncio.Lock())
+
+        text = markdown_to_text(chapter_file.read_text(encoding='utf-8'))
+        voice = TTS_VOICES.get(lang, DEFAULT_TTS_VOICE)
+        progress: asyncio.Queue = asyncio.Queue()
+
+        async def run():
+            # The lock is held by the task, not the caller, so a disconnected
+            # client can't let a second run race on the same segment files
+            async with lock:
+                mp3_file.parent.mkdir(parents=True, exist_ok=True)
+                logger.info(f"[Audiobook] Generating {chapter_filename} ({len(text)} chars, voice {voice})")
+                return await generate_audiobook(
+                    text,
+                    str(mp3_file),
+                    voice,
+                    concurrency=AUDIOBOOK_CONCURRENCY,
+                    on_progress=lambda done, total: progress.put_nowait((done, total)),
+                )
+
+        task = asyncio.create_task(run())
+
+        async for done, total in iter_queue_until(task, progress):
+            yield {"type": "progress", "done": done, "total": total}
+
+        result = task.result()
+        logger.info(
+            f"[Audiobook] Generated {mp3_file} ({result['segments']} segments, "
+            f"{result['synthesized']} synthesized, {result['duration']:.0f}s)"
+        )
+        yield {"type": "complete", **result}
+
+
+# Singleton instance
+audiobook_service = AudiobookService()
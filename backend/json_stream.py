@@ -0,0 +1,261 @@
+"""
+JSON Stream - Incremental parsing and local repair of LLM JSON output.
+
+`IncrementalJSONParser` consumes a streamed response chunk by chunk and reports
+each top-level field of the JSON object (and each item of a top-level array)
+as soon as it is complete, so clients can render key points while the voice
+script is still being written. `repair_json` salvages truncated or slightly
+malformed output instead of paying for another LLM call.
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# (field, array index or None for the whole field, value)
+FieldEvent = Tuple[str, Optional[int], Any]
+
+_TRAILING_KEY = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*$')
+_DANGLING_KEY = re.compile(r'"(?:[^"\\]|\\.)*"\s*:\s*$')
+
+
+def _loads(text: str) -> Tuple[bool, Any]:
+    try:
+        return True, json.loads(text)
+    except ValueError:
+        return False, None
+
+
+class IncrementalJSONParser:
+    """
+    Streaming scanner for one JSON object.
+
+    Text before the first "{" (e.g. a ```json fence) and after the object is
+    ignored. Only the structure is tracked while scanning; completed values
+    are decoded with json.loads.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        # Items completed so far of the array currently being streamed
+        self.partial_items: Dict[str, List[Any]] = {}
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._in_array = False
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Consume a chunk; return the fields and array items it completed."""
+        self.buffer += chunk
+        events: List[FieldEvent] = []
+        buf = self.buffer
+        while self._pos < len(buf) and not self.done:
+            i = self._pos
+            c = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                if c == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        ok, key = _loads(buf[self._key_start:i + 1])
+                        self._key = key if ok else None
+                    elif self._depth == 1:
+                        self._finish_value(i + 1, events)
+                    elif self._depth == 2 and self._in_array:
+                        self._finish_item(i + 1, events)
+                continue
+
+            if c.isspace():
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                    else:
+                        self._value_start = i
+                elif self._depth == 2 and self._in_array and self._item_start is None:
+                    self._item_start = i
+            elif c == ':':
+                if self._depth == 1:
+                    self._expect_key = False
+                    self._value_start = None
+            elif c in '{[':
+                if self._depth == 1:
+                    self._value_start = i
+                    if c == '[':
+                        self._in_array = True
+                        self._item_start = None
+                        self._item_index = 0
+                        self.partial_items[self._key] = []
+                elif self._depth == 2 and self._in_array and self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+            elif c in '}]':
+                if self._depth == 2 and self._in_array and self._item_start is not None:
+                    # Last primitive item of the array
+                    self._finish_item(i, events)
+                self._depth -= 1
+                if self._depth == 2 and self._in_array and self._item_start is not None:
+                    # Nested container item
+                    self._finish_item(i + 1, events)
+                elif self._depth == 1:
+                    self._finish_value(i + 1, events)
+                    self._in_array = False
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._finish_value(i, events)
+                    self.done = True
+            elif c == ',':
+                if self._depth == 1:
+                    if self._value_start is not None:
+                        self._finish_value(i, events)
+                    self._expect_key = True
+                elif self._depth == 2 and self._in_array and self._item_start is not None:
+                    self._finish_item(i, events)
+            elif self._depth == 1 and not self._expect_key and self._value_start is None:
+                # Start of a number or literal
+                self._value_start = i
+            elif self._depth == 2 and self._in_array and self._item_start is None:
+                self._item_start = i
+        return events
+
+    def _finish_value(self, end: int, events: List[FieldEvent]):
+        start, self._value_start = self._value_start, None
+        if start is None or self._key is None:
+            return
+        ok, value = _loads(self.buffer[start:end])
+        if ok:
+            self.fields[self._key] = value
+            self.partial_items.pop(self._key, None)
+            events.append((self._key, None, value))
+
+    def _finish_item(self, end: int, events: List[FieldEvent]):
+        start, self._item_start = self._item_start, None
+        if start is None or self._key is None:
+            return
+        ok, value = _loads(self.buffer[start:end])
+        if ok:
+            self.partial_items.setdefault(self._key, []).append(value)
+            events.append((self._key, self._item_index, value))
+            self._item_index += 1
+
+    def salvage(self) -> Dict[str, Any]:
+        """Completed fields plus the completed items of an unfinished array."""
+        result = {key: list(items) for key, items in self.partial_items.items() if items}
+        result.update(self.fields)
+        return result
+
+
+def _close_structure(text: str) -> str:
+    """
+    Make truncated or sloppy JSON parseable: escape raw control characters
+    inside strings, drop trailing commas and dangling keys, close an open
+    string and every open bracket.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    for c in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+            elif c == '\n':
+                out.append('\\n')
+                continue
+            elif c == '\t':
+                out.append('\\t')
+                continue
+            elif c < ' ':
+                continue
+            out.append(c)
+            continue
+        if c == '"':
+            in_string = True
+        elif c in '{[':
+            stack.append('}' if c == '{' else ']')
+        elif c in '}]':
+            if not stack:
+                break
+            # Drop a trailing comma before the closing bracket
+            while out and (out[-1].isspace() or out[-1] == ','):
+                out.pop()
+            c = stack.pop()
+            out.append(c)
+            if not stack:
+                break
+            continue
+        out.append(c)
+
+    result = ''.join(out)
+    if in_string:
+        if escape:
+            result = result[:-1]
+        result += '"'
+    # Remove what cannot be completed at the cut: a trailing comma, a key
+    # without a value, or a key without its colon
+    while True:
+        stripped = result.rstrip().rstrip(',')
+        stripped = _DANGLING_KEY.sub('', stripped).rstrip().rstrip(',')
+        if stack and stack[-1] == '}':
+            match = _TRAILING_KEY.search(stripped)
+            if match:
+                stripped = stripped[:match.start() + 1]
+        if stripped == result:
+            break
+        result = stripped
+    return result + ''.join(reversed(stack))
+
+
+def repair_json(text: str, parser: Optional[IncrementalJSONParser] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parse an LLM's JSON object, repairing it locally if needed.
+
+    Tries, in order: the text as is, the first complete object in it (ignoring
+    code fences and trailing prose), a structurally repaired copy, and finally
+    the fields an IncrementalJSONParser managed to complete. Returns None if
+    nothing usable is found.
+    """
+    start = text.find('{')
+    if start != -1:
+        try:
+            data, _ = json.JSONDecoder().raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        ok, data = _loads(_close_structure(text[start:]))
+        if ok and isinstance(data, dict) and data:
+            return data
+
+    if parser is None:
+        parser = IncrementalJSONParser()
+        parser.feed(text)
+    return parser.salvage() or None
@@ -0,0 +1,109 @@
+"""
+LLM Clients - Process-wide registry of pooled ChatOpenAI clients.
+
+Every client shares one tuned httpx connection pool (keep-alive, HTTP/2 when
+the optional `h2` package is installed), so TLS handshakes and client
+construction are paid once per process instead of once per chapter.
+"""
+
+import os
+import logging
+import threading
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by all LLM clients
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = 120.0
+
+# Streams can pause for a long time between tokens; connecting should not
+LLM_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+# HTTP/2 multiplexes concurrent requests over one connection (needs httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class LLMClientRegistry:
+    """Caches one ChatOpenAI per (endpoint, model, temperature, streaming)."""
+
+    def __init__(self):
+        self._clients: Dict[Tuple, ChatOpenAI] = {}
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+    def _pool_options(self) -> dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "timeout": LLM_TIMEOUT,
+            "limits": httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        }
+
+    def get(
+        self,
+        model: str,
+        temperature: float,
+        streaming: bool = False,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> ChatOpenAI:
+        """Get (or create) the shared client for these settings."""
+        base_url = base_url or os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+        api_key = api_key if api_key is not None else os.getenv("LLM_API_KEY", "")
+        key = (base_url, api_key, model, temperature, streaming)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(**self._pool_options())
+                    self._http_async_client = httpx.AsyncClient(**self._pool_options())
+                    logger.info(
+                        f"[LLM] Shared connection pool: {LLM_MAX_CONNECTIONS} connections, "
+                        f"HTTP/2 {'on' if HTTP2_AVAILABLE else 'off'}"
+                    )
+                client = ChatOpenAI(
+                    model=model,
+                    base_url=base_url,
+                    api_key=api_key,
+                    temperature=temperature,
+                    streaming=streaming,
+                    # 429s must reach the shared rate limiter instead of being
+                    # retried blindly inside each client
+                    max_retries=0,
+                    # Streams end with a usage chunk for the usage accounting
+                    stream_usage=True,
+                    http_client=self._http_client,
+                    http_async_client=self._http_async_client,
+                )
+                self._clients[key] = client
+                logger.info(f"[LLM] Created client: model={model}, temperature={temperature}, streaming={streaming}")
+            return client
+
+    async def aclose(self):
+        """Close the shared connection pool (called on app shutdown)."""
+        with self._lock:
+            self._clients.clear()
+            http_client, self._http_client = self._http_client, None
+            async_client, self._http_async_client = self._http_async_client, None
+        if http_client is not None:
+            http_client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+
+# Singleton instance
+llm_clients = LLMClientRegistry()
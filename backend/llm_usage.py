@@ -0,0 +1,400 @@
+"""
+LLM Usage - Per-call token, latency and cost accounting.
+
+Every call made through `llm_limiter.run()` is recorded with its model,
+prompt/completion tokens (as reported by the provider, estimated otherwise),
+time to first token, latency, time spent waiting on the rate limiter and
+rate-limit retries. Calls are grouped into jobs (a translation, a chapter
+summary, a batch of summaries); finished jobs are appended to
+resources/.llm_usage.jsonl and aggregated per book and per model.
+
+Cost uses LLM_PRICES, USD per million prompt/completion tokens per model,
+e.g. "gpt-4o-mini:0.15/0.6,qwen-plus:0.4/1.2" (unlisted models cost 0).
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .metrics import LLM_REQUEST_DURATION, LLM_TOKENS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+USAGE_FILE = Path(__file__).parent.parent / "resources" / ".llm_usage.jsonl"
+
+# Finished jobs kept in memory for the jobs API (all of them count in the totals)
+RECENT_JOBS = 200
+
+_current_job: contextvars.ContextVar[Optional["UsageJob"]] = contextvars.ContextVar("llm_usage_job", default=None)
+_current_call: contextvars.ContextVar[Optional["LLMCall"]] = contextvars.ContextVar("llm_usage_call", default=None)
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse LLM_PRICES ("model:input/output,...") into {model: (input, output)} per 1M tokens."""
+    prices = {}
+    for item in spec.split(","):
+        model, _, values = item.strip().rpartition(":")
+        prompt, _, completion = values.partition("/")
+        try:
+            prices[model] = (float(prompt), float(completion or 0))
+        except ValueError:
+            continue
+    prices.pop("", None)
+    return prices
+
+
+def empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "retries": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "estimated_calls": 0,
+        "cost": 0.0,
+        "latency_s": 0.0,
+        "wait_s": 0.0,
+        "ttft_s": 0.0,
+        "ttft_calls": 0,
+    }
+
+
+def add_totals(totals: Dict[str, Any], other: Dict[str, Any]):
+    """Add one totals dict into another."""
+    for key, value in other.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def describe_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Totals plus per-call averages, rounded for the API."""
+    calls = totals["calls"]
+    result = {k: round(v, 6) if isinstance(v, float) else v for k, v in totals.items()}
+    result["avg_latency_s"] = round(totals["latency_s"] / calls, 3) if calls else None
+    result["avg_ttft_s"] = round(totals["ttft_s"] / totals["ttft_calls"], 3) if totals["ttft_calls"] else None
+    return result
+
+
+class LLMCall:
+    """One logical LLM call (including its rate-limit retries)."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.retries = 0
+        self.usage: Optional[Dict[str, int]] = None
+
+    def begin_attempt(self, attempt: int):
+        self.retries = attempt
+        self.started = time.monotonic()
+        self.first_token = None
+        self.usage = None
+
+    def to_record(self, prices: Dict[str, Tuple[float, float]], used_tokens: Optional[int],
+                  error: Optional[str] = None) -> Dict[str, Any]:
+        now = time.monotonic()
+        started = self.started or now
+        if self.usage:
+            prompt = self.usage.get("input_tokens", 0)
+            completion = self.usage.get("output_tokens", 0)
+            total = self.usage.get("total_tokens", prompt + completion)
+            estimated = False
+        else:
+            # Provider reported no usage: only the limiter's estimate of the total is known
+            prompt = completion = 0
+            total = used_tokens or 0
+            estimated = True
+        input_price, output_price = prices.get(self.model, (0.0, 0.0))
+        cost = (total * input_price if estimated else prompt * input_price + completion * output_price) / 1e6
+        record = {
+            "model": self.model,
+            "at": datetime.now().isoformat(),
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": total,
+            "estimated": estimated,
+            "cost": round(cost, 6),
+            "ttft_s": round(self.first_token - started, 3) if self.first_token else None,
+            "latency_s": round(now - started, 3),
+            "wait_s": round(max(0.0, started - self.created), 3),
+            "retries": self.retries,
+        }
+        if error:
+            record["error"] = error
+        return record
+
+
+def call_totals(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Totals contributed by one call record."""
+    totals = empty_totals()
+    totals.update(
+        calls=1,
+        errors=1 if record.get("error") else 0,
+        retries=record["retries"],
+        prompt_tokens=record["prompt_tokens"],
+        completion_tokens=record["completion_tokens"],
+        total_tokens=record["total_tokens"],
+        estimated_calls=1 if record["estimated"] else 0,
+        cost=record["cost"],
+        latency_s=record["latency_s"],
+        wait_s=record["wait_s"],
+    )
+    if record["ttft_s"] is not None:
+        totals["ttft_s"] = record["ttft_s"]
+        totals["ttft_calls"] = 1
+    return totals
+
+
+class UsageJob:
+    """A unit of work whose LLM calls are accounted together."""
+
+    def __init__(self, kind: str, book_id: Optional[str] = None, **info):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.book_id = book_id
+        self.info = info
+        self.started_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.status = "running"
+        self.calls: List[Dict[str, Any]] = []
+        self.totals = empty_totals()
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self._started = time.monotonic()
+        self.duration_s: Optional[float] = None
+
+    def add(self, record: Dict[str, Any]):
+        """Add a call record (caller holds the tracker lock)."""
+        totals = call_totals(record)
+        self.calls.append(record)
+        add_totals(self.totals, totals)
+        add_totals(self.by_model.setdefault(record["model"], empty_totals()), totals)
+
+    def to_dict(self, include_calls: bool = False) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "book_id": self.book_id,
+            "info": self.info,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_s": self.duration_s,
+            "totals": describe_totals(self.totals),
+            "by_model": {model: describe_totals(t) for model, t in self.by_model.items()},
+        }
+        if include_calls:
+            data["calls"] = self.calls
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UsageJob":
+        job = cls(data["kind"], data.get("book_id"), **data.get("info", {}))
+        job.id = data["id"]
+        job.started_at = data["started_at"]
+        job.finished_at = data.get("finished_at")
+        job.duration_s = data.get("duration_s")
+        job.status = data.get("status", "completed")
+        job.calls = data.get("calls", [])
+        for record in job.calls:
+            totals = call_totals(record)
+            add_totals(job.totals, totals)
+            add_totals(job.by_model.setdefault(record["model"], empty_totals()), totals)
+        return job
+
+
+class LLMUsageTracker:
+    """Process-wide recorder of LLM calls, jobs and their aggregates."""
+
+    def __init__(self, usage_file: Optional[str] = None):
+        self.usage_file = Path(usage_file or os.getenv("LLM_USAGE_FILE") or USAGE_FILE)
+        self.prices = parse_prices(os.getenv("LLM_PRICES", ""))
+        self._lock = threading.Lock()
+        self._running: Dict[str, UsageJob] = {}
+        self._recent: Deque[UsageJob] = deque(maxlen=RECENT_JOBS)
+        self._by_book: Dict[str, Dict[str, Any]] = {}
+        self._by_model: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+
+    # ----- Jobs -----
+
+    def start_job(self, kind: str, book_id: Optional[str] = None, **info) -> UsageJob:
+        job = UsageJob(kind, book_id, **info)
+        with self._lock:
+            self._running[job.id] = job
+        return job
+
+    def finish_job(self, job: UsageJob, status: str = "completed"):
+        """Close a job, add it to the aggregates and persist it (jobs without calls are dropped)."""
+        with self._lock:
+            if self._running.pop(job.id, None) is None:
+                return
+            job.status = status
+            job.finished_at = datetime.now().isoformat()
+            job.duration_s = round(time.monotonic() - job._started, 3)
+            if not job.calls:
+                return
+            self._load()
+            self._aggregate(job)
+            self._recent.append(job)
+            try:
+                self.usage_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.usage_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(job.to_dict(include_calls=True), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.error(f"[Usage] Failed to persist job {job.id}: {e}")
+        t = job.totals
+        logger.info(
+            f"[Usage] {job.kind} job {job.id} {status}: {t['calls']} calls, "
+            f"{t['total_tokens']} tokens, ${t['cost']:.4f}, {job.duration_s:.1f}s"
+        )
+
+    @contextmanager
+    def job(self, kind: str, book_id: Optional[str] = None, **info):
+        """Run a block as a job; calls made in it (in this context) are recorded on it."""
+        job = self.start_job(kind, book_id, **info)
+        token = _current_job.set(job)
+        status = "failed"
+        try:
+            yield job
+            status = "completed"
+        except InterruptedError:
+            status = "cancelled"
+            raise
+        finally:
+            _current_job.reset(token)
+            self.finish_job(job, status)
+
+    def current_job(self) -> Optional[UsageJob]:
+        return _current_job.get()
+
+    def run_in(self, job: Optional[UsageJob], fn: Callable, *args, **kwargs) -> Any:
+        """Call fn with `job` as the current job (for worker threads, which don't inherit it)."""
+        token = _current_job.set(job)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_job.reset(token)
+
+    # ----- Calls (driven by llm_limiter.run) -----
+
+    @contextmanager
+    def call(self, model: str):
+        """Track one logical call; the caller reports attempts and the outcome."""
+        call = LLMCall(model)
+        token = _current_call.set(call)
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+
+    def mark_first_token(self):
+        """Called by streaming callers when the first content arrives."""
+        call = _current_call.get()
+        if call is not None and call.first_token is None:
+            call.first_token = time.monotonic()
+
+    def add_usage(self, usage: Optional[Dict[str, int]]):
+        """Report provider usage (e.g. the usage_metadata of a stream's final chunk)."""
+        call = _current_call.get()
+        if call is None or not usage:
+            return
+        if call.usage is None:
+            call.usage = {}
+        for key in ("input_tokens", "output_tokens", "total_tokens"):
+            call.usage[key] = call.usage.get(key, 0) + (usage.get(key) or 0)
+
+    def record(self, call: LLMCall, used_tokens: Optional[int] = None, error: Optional[str] = None):
+        """Record a finished call on the current job (calls outside a job form their own)."""
+        record = call.to_record(self.prices, used_tokens, error)
+        LLM_REQUEST_DURATION.observe(record["latency_s"], model=call.model)
+        if record["estimated"]:
+            LLM_TOKENS.inc(record["total_tokens"], model=call.model, type="estimated")
+        else:
+            LLM_TOKENS.inc(record["prompt_tokens"], model=call.model, type="prompt")
+            LLM_TOKENS.inc(record["completion_tokens"], model=call.model, type="completion")
+        job = _current_job.get()
+        if job is None:
+            job = self.start_job("call")
+            with self._lock:
+                job.add(record)
+            self.finish_job(job, "failed" if error else "completed")
+            return
+        with self._lock:
+            job.add(record)
+
+    # ----- Aggregates -----
+
+    def _aggregate(self, job: UsageJob):
+        if job.book_id:
+            add_totals(self._by_book.setdefault(job.book_id, empty_totals()), job.totals)
+        for model, totals in job.by_model.items():
+            add_totals(self._by_model.setdefault(model, empty_totals()), totals)
+
+    def _load(self):
+        """Replay the usage file once (caller holds the lock)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.usage_file.exists():
+            return
+        try:
+            with open(self.usage_file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        job = UsageJob.from_dict(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self._aggregate(job)
+                    self._recent.append(job)
+        except OSError as e:
+            logger.error(f"[Usage] Failed to read {self.usage_file}: {e}")
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Totals per model and per book over all finished jobs."""
+        with self._lock:
+            self._load()
+            return {
+                "models": {model: describe_totals(t) for model, t in self._by_model.items()},
+                "books": {book: describe_totals(t) for book, t in self._by_book.items()},
+            }
+
+    def get_book_usage(self, book_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            totals = self._by_book.get(book_id)
+            return describe_totals(totals) if totals else None
+
+    def get_jobs(self, book_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Running jobs, then the most recent finished ones (newest first)."""
+        with self._lock:
+            self._load()
+            jobs = list(self._running.values()) + list(reversed(self._recent))
+            return [
+                job.to_dict() for job in jobs
+                if book_id is None or job.book_id == book_id
+            ][:limit]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            job = self._running.get(job_id) or next((j for j in self._recent if j.id == job_id), None)
+            return job.to_dict(include_calls=True) if job else None
+
+
+# Singleton instance
+llm_usage = LLMUsageTracker()
@@ -427,6 +427,18 @@ def is_scanned_pdf(pdf_path: Path) -> bool:
         return False
 
 
+def count_pdf_pages(pdf_path: Path) -> int:
+    """Number of pages in a PDF (0 if it cannot be read)."""
+    try:
+        import fitz
+        
+        with fitz.open(str(pdf_path)) as doc:
+            return len(doc)
+    except Exception as e:
+        logger.warning(f"[marker] Could not count PDF pages: {e}")
+        return 0
+
+
 if __name__ == "__main__":
     import sys
     
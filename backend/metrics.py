@@ -0,0 +1,279 @@
+"""
+Metrics - Prometheus-style operational metrics.
+
+A small in-process registry of counters, gauges and histograms (with labels)
+rendered in the Prometheus text exposition format at GET /metrics, plus an
+ASGI middleware that times every route. Values that mirror other services'
+state (LLM limiter queues, cache hit ratios) are read at scrape time by
+collectors, so the hot paths only pay for a dict update.
+
+Rates are left to the scraper, e.g. pages/sec is
+rate(extract_pages_total) and TTS speed is
+rate(tts_audio_seconds_total) / rate(tts_synthesis_seconds_total).
+"""
+
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets (seconds) for HTTP routes and LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Buckets for long-running jobs (extraction, translation, summaries, MP3s)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+# (name suffix, labels, value) as produced by collectors
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class Metric:
+    """A metric family with a fixed set of label names."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label key -> ([count per bucket], sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, total) in self._series.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                samples.append(("_count", labels, cumulative))
+                samples.append(("_sum", labels, total[0]))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        # collector() -> [(name, type, help, samples)]
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        # cache name -> () -> {"hits", "misses"}
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+        self._collectors.append(collector)
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, int]]):
+        """Expose a cache's hit/miss counters (read at scrape time)."""
+        self._caches[name] = stats
+
+    def _cache_families(self):
+        requests: List[Sample] = []
+        ratios: List[Sample] = []
+        for name, stats in self._caches.items():
+            counts = stats()
+            hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+            requests.append(("", {"cache": name, "result": "hit"}, hits))
+            requests.append(("", {"cache": name, "result": "miss"}, misses))
+            if hits + misses:
+                ratios.append(("", {"cache": name}, hits / (hits + misses)))
+        yield "cache_requests_total", "counter", "Cache lookups by result.", requests
+        yield "cache_hit_ratio", "gauge", "Cache hits / lookups since start.", ratios
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format (version 0.0.4)."""
+        families = [(m.name, m.type, m.documentation, m.samples()) for m in self._metrics]
+        families.extend(self._cache_families())
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template (streams are timed until their last byte).",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    "http_requests_in_flight", "Requests currently being served.", ["method"]
+)
+JOB_DURATION = metrics.histogram(
+    "job_duration_seconds",
+    "Duration of background jobs (extract, translate, summary, mp3).",
+    ["kind", "status"],
+    buckets=JOB_BUCKETS,
+)
+JOBS_RUNNING = metrics.gauge("jobs_running", "Jobs currently running.", ["kind"])
+EXTRACT_PAGES = metrics.counter("extract_pages_total", "PDF pages extracted.")
+LLM_TOKENS = metrics.counter("llm_tokens_total", "LLM tokens consumed.", ["model", "type"])
+LLM_REQUEST_DURATION = metrics.histogram(
+    "llm_request_duration_seconds", "LLM call latency (excluding rate-limiter wait).", ["model"]
+)
+
+
+class JobTimer:
+    """Status holder for track_job(); set `status` to report a soft failure."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.status = "completed"
+
+
+@contextmanager
+def track_job(kind: str):
+    """Count a job as running and record its duration and outcome."""
+    timer = JobTimer(kind)
+    JOBS_RUNNING.inc(kind=kind)
+    start = time.monotonic()
+    try:
+        yield timer
+    except (InterruptedError, asyncio.CancelledError):
+        timer.status = "cancelled"
+        raise
+    except Exception:
+        timer.status = "failed"
+        raise
+    finally:
+        JOBS_RUNNING.dec(kind=kind)
+        JOB_DURATION.observe(time.monotonic() - start, kind=kind, status=timer.status)
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, so metrics don't explode per
+    book/chapter. The router stores the route in the (shared) scope, so this
+    is only meaningful once the request has been routed.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start, method=method, route=route_template(scope), status=str(status[0])
+            )
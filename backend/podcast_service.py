@@ -0,0 +1,137 @@
+"""
+Podcast Service - Assemble a whole-book podcast.
+
+Intro + every chapter's summary MP3 + outro are stitched into one audio file
+and muxed into a video (see podcast_pipeline.py). Each step is cached by the
+content hash of its inputs, so adding a chapter only re-runs the concat and
+video steps.
+"""
+
+import sys
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncIterator, List
+
+from .models import Chapter
+from .summary_service import summary_service
+from .async_utils import iter_queue_until
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from podcast_pipeline import PodcastPipeline, DEFAULT_BACKGROUND  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Podcast folder inside each chapter directory
+PODCAST_DIR = "podcast"
+
+# Output file name (without extension)
+PODCAST_NAME = "podcast"
+
+# Files at or below this size are treated as empty/partial
+MIN_PODCAST_SIZE = 1024
+
+
+class PodcastService:
+    """Service for building the whole-book podcast audio and video."""
+
+    def __init__(self):
+        # One build per chapter directory at a time
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_output_dir(self, chapter_dir: Path) -> Path:
+        return chapter_dir / PODCAST_DIR
+
+    def get_output_path(self, chapter_dir: Path, kind: str) -> Optional[Path]:
+        """Get podcast file path ('audio' or 'video') if it exists."""
+        suffix = {"audio": ".mp3", "video": ".mp4"}[kind]
+        path = self._get_output_dir(chapter_dir) / f"{PODCAST_NAME}{suffix}"
+        if path.exists() and path.stat().st_size > MIN_PODCAST_SIZE:
+            return path
+        return None
+
+    async def generate(
+        self,
+        chapter_dir: Path,
+        chapters: List[Chapter],
+        title: str,
+        lang: str = 'zh',
+        video: bool = True,
+        generate_missing: bool = True,
+        personalize_intro: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Build the podcast, yielding progress events.
+
+        Events: {"type": "mp3", "chapter", "status"} while missing chapter MP3s
+        are synthesized, {"type": "step", "step", "status", "message"} for each
+        pipeline step, then {"type": "complete", "chapters", "skipped", "has_audio", "has_video"}.
+        Generation keeps running if the caller stops iterating. The shipped
+        intro/outro MP3s are used unless personalize_intro re-synthesizes them
+        with the book title.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        lock = self._locks.setdefault(str(chapter_dir), asyncio.Lock())
+
+        async def run():
+            async with lock:
+                chapter_audio = []
+                skipped = []
+                for ch in chapters:
+                    mp3_path = summary_service.get_mp3_path(chapter_dir, ch.filename)
+                    if not mp3_path and generate_missing:
+                        summary = summary_service.get_summary(chapter_dir, ch.filename)
+                        if summary and summary.get("voice_script"):
+                            events.put_nowait({"type": "mp3", "chapter": ch.filename, "status": "generating"})
+                            mp3_path = await summary_service.generate_mp3(
+                                chapter_dir=chapter_dir,
+                                chapter_filename=ch.filename,
+                                voice_script=summary["voice_script"],
+                                lang=lang
+                            )
+                    if mp3_path:
+                        chapter_audio.append(str(mp3_path))
+                    else:
+                        skipped.append(ch.filename)
+                        events.put_nowait({"type": "mp3", "chapter": ch.filename, "status": "skipped"})
+
+                logger.info(
+                    f"[Podcast] Building {chapter_dir.name}: {len(chapter_audio)} chapters, "
+                    f"{len(skipped)} without summary audio"
+                )
+                # Concat and video steps run in worker threads
+                loop = asyncio.get_running_loop()
+                pipeline = PodcastPipeline(
+                    str(self._get_output_dir(chapter_dir)),
+                    on_step=lambda step, status, message: loop.call_soon_threadsafe(
+                        events.put_nowait,
+                        {"type": "step", "step": step, "status": status, "message": message}
+                    ),
+                )
+                result = await pipeline.run(
+                    chapter_audio,
+                    title,
+                    name=PODCAST_NAME,
+                    background=str(DEFAULT_BACKGROUND) if video else None,
+                    personalize_intro=personalize_intro,
+                )
+                return {"chapters": len(chapter_audio), "skipped": skipped, **result}
+
+        task = asyncio.create_task(run())
+
+        async for event in iter_queue_until(task, events):
+            yield event
+
+        result = task.result()
+        logger.info(f"[Podcast] Built {result['audio']}" + (f" and {result['video']}" if result['video'] else ""))
+        yield {
+            "type": "complete",
+            "chapters": result["chapters"],
+            "skipped": result["skipped"],
+            "has_audio": True,
+            "has_video": result["video"] is not None,
+        }
+
+
+# Singleton instance
+podcast_service = PodcastService()
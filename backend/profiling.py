@@ -0,0 +1,265 @@
+"""
+Profiling - Per-request Server-Timing spans and on-demand sampling profiles.
+
+`span()` / `@timed()` record how long service-layer work took (library
+scans, language detection, chapter reads) in the current request;
+`TimingMiddleware` reports them in a `Server-Timing` header together with
+the endpoint and response serialization time, so browser devtools show
+where a slow chapter load went. Outside a request the spans cost a single
+context-variable lookup.
+
+Admins can also sample one request's call stacks by sending
+`X-Profile: <PROFILE_TOKEN>` (or `?profile=<PROFILE_TOKEN>`). The profile is
+written in the collapsed-stack format understood by speedscope,
+flamegraph.pl and inferno to resources/.profiles/; its id is returned in
+the `X-Profile-Id` header and it can be downloaded from GET /profiles/{id}
+with the same token. Profiling is disabled unless PROFILE_TOKEN is set.
+"""
+
+import os
+import sys
+import time
+import hmac
+import inspect
+import logging
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(__file__).parent.parent / "resources" / ".profiles"
+
+# Sampling interval of the request profiler (milliseconds)
+PROFILE_INTERVAL_MS = 5
+
+# Profiles kept on disk; older ones are removed
+PROFILE_KEEP = 50
+
+
+class RequestTimings:
+    """Span totals of one request: name -> [milliseconds, calls]."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, elapsed_ms: float):
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += elapsed_ms
+        entry[1] += 1
+
+    def header(self, now: float) -> str:
+        """Render the spans as a Server-Timing header value."""
+        parts = []
+        for name, (elapsed_ms, calls) in self.spans.items():
+            desc = f';desc="{calls} calls"' if calls > 1 else ""
+            parts.append(f"{name};dur={elapsed_ms:.1f}{desc}")
+        if self.handler_end is not None:
+            parts.append(f"serialize;dur={(now - self.handler_end) * 1000:.1f}")
+        parts.append(f"total;dur={(now - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block into the current request's Server-Timing (no-op outside requests)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name: str):
+    """Decorator form of span() for service methods."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _mark_handler_end():
+    timings = _current.get()
+    if timings is not None:
+        timings.handler_end = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times its endpoint as the "handler" span. The time between
+    the endpoint returning and the response starting is reported as
+    "serialize" (response model validation and JSON encoding).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.isasyncgenfunction(endpoint) or inspect.isgeneratorfunction(endpoint):
+            wrapped = endpoint
+        elif inspect.iscoroutinefunction(endpoint):
+            @wraps(endpoint)
+            async def wrapped(*args, **kwargs):
+                try:
+                    with span("handler"):
+                        return await endpoint(*args, **kwargs)
+                finally:
+                    _mark_handler_end()
+        else:
+            @wraps(endpoint)
+            def wrapped(*args, **kwargs):
+                try:
+                    with span("handler"):
+                        return endpoint(*args, **kwargs)
+                finally:
+                    _mark_handler_end()
+        super().__init__(path, wrapped, **kwargs)
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Admin-triggered request profiles: token check and storage."""
+
+    def __init__(self, profile_dir: Optional[Path] = None):
+        self.profile_dir = Path(profile_dir or os.getenv("PROFILE_DIR") or PROFILE_DIR)
+        self.token = os.getenv("PROFILE_TOKEN", "")
+        self.interval = float(os.getenv("PROFILE_INTERVAL_MS", PROFILE_INTERVAL_MS)) / 1000
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """True if profiling is enabled and the token matches PROFILE_TOKEN."""
+        if not self.token or not token:
+            return False
+        return hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    def save(self, profile_id: str, method: str, path: str, sampler: SamplingProfiler):
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profile_file = self.profile_dir / f"{profile_id}.folded"
+            profile_file.write_text(sampler.collapsed(), encoding="utf-8")
+            samples = sum(sampler.stacks.values())
+            logger.info(f"[Profile] {method} {path}: {samples} samples -> {profile_file}")
+            for old in sorted(self.profile_dir.glob("*.folded"))[:-PROFILE_KEEP]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"[Profile] Could not save profile {profile_id}: {e}")
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Read a stored profile by id (None if unknown)."""
+        if not profile_id.replace("_", "").isdigit():
+            return None
+        profile_file = self.profile_dir / f"{profile_id}.folded"
+        return profile_file.read_text(encoding="utf-8") if profile_file.exists() else None
+
+
+# Singleton instance
+request_profiler = RequestProfiler()
+
+
+def _profile_token(scope) -> str:
+    for key, value in scope.get("headers", []):
+        if key == b"x-profile":
+            return value.decode("latin-1")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return (query.get("profile") or [""])[0]
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware adding a Server-Timing header to every HTTP response,
+    and profiling requests that carry the admin profile token.
+
+    The profiler samples the thread serving the request (the event loop for
+    async endpoints), so stacks of concurrent requests on that loop can show
+    up in the same profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        sampler = None
+        profile_id = None
+        # Downloading a profile takes the same token; don't profile that
+        if not scope["path"].startswith("/profiles/") and request_profiler.authorized(_profile_token(scope)):
+            sampler = SamplingProfiler(threading.get_ident(), request_profiler.interval)
+            profile_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header(time.perf_counter()).encode("latin-1")))
+                if profile_id:
+                    headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(timings)
+        if sampler:
+            sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if sampler:
+                sampler.stop()
+                request_profiler.save(profile_id, scope["method"], scope["path"], sampler)
@@ -0,0 +1,290 @@
+"""
+LLM Rate Limiter - Shared request/token budgets and adaptive concurrency.
+
+Every LLM call goes through `llm_limiter.run()`, which:
+- waits for the model's requests/min and tokens/min token buckets,
+- waits for a concurrency slot; the slot limit follows AIMD (additive
+  increase on success, halved on 429 / timeout),
+- on 429 pauses all callers of that model for `Retry-After` and retries the
+  call, so throughput settles at the provider's limit without error storms,
+- retries timeouts, connection errors and 5xx a few times with jittered
+  exponential backoff (the OpenAI clients' own retries are disabled so 429s
+  reach this limiter).
+
+Limits are configured with LLM_RPM / LLM_TPM (per-model overrides in
+LLM_RATE_LIMITS, e.g. "gpt-4o:500/30000,qwen-turbo:60/0"; 0 disables a bucket,
+both default to 0 so only AIMD on 429s throttles) and LLM_MAX_CONCURRENCY.
+
+Each call is also recorded in `llm_usage` (tokens, latency, retries, cost).
+"""
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .llm_usage import llm_usage
+from .metrics import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPM = int(os.getenv("LLM_RPM", "0"))
+DEFAULT_TPM = int(os.getenv("LLM_TPM", "0"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Retries of a rate-limited call (separate from the callers' validation retries)
+RATE_LIMIT_RETRIES = 5
+
+# Pause after a 429 without a Retry-After header (doubles per consecutive 429)
+DEFAULT_RETRY_AFTER = 5.0
+MAX_RETRY_AFTER = 120.0
+
+# Retries of timeouts / connection errors / 5xx, with exponential backoff (seconds)
+TRANSIENT_RETRIES = 2
+TRANSIENT_BACKOFF = 1.0
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse LLM_RATE_LIMITS ("model:rpm/tpm,...") into {model: (rpm, tpm)}."""
+    limits = {}
+    for item in spec.split(","):
+        model, _, values = item.strip().rpartition(":")
+        rpm, _, tpm = values.partition("/")
+        if model and rpm.strip().isdigit():
+            limits[model] = (int(rpm), int(tpm) if tpm.strip().isdigit() else DEFAULT_TPM)
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per ~4 other characters."""
+    cjk = len(re.findall(r'[\u3000-\u9fff\uff00-\uffef]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _is_overloaded(error: Exception) -> bool:
+    name = type(error).__name__
+    return "Timeout" in name or getattr(error, "status_code", None) in (502, 503, 504)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Errors worth retrying after a backoff: overload, connection errors, 5xx."""
+    status = getattr(error, "status_code", None)
+    return (
+        _is_overloaded(error)
+        or type(error).__name__ == "APIConnectionError"
+        or (isinstance(status, int) and status >= 500)
+    )
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds) or retry-after-ms from the error's HTTP response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` (guarded by the ModelLimiter's lock)."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (requests above capacity wait for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) after the real usage is known."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class ModelLimiter:
+    """Rate buckets and AIMD concurrency for one model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, max_concurrency: int):
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        # Callers blocked in acquire() (queue depth)
+        self.waiting = 0
+        self.paused_until = 0.0
+        self.consecutive_throttles = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, estimated_tokens: int):
+        """Block until a slot and both budgets are available, then take them."""
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self.paused_until - now
+                    if self.in_flight >= int(self.limit):
+                        wait = max(wait, 1.0)  # woken early by release()
+                    if self.requests:
+                        wait = max(wait, self.requests.wait_time(1, now))
+                    if self.tokens:
+                        wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+            finally:
+                self.waiting -= 1
+
+            self.in_flight += 1
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(estimated_tokens)
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int], outcome: str,
+                retry_after: Optional[float] = None):
+        """
+        Return the slot and adapt: outcome is "ok", "throttled", "overloaded" or "error".
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if self.tokens and used_tokens is not None:
+                self.tokens.adjust(used_tokens - estimated_tokens)
+
+            if outcome == "ok":
+                self.consecutive_throttles = 0
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            elif outcome in ("throttled", "overloaded"):
+                self.limit = max(1.0, self.limit / 2)
+                if outcome == "throttled":
+                    self.consecutive_throttles += 1
+                    if retry_after is None:
+                        retry_after = DEFAULT_RETRY_AFTER * 2 ** (self.consecutive_throttles - 1)
+                    retry_after = min(retry_after, MAX_RETRY_AFTER) * random.uniform(1.0, 1.2)
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+                logger.warning(
+                    f"[RateLimit] {self.model} {outcome}: concurrency limit {self.limit:.1f}"
+                    + (f", pausing {retry_after:.1f}s" if outcome == "throttled" else "")
+                )
+            self._cond.notify_all()
+
+
+class LLMRateLimiter:
+    """Process-wide registry of per-model limiters."""
+
+    def __init__(self):
+        self._limits = parse_rate_limits(os.getenv("LLM_RATE_LIMITS", ""))
+        self._models: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str) -> ModelLimiter:
+        with self._lock:
+            limiter = self._models.get(model)
+            if limiter is None:
+                rpm, tpm = self._limits.get(model, (DEFAULT_RPM, DEFAULT_TPM))
+                limiter = ModelLimiter(model, rpm, tpm, MAX_CONCURRENCY)
+                self._models[model] = limiter
+            return limiter
+
+    def run(
+        self,
+        model: str,
+        estimated_tokens: int,
+        fn: Callable[[], Any],
+        count_tokens: Optional[Callable[[Any], Optional[int]]] = None,
+    ) -> Any:
+        """
+        Call fn() within the model's budgets, retrying it when rate limited and
+        (up to TRANSIENT_RETRIES times, with backoff) on transient errors.
+
+        count_tokens(result) reports the real usage (defaults to the response's
+        usage_metadata) so the tokens/min bucket tracks actual consumption.
+        Other errors are raised to the caller after adapting the concurrency.
+        
+        Streaming callers report llm_usage.mark_first_token() and
+        llm_usage.add_usage() from inside fn; for plain responses the
+        usage_metadata is read here.
+        """
+        limiter = self.get(model)
+        with llm_usage.call(model) as call:
+            throttled = 0
+            transient = 0
+            attempt = 0
+            while True:
+                limiter.acquire(estimated_tokens)
+                call.begin_attempt(attempt)
+                attempt += 1
+                try:
+                    result = fn()
+                except Exception as e:
+                    if _is_rate_limited(e):
+                        limiter.release(estimated_tokens, None, "throttled", _retry_after(e))
+                        if throttled < RATE_LIMIT_RETRIES:
+                            throttled += 1
+                            continue
+                    else:
+                        limiter.release(estimated_tokens, None, "overloaded" if _is_overloaded(e) else "error")
+                        if _is_transient(e) and transient < TRANSIENT_RETRIES:
+                            delay = TRANSIENT_BACKOFF * 2 ** transient * random.uniform(1.0, 1.5)
+                            transient += 1
+                            logger.warning(
+                                f"[RateLimit] {model} {type(e).__name__}, retry {transient}/{TRANSIENT_RETRIES} "
+                                f"in {delay:.1f}s: {e}"
+                            )
+                            time.sleep(delay)
+                            continue
+                    llm_usage.record(call, error=f"{type(e).__name__}: {e}"[:200])
+                    raise
+
+                if call.usage is None:
+                    llm_usage.add_usage(getattr(result, "usage_metadata", None))
+                counter = count_tokens or (lambda r: (getattr(r, "usage_metadata", None) or {}).get("total_tokens"))
+                used_tokens = call.usage["total_tokens"] if call.usage else counter(result)
+                limiter.release(estimated_tokens, used_tokens, "ok")
+                llm_usage.record(call, used_tokens)
+                return result
+    
+    def collect(self):
+        """Per-model queue depth, in-flight calls and concurrency limit (for /metrics)."""
+        with self._lock:
+            limiters = list(self._models.values())
+        yield ("llm_queue_depth", "gauge", "LLM calls waiting for a rate-limiter slot.",
+               [("", {"model": m.model}, m.waiting) for m in limiters])
+        yield ("llm_in_flight", "gauge", "LLM calls in progress.",
+               [("", {"model": m.model}, m.in_flight) for m in limiters])
+        yield ("llm_concurrency_limit", "gauge", "Current AIMD concurrency limit.",
+               [("", {"model": m.model}, m.limit) for m in limiters])
+
+
+# Singleton instance
+llm_limiter = LLMRateLimiter()
+metrics.add_collector(llm_limiter.collect)
@@ -0,0 +1,207 @@
+"""
+Render Service - Server-side markdown to HTML rendering for chapters.
+
+Uses the same Python markdown pipeline as merge_markdown_to_html.py.
+python-markdown passes raw HTML through, and chapters come from PDFs and
+LLM translations, so the output is sanitized against an allowlist before
+it reaches the browser. Rendered HTML is cached on disk keyed by chapter
+content hash, and rendering runs in a process pool so large chapters don't
+block the API.
+"""
+
+import os
+import re
+import sys
+import asyncio
+import hashlib
+import logging
+from html import escape
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from merge_markdown_to_html import convert_markdown_to_html
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering pipeline changes to invalidate cached HTML
+RENDER_VERSION = 2
+
+# Cache folder inside each chapter directory
+HTML_CACHE_DIR = ".html_cache"
+
+# Relative image references produced by the extractor (images/xxx.jpeg)
+IMAGE_SRC_PATTERN = re.compile(r'(<img\b[^>]*?\bsrc=")images/')
+
+# Tags and attributes kept by the sanitizer (everything markdown produces)
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt",
+    "em", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p",
+    "pre", "span", "strong", "sub", "sup", "table", "tbody", "td", "th", "thead",
+    "tr", "ul",
+}
+ALLOWED_ATTRS = {
+    "*": {"id", "class", "title"},
+    "a": {"href"},
+    "img": {"src", "alt"},
+    "td": {"align", "colspan", "rowspan"},
+    "th": {"align", "colspan", "rowspan"},
+}
+URL_ATTRS = {"href", "src"}
+ALLOWED_SCHEMES = {"", "http", "https", "mailto"}
+VOID_TAGS = {"br", "hr", "img"}
+
+# Tags whose content is dropped along with the tag
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "textarea"}
+
+
+class _Sanitizer(HTMLParser):
+    """Rebuilds HTML keeping only allowlisted tags, attributes and URL schemes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self._drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth += 1
+            return
+        if self._drop_depth or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRS["*"] | ALLOWED_ATTRS.get(tag, set())
+        parts = [tag]
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS and urlsplit(value.strip()).scheme.lower() not in ALLOWED_SCHEMES:
+                continue
+            parts.append(f'{name}="{escape(value)}"')
+        self.out.append(f"<{' '.join(parts)}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth = max(0, self._drop_depth - 1)
+            return
+        if self._drop_depth or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self._drop_depth:
+            self.out.append(escape(data, quote=False))
+
+
+def sanitize_html(html: str) -> str:
+    """Strip tags, attributes and URLs outside the allowlist from rendered HTML."""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return "".join(sanitizer.out)
+
+
+def _render_markdown(md_content: str, image_base: str) -> str:
+    """
+    Render markdown to sanitized HTML and resolve image URLs (runs in worker process).
+    """
+    html = sanitize_html(convert_markdown_to_html(md_content))
+    return IMAGE_SRC_PATTERN.sub(lambda m: f"{m.group(1)}{image_base}", html)
+
+
+def is_valid_chapter_filename(chapter_filename: str) -> bool:
+    """A plain file name: no path separators or parent references."""
+    return bool(chapter_filename) and not (
+        "/" in chapter_filename or "\\" in chapter_filename or ".." in chapter_filename
+    )
+
+
+class RenderService:
+    """Service for rendering chapter markdown to cached HTML."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def shutdown(self):
+        """Shut down the worker pool (called on app shutdown)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_cache_file(self, chapter_dir: Path, chapter_filename: str, content_hash: str) -> Path:
+        """Get cache file path: <chapter key>_<content hash>.html"""
+        chapter_key = hashlib.sha1(chapter_filename.encode('utf-8')).hexdigest()[:12]
+        return chapter_dir / HTML_CACHE_DIR / f"{chapter_key}_{content_hash}.html"
+
+    def _content_hash(self, md_content: str, image_base: str) -> str:
+        """Hash of everything that affects the rendered output."""
+        hasher = hashlib.sha256()
+        hasher.update(f"v{RENDER_VERSION}\n{image_base}\n".encode('utf-8'))
+        hasher.update(md_content.encode('utf-8'))
+        return hasher.hexdigest()[:32]
+
+    async def render_chapter(
+        self,
+        chapter_dir: Path,
+        chapter_filename: str,
+        book_id: str
+    ) -> Optional[str]:
+        """
+        Get rendered HTML for a chapter, rendering it if not cached.
+
+        Returns None if the chapter file doesn't exist. Raises ValueError for
+        names that are not a plain file name.
+        """
+        if not is_valid_chapter_filename(chapter_filename):
+            raise ValueError(f"Invalid chapter filename: {chapter_filename}")
+
+        chapter_file = chapter_dir / chapter_filename
+        if not chapter_file.exists():
+            return None
+
+        md_content = chapter_file.read_text(encoding='utf-8')
+        image_base = f"/api/books/{quote(book_id)}/images/images/"
+        content_hash = self._content_hash(md_content, image_base)
+        cache_file = self._get_cache_file(chapter_dir, chapter_filename, content_hash)
+
+        if cache_file.exists():
+            try:
+                return cache_file.read_text(encoding='utf-8')
+            except Exception as e:
+                logger.warning(f"[Render] Failed to read cache, re-rendering: {e}")
+
+        logger.info(f"[Render] Rendering {chapter_filename} ({len(md_content)} chars)")
+        loop = asyncio.get_running_loop()
+        html = await loop.run_in_executor(self._get_pool(), _render_markdown, md_content, image_base)
+
+        try:
+            # Drop stale renders of this chapter, then write atomically
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            prefix = cache_file.name.split('_', 1)[0]
+            for stale in cache_file.parent.glob(f"{prefix}_*.html"):
+                stale.unlink()
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(html, encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"[Render] Failed to write cache: {e}")
+
+        return html
+
+
+# Singleton instance
+render_service = RenderService()
@@ -2,11 +2,15 @@
 Business logic services for the AI-Readwise API.
 """
 
+import json
 import logging
 import asyncio
 from pathlib import Path
 from typing import List, Optional, Dict, Callable
 from .models import Book, Chapter, ExtractProgress
+from .llm_usage import llm_usage
+from .metrics import EXTRACT_PAGES, track_job
+from .profiling import timed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,12 +21,38 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from split_markdown import split_markdown_file
 
+# Per-book metadata (cached domain etc.), stored next to description.md
+BOOK_METADATA_FILE = ".metadata.json"
+
+DEFAULT_DOMAIN = "general knowledge"
+
+# Local domain classifier: first entry with a keyword in the title/description wins
+DOMAIN_KEYWORDS = [
+    ("software engineering", ["data", "software", "system", "computer", "programming", "algorithm",
+                              "数据", "软件", "系统", "计算机", "编程", "算法"]),
+    ("business and management", ["business", "management", "marketing", "company", "startup",
+                                 "商业", "管理", "营销", "企业", "创业"]),
+    ("natural sciences", ["science", "physics", "chemistry", "biology",
+                          "科学", "物理", "化学", "生物"]),
+]
+
+
+def classify_domain(text: str) -> Optional[str]:
+    """Guess the domain from title/description keywords. Returns None if nothing matches."""
+    text = text.lower()
+    for domain, keywords in DOMAIN_KEYWORDS:
+        if any(kw in text for kw in keywords):
+            return domain
+    return None
+
 
 class BookService:
     """Service for managing books."""
     
     def __init__(self, resources_dir: Path):
         self.resources_dir = resources_dir
+        # Hit/miss counts of the per-book domain cache (exported as metrics)
+        self.domain_cache_stats = {"hits": 0, "misses": 0}
     
     def parse_description(self, content: str) -> Dict[str, str]:
         """Parse description.md content (YAML-like format)."""
@@ -33,6 +63,7 @@ class BookService:
                 result[key.strip()] = value.strip()
         return result
     
+    @timed("get_all_books")
     def get_all_books(self) -> List[Book]:
         """Get all books from resources directory."""
         books = []
@@ -86,6 +117,66 @@ class BookService:
                 return book
         return None
     
+    def _get_metadata_file(self, book_id: str) -> Path:
+        return self.resources_dir / book_id / BOOK_METADATA_FILE
+    
+    def get_metadata(self, book_id: str) -> Dict:
+        """Read the book's metadata store (empty dict if missing or corrupt)."""
+        try:
+            return json.loads(self._get_metadata_file(book_id).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+    
+    def update_metadata(self, book_id: str, **fields) -> Dict:
+        """Merge fields into the book's metadata store (atomic write)."""
+        metadata = self.get_metadata(book_id)
+        metadata.update(fields)
+        metadata_file = self._get_metadata_file(book_id)
+        tmp_file = metadata_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp_file.replace(metadata_file)
+        return metadata
+    
+    def get_domain(self, book_id: str, model: Optional[str] = None, content: Optional[str] = None) -> str:
+        """
+        Get the book's domain, computing and persisting it on first use.
+        
+        Precedence: `domain:` in description.md, then the cached value. When
+        nothing is cached, or only a keyword guess is and `model` + `content`
+        are given, it is detected once by the LLM (falling back to the local
+        keyword classifier) and saved to .metadata.json.
+        """
+        book = self.get_book(book_id)
+        if not book:
+            return DEFAULT_DOMAIN
+        
+        description_file = self.resources_dir / book_id / "description.md"
+        declared = self.parse_description(description_file.read_text(encoding='utf-8')).get('domain')
+        if declared:
+            return declared
+        
+        metadata = self.get_metadata(book_id)
+        cached = metadata.get('domain')
+        use_llm = bool(model and content)
+        if cached and not (use_llm and metadata.get('domain_source') == 'keywords'):
+            self.domain_cache_stats["hits"] += 1
+            return cached
+        self.domain_cache_stats["misses"] += 1
+        
+        if use_llm:
+            from .translation_service import translation_service
+            domain = translation_service.detect_domain(content, model)
+            if domain:
+                self.update_metadata(book_id, domain=domain, domain_source='llm', domain_model=model)
+                return domain
+            if cached:
+                return cached
+        
+        domain = classify_domain(f"{book.title}\n{book.description}") or DEFAULT_DOMAIN
+        self.update_metadata(book_id, domain=domain, domain_source='keywords')
+        logger.info(f"[BookService] Domain for {book_id} from keywords: {domain}")
+        return domain
+    
     def get_chapters(self, book_id: str) -> List[Chapter]:
         """Get all chapters of a book."""
         book = self.get_book(book_id)
@@ -266,18 +357,18 @@ class BookService:
         Get language information for a book.
         Returns source language and available translations.
         """
-        from .translation_service import translation_service, LANG_ZH, LANG_EN
-        
         book = self.get_book(book_id)
         if not book:
             raise ValueError(f"Book not found: {book_id}")
         
-        book_dir = self.resources_dir / book_id
-        pdf_stem = Path(book.file).stem
-        source_dir = book_dir / pdf_stem
+        return self._get_language_info_for(book, self._locate_source_md(book))
+    
+    @timed("get_language_info")
+    def _get_language_info_for(self, book: Book, source_md: Optional[Path]) -> dict:
+        """Build language info for an already resolved book and source markdown."""
+        from .translation_service import translation_service, LANG_ZH, LANG_EN
         
-        # Get source markdown to detect language
-        source_md = self._find_source_md(book_id)
+        book_dir = self.resources_dir / book.id
         source_lang = LANG_EN  # Default
         
         if source_md and source_md.exists():
@@ -324,7 +415,12 @@ class BookService:
         if not book:
             return None
         
-        book_dir = self.resources_dir / book_id
+        return self._locate_source_md(book)
+    
+    @timed("locate_source_md")
+    def _locate_source_md(self, book: Book) -> Optional[Path]:
+        """Find source markdown file for an already resolved book."""
+        book_dir = self.resources_dir / book.id
         pdf_stem = Path(book.file).stem
         source_dir = book_dir / pdf_stem
         source_md_name = pdf_stem + ".md"
@@ -392,7 +488,10 @@ class BookService:
         if not chapter_dir.exists():
             return []
         
-        # Find all chapter files (numbered prefix like 01_, 02_)
+        return self._list_lang_chapters(chapter_dir)
+    
+    def _list_lang_chapters(self, chapter_dir: Path) -> List[Chapter]:
+        """List numbered chapter files (01_, 02_, ...) of a chapter directory."""
         chapter_files = sorted([
             f for f in chapter_dir.glob('[0-9][0-9]_*.md')
         ])
@@ -406,6 +505,7 @@ class BookService:
             for f in chapter_files
         ]
     
+    @timed("read_chapter")
     def get_chapter_content_for_lang(self, book_id: str, lang: str, chapter_filename: str) -> Optional[str]:
         """Get chapter content for a specific language."""
         from .translation_service import LANG_ZH, LANG_EN
@@ -436,6 +536,53 @@ class BookService:
         
         return chapter_file.read_text(encoding='utf-8')
     
+    def get_bootstrap(self, book_id: str, lang: Optional[str] = None,
+                      include_content: bool = False) -> Optional[dict]:
+        """
+        Resolve everything needed to open a book in a single pass.
+        
+        Scans the library and detects the source language only once, then
+        derives language info, the chapter directory and chapters for `lang`
+        (source language by default), and optionally the first chapter body.
+        
+        Returns None if the book doesn't exist.
+        """
+        book = self.get_book(book_id)
+        if not book:
+            return None
+        
+        book_dir = self.resources_dir / book_id
+        source_md = self._locate_source_md(book)
+        pdf_stem = source_md.parent.name if source_md else Path(book.file).stem
+        
+        lang_info = self._get_language_info_for(book, source_md)
+        source_lang = lang_info["source_lang"]
+        lang = lang or source_lang
+        
+        if lang == source_lang:
+            chapter_dir = book_dir / pdf_stem
+        else:
+            chapter_dir = book_dir / f"{pdf_stem}_{lang}"
+        
+        chapters = self._list_lang_chapters(chapter_dir) if chapter_dir.exists() else []
+        
+        first_chapter = None
+        if include_content and chapters:
+            chapter_file = chapter_dir / chapters[0].filename
+            first_chapter = {
+                "filename": chapters[0].filename,
+                "content": chapter_file.read_text(encoding='utf-8'),
+            }
+        
+        return {
+            "book": book,
+            "lang": lang,
+            "languages": lang_info,
+            "chapter_dir": chapter_dir if chapter_dir.exists() else None,
+            "chapters": chapters,
+            "first_chapter": first_chapter,
+        }
+    
     def translate_book(
         self, 
         book_id: str, 
@@ -470,15 +617,21 @@ class BookService:
         
         logger.info(f"[BookService] Translating {book_id} to {target_lang}")
         
-        # Translate the document
-        translated_md = translation_service.translate_document(
-            source_md_path=source_md,
-            target_dir=target_dir,
-            target_lang=target_lang,
-            model=model,
-            book_id=book_id,
-            progress_callback=progress_callback
-        )
+        # Resolved lazily: a resumed translation keeps the domain it started with
+        def resolve_domain(content: str) -> str:
+            return self.get_domain(book_id, model=model, content=content)
+        
+        # Translate the document (its LLM calls are accounted as one job)
+        with track_job("translate"), llm_usage.job("translate", book_id, target_lang=target_lang, model=model):
+            translated_md = translation_service.translate_document(
+                source_md_path=source_md,
+                target_dir=target_dir,
+                target_lang=target_lang,
+                model=model,
+                book_id=book_id,
+                progress_callback=progress_callback,
+                domain_resolver=resolve_domain
+            )
         
         if progress_callback:
             progress_callback(85, "Fixing image paths...")
@@ -741,9 +894,21 @@ class ExtractService:
         Runs extraction in a separate process for true cancellation support.
         Progress is read from the progress file written by the worker.
         """
+        with track_job("extract") as job:
+            success = await self._extract_pdf(book_id, progress_callback)
+            if not success:
+                job.status = "failed"
+            return success
+    
+    async def _extract_pdf(
+        self, 
+        book_id: str, 
+        progress_callback: Optional[Callable[[ExtractProgress], None]] = None
+    ) -> bool:
+        """Run the extraction worker and relay its progress (see extract_pdf)."""
         import subprocess
         import sys
-        from .marker_extract import read_progress, write_progress
+        from .marker_extract import read_progress, write_progress, count_pdf_pages
         
         book_dir = self.resources_dir / book_id
         description_file = book_dir / "description.md"
@@ -861,6 +1026,12 @@ class ExtractService:
                 )
             
             logger.info(f"[ExtractService] Extraction completed successfully")
+            if not is_resume:
+                # Metrics are best-effort and must never fail an extraction
+                try:
+                    EXTRACT_PAGES.inc(count_pdf_pages(pdf_path))
+                except Exception as e:
+                    logger.warning(f"[ExtractService] Could not record extracted pages: {e}")
             return True
             
         except Exception as e:
@@ -6,20 +6,256 @@ for podcast preparation.
 """
 
 import os
+import re
+import sys
 import json
+import asyncio
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Tuple
 from datetime import datetime
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from mp3_concat import read_audio_frames  # noqa: E402
+from tts_cache import TTSCache, TTS_STATS, speakable_sentences  # noqa: E402
+
+from .json_stream import IncrementalJSONParser, repair_json  # noqa: E402
+from .llm_clients import llm_clients  # noqa: E402
+from .llm_usage import llm_usage  # noqa: E402
+from .metrics import metrics, track_job  # noqa: E402
+from .rate_limiter import llm_limiter, estimate_tokens  # noqa: E402
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Per-chapter-directory manifest of summary/MP3 state, stored in summaries/
+MANIFEST_FILE = ".manifest.json"
+
+# MP3 files at or below this size are treated as empty/partial
+MIN_MP3_SIZE = 1024
+
+# edge-tts voice per summary language
+TTS_VOICES = {
+    'zh': 'zh-CN-YunjianNeural',  # Chinese male voice
+    'en': 'en-US-GuyNeural',       # English male voice
+}
+DEFAULT_TTS_VOICE = 'zh-CN-YunjianNeural'
+
+# Expected summary response size, reserved from the tokens/min budget
+SUMMARY_OUTPUT_TOKENS = 2000
+
+# Bump when the summary prompt changes so cached responses are not reused
+SUMMARY_PROMPT_VERSION = 3
+
+# Request a JSON object via the provider's JSON mode (response_format); models
+# that reject it fall back to prompt-only JSON for the rest of the process
+SUMMARY_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() not in ("0", "false", "no")
+
+# Fields every summary has, with the factory for the empty value used to fill
+# missing ones after a repair
+SUMMARY_FIELDS = {
+    "key_points": list,
+    "conclusions": list,
+    "examples": list,
+    "voice_script": str,
+}
+
+# Chapters estimated above this many tokens are summarized with map-reduce
+SUMMARY_DIRECT_TOKENS = 24000
+
+# Map-reduce: token budget per section, expected notes size per section,
+# and sections summarized in parallel (still bounded by the rate limiter)
+SUMMARY_SECTION_TOKENS = 12000
+SECTION_NOTES_TOKENS = 800
+SUMMARY_MAP_CONCURRENCY = 4
+
+# Persistent LLM response cache shared by all books
+SUMMARY_CACHE_DIR = Path(__file__).parent.parent / "resources" / ".summary_cache"
+SUMMARY_CACHE_MAX_MB = 64
+
+
+class MP3Synthesis:
+    """
+    An in-flight edge-tts synthesis shared by every listener of a chapter.
+
+    Audio chunks are kept in memory as they arrive so late listeners can
+    replay from the start, and are teed to the cached MP3 by the producer.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.task: Optional[asyncio.Task] = None
+        self._cond = asyncio.Condition()
+
+    async def publish(self, chunk: bytes):
+        async with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def finish(self, error: Optional[Exception] = None):
+        async with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    async def iter_audio(self) -> AsyncIterator[bytes]:
+        """Yield all audio chunks from the beginning until synthesis ends."""
+        index = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: index < len(self.chunks) or self.done)
+                pending = self.chunks[index:]
+                finished = self.done
+            index += len(pending)
+            for chunk in pending:
+                yield chunk
+            if finished:
+                if self.error:
+                    raise self.error
+                return
+
+    async def wait(self) -> Optional[Path]:
+        """Wait for synthesis to complete; cancelling the waiter doesn't stop it."""
+        return await asyncio.shield(self.task)
+
+
+def split_sections(content: str, max_tokens: int) -> List[str]:
+    """
+    Split markdown into consecutive sections of at most ~max_tokens each.
+
+    Breaks at paragraph boundaries, preferring to start a new section at a
+    heading; a single oversized paragraph is cut by lines, then by characters.
+    """
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', content):
+        if not paragraph.strip():
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split('\n'):
+            while estimate_tokens(line) > max_tokens:
+                # Cut proportionally; estimate_tokens is roughly linear in length
+                cut = max(1, len(line) * max_tokens // estimate_tokens(line))
+                pieces.append(line[:cut])
+                line = line[cut:]
+            if line.strip():
+                pieces.append(line)
+    
+    # Keep headings with the text that follows them, so a heading before an
+    # oversized paragraph doesn't end up as a section of its own
+    merged: List[str] = []
+    heading = None
+    for piece in pieces:
+        if heading is not None:
+            piece = heading + '\n\n' + piece
+            heading = None
+        if all(line.lstrip().startswith('#') for line in piece.split('\n')):
+            heading = piece
+        else:
+            merged.append(piece)
+    if heading is not None:
+        merged.append(heading)
+    pieces = merged
+    
+    sections = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        starts_heading = piece.lstrip().startswith('#')
+        # Close the section when full, or early at a heading once it is half full
+        if current and (current_tokens + tokens > max_tokens
+                        or (starts_heading and current_tokens > max_tokens // 2)):
+            sections.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        sections.append('\n\n'.join(current))
+    return sections
+
+
+class SummaryCache:
+    """
+    Content-addressed cache of summary LLM responses.
+
+    Keyed by hash(prompt version, model, language, domain, chapter title and
+    content), so unchanged chapters (e.g. after a resplit or a re-run of
+    generate-all) never pay for a second call. Entries are evicted least
+    recently used first once the cache exceeds its size limit.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("SUMMARY_CACHE_DIR") or SUMMARY_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SUMMARY_CACHE_MAX_MB", SUMMARY_CACHE_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        # Lookup counts (exported as metrics)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def key(self, content: str, title: str, model: str, lang: str, domain: str) -> str:
+        payload = json.dumps([SUMMARY_PROMPT_VERSION, model, lang, domain, title, content], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached summary and mark it recently used."""
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            os.utime(path)
+            self.stats["hits"] += 1
+            return data
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, summary: Dict[str, Any]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(summary, ensure_ascii=False), encoding='utf-8')
+        tmp_file.replace(path)
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete least recently used entries until the cache fits. Returns the count removed."""
+        if self.max_bytes <= 0 or not self.cache_dir.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
 
 class SummaryService:
     """Service for generating chapter summaries using LLM."""
@@ -29,14 +265,23 @@ class SummaryService:
         self.api_key = os.getenv("LLM_API_KEY", "")
         self.models = [m.strip() for m in os.getenv("LLM_MODELS", "gpt-4o-mini").split(",") if m.strip()]
         self.default_model = os.getenv("LLM_DEFAULT_MODEL", self.models[0] if self.models else "gpt-4o-mini")
+        self._manifest_lock = threading.Lock()
+        # In-flight MP3 synthesis keyed by target MP3 path
+        self._mp3_synthesis: Dict[str, MP3Synthesis] = {}
+        # Shared sentence-level TTS cache (edits only re-synthesize changed sentences)
+        self._tts_cache = TTSCache()
+        # Persistent LLM response cache
+        self._summary_cache = SummaryCache()
+        # Models whose endpoint rejected response_format
+        self._json_mode_unsupported: set = set()
     
     def _create_llm(self, model: str):
-        """Create a LangChain ChatOpenAI instance."""
-        return ChatOpenAI(
-            model=model,
+        """Get the shared, pooled LangChain ChatOpenAI client."""
+        return llm_clients.get(
+            model,
+            temperature=0.5,  # Slightly higher for creative summarization
             base_url=self.base_url,
             api_key=self.api_key,
-            temperature=0.5,  # Slightly higher for creative summarization
         )
     
     def _get_summary_file(self, chapter_dir: Path, chapter_filename: str) -> Path:
@@ -46,6 +291,113 @@ class SummaryService:
         summaries_dir = chapter_dir / "summaries"
         return summaries_dir / f"{stem}_summary.json"
     
+    def _get_manifest_file(self, chapter_dir: Path) -> Path:
+        """Get path to the summary manifest of a chapter directory."""
+        return chapter_dir / "summaries" / MANIFEST_FILE
+    
+    def _read_manifest(self, chapter_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        Read the manifest file. Returns None if missing, unreadable or stale.
+        
+        The manifest's mtime is set to the summaries/ directory's mtime when
+        it is written, so a newer directory mtime means files were added,
+        removed or replaced outside this service (hand-deleted JSON, partial
+        MP3s left by a crash) and the manifest must be rebuilt from disk.
+        """
+        manifest_file = self._get_manifest_file(chapter_dir)
+        try:
+            if manifest_file.parent.stat().st_mtime_ns > manifest_file.stat().st_mtime_ns:
+                logger.info(f"[Summary] Manifest is stale: {manifest_file}")
+                return None
+        except FileNotFoundError:
+            return None
+        try:
+            data = json.loads(manifest_file.read_text(encoding='utf-8'))
+            return data if isinstance(data.get('chapters'), dict) else None
+        except Exception as e:
+            logger.warning(f"[Summary] Failed to read manifest: {e}")
+            return None
+    
+    def _write_manifest(self, chapter_dir: Path, data: Dict[str, Any]):
+        """Write the manifest atomically (temp file + rename)."""
+        manifest_file = self._get_manifest_file(chapter_dir)
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        data["updated_at"] = datetime.now().isoformat()
+        tmp_file = manifest_file.with_name(f"{MANIFEST_FILE}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_file, manifest_file)
+        # Record the directory mtime (changed by the rename) for _read_manifest
+        dir_stat = manifest_file.parent.stat()
+        os.utime(manifest_file, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    
+    def _scan_manifest(self, chapter_dir: Path) -> Dict[str, Any]:
+        """Build manifest entries from the summary and MP3 files on disk."""
+        chapters: Dict[str, Dict[str, Any]] = {}
+        summaries_dir = chapter_dir / "summaries"
+        if not summaries_dir.exists():
+            return {"chapters": chapters}
+        
+        for chapter_file in chapter_dir.glob('*.md'):
+            entry = {}
+            if self.get_summary(chapter_dir, chapter_file.name):
+                summary_file = self._get_summary_file(chapter_dir, chapter_file.name)
+                entry["has_summary"] = True
+                entry["summary_updated_at"] = datetime.fromtimestamp(summary_file.stat().st_mtime).isoformat()
+            mp3_file = self._get_mp3_file(chapter_dir, chapter_file.name)
+            if mp3_file.exists():
+                stat = mp3_file.stat()
+                if stat.st_size > MIN_MP3_SIZE:
+                    entry["mp3_size"] = stat.st_size
+                    entry["mp3_updated_at"] = datetime.fromtimestamp(stat.st_mtime).isoformat()
+            if entry:
+                chapters[chapter_file.name] = entry
+        
+        return {"chapters": chapters}
+    
+    def _update_manifest(self, chapter_dir: Path, chapter_filename: str, **fields):
+        """
+        Update one chapter entry of the manifest.
+        Fields set to None are removed from the entry.
+        """
+        with self._manifest_lock:
+            try:
+                data = self._read_manifest(chapter_dir) or self._scan_manifest(chapter_dir)
+                entry = data["chapters"].setdefault(chapter_filename, {})
+                for key, value in fields.items():
+                    if value is None:
+                        entry.pop(key, None)
+                    else:
+                        entry[key] = value
+                if not entry:
+                    del data["chapters"][chapter_filename]
+                self._write_manifest(chapter_dir, data)
+            except Exception as e:
+                logger.error(f"[Summary] Failed to update manifest: {e}")
+    
+    def get_manifest(self, chapter_dir: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        Get summary/MP3 state for all chapters of a directory.
+        
+        Returns a dict of chapter filename -> entry with optional keys
+        has_summary, summary_updated_at, mp3_size, mp3_updated_at.
+        The manifest is rebuilt from disk if it doesn't exist yet or files
+        in summaries/ changed since it was written.
+        """
+        data = self._read_manifest(chapter_dir)
+        if data is None:
+            with self._manifest_lock:
+                data = self._read_manifest(chapter_dir)
+                if data is None:
+                    logger.info(f"[Summary] Building manifest for: {chapter_dir}")
+                    data = self._scan_manifest(chapter_dir)
+                    # Don't create summaries/ just to record that nothing exists
+                    if (chapter_dir / "summaries").exists():
+                        try:
+                            self._write_manifest(chapter_dir, data)
+                        except Exception as e:
+                            logger.error(f"[Summary] Failed to write manifest: {e}")
+        return data["chapters"]
+    
     def get_summary(self, chapter_dir: Path, chapter_filename: str) -> Optional[Dict[str, Any]]:
         """Load existing summary from file. Returns None if invalid or incomplete."""
         summary_file = self._get_summary_file(chapter_dir, chapter_filename)
@@ -69,6 +421,12 @@ class SummaryService:
             summary_file.parent.mkdir(parents=True, exist_ok=True)
             summary_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
             logger.info(f"[Summary] Saved: {summary_file}")
+            has_summary = bool(data.get('voice_script'))
+            self._update_manifest(
+                chapter_dir, chapter_filename,
+                has_summary=True if has_summary else None,
+                summary_updated_at=datetime.now().isoformat() if has_summary else None,
+            )
             return True
         except Exception as e:
             logger.error(f"[Summary] Failed to save: {e}")
@@ -87,13 +445,14 @@ class SummaryService:
             try:
                 file_size = mp3_file.stat().st_size
                 # Only consider valid if > 1KB (empty/partial files are invalid)
-                if file_size > 1024:
+                if file_size > MIN_MP3_SIZE:
                     return mp3_file
                 else:
                     # Try to delete invalid empty file
                     logger.warning(f"[Summary] Removing invalid MP3 (too small): {mp3_file}")
                     try:
                         mp3_file.unlink()
+                        self._update_manifest(chapter_dir, chapter_filename, mp3_size=None, mp3_updated_at=None)
                     except PermissionError:
                         logger.warning(f"[Summary] Cannot delete MP3 (in use): {mp3_file}")
                         return None  # Don't regenerate if file is in use
@@ -102,17 +461,112 @@ class SummaryService:
         return None
     
     def delete_mp3(self, chapter_dir: Path, chapter_filename: str) -> bool:
-        """Delete MP3 file if exists."""
+        """Delete MP3 file if exists, cancelling any in-flight synthesis of it."""
         mp3_file = self._get_mp3_file(chapter_dir, chapter_filename)
+        synthesis = self._mp3_synthesis.pop(str(mp3_file), None)
+        if synthesis and synthesis.task:
+            logger.info(f"[Summary] Cancelling in-flight MP3 synthesis: {mp3_file}")
+            synthesis.task.cancel()
         if mp3_file.exists():
             try:
                 mp3_file.unlink()
                 logger.info(f"[Summary] Deleted MP3: {mp3_file}")
+                self._update_manifest(chapter_dir, chapter_filename, mp3_size=None, mp3_updated_at=None)
                 return True
             except Exception as e:
                 logger.error(f"[Summary] Failed to delete MP3: {e}")
         return False
     
+    def get_mp3_synthesis(self, chapter_dir: Path, chapter_filename: str) -> Optional[MP3Synthesis]:
+        """Get the in-flight MP3 synthesis for a chapter, if any."""
+        return self._mp3_synthesis.get(str(self._get_mp3_file(chapter_dir, chapter_filename)))
+    
+    def start_mp3_synthesis(
+        self,
+        chapter_dir: Path,
+        chapter_filename: str,
+        voice_script: str,
+        lang: str = 'zh'
+    ) -> MP3Synthesis:
+        """
+        Start synthesizing a chapter MP3, or join the synthesis already running.
+        
+        Runs as a background task so it completes (and fills the cache) even
+        if every listener disconnects.
+        """
+        key = str(self._get_mp3_file(chapter_dir, chapter_filename))
+        synthesis = self._mp3_synthesis.get(key)
+        if synthesis is None:
+            synthesis = MP3Synthesis()
+            self._mp3_synthesis[key] = synthesis
+            voice = TTS_VOICES.get(lang, DEFAULT_TTS_VOICE)
+            synthesis.task = asyncio.create_task(
+                self._run_mp3_synthesis(synthesis, chapter_dir, chapter_filename, voice_script, voice)
+            )
+        return synthesis
+    
+    async def _run_mp3_synthesis(
+        self,
+        synthesis: MP3Synthesis,
+        chapter_dir: Path,
+        chapter_filename: str,
+        voice_script: str,
+        voice: str
+    ) -> Path:
+        """
+        Stream sentence audio to listeners and to a .part file, then commit it.
+        
+        Sentences come from the shared TTS cache; only uncached ones are
+        synthesized (concurrently, ahead of playback).
+        """
+        mp3_file = self._get_mp3_file(chapter_dir, chapter_filename)
+        tmp_file = mp3_file.with_name(mp3_file.name + ".part")
+        error: Optional[Exception] = None
+        
+        with track_job("mp3"):
+            try:
+                mp3_file.parent.mkdir(parents=True, exist_ok=True)
+                
+                sentences = speakable_sentences(voice_script)
+                if not sentences:
+                    raise ValueError("Voice script has no speakable text")
+                cached = sum(1 for s in sentences if self._tts_cache.get(s, voice))
+                logger.info(
+                    f"[Summary] Generating MP3 with voice {voice} "
+                    f"({len(sentences)} sentences, {cached} cached)..."
+                )
+                with open(tmp_file, 'wb') as f:
+                    async for sentence_file in self._tts_cache.iter_sentence_audio(sentences, voice):
+                        data = read_audio_frames(str(sentence_file))
+                        f.write(data)
+                        await synthesis.publish(data)
+                os.replace(tmp_file, mp3_file)
+                if cached < len(sentences):
+                    await asyncio.to_thread(self._tts_cache.prune)
+                
+                file_size = mp3_file.stat().st_size
+                logger.info(f"[Summary] MP3 generated: {mp3_file} ({file_size / 1024:.1f} KB)")
+                valid = file_size > MIN_MP3_SIZE
+                self._update_manifest(
+                    chapter_dir, chapter_filename,
+                    mp3_size=file_size if valid else None,
+                    mp3_updated_at=datetime.now().isoformat() if valid else None,
+                )
+                return mp3_file
+            
+            except asyncio.CancelledError:
+                error = RuntimeError("MP3 synthesis was cancelled")
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if error is not None and tmp_file.exists():
+                    tmp_file.unlink()
+                if self._mp3_synthesis.get(str(mp3_file)) is synthesis:
+                    del self._mp3_synthesis[str(mp3_file)]
+                await synthesis.finish(error)
+    
     async def generate_mp3(
         self, 
         chapter_dir: Path, 
@@ -120,29 +574,10 @@ class SummaryService:
         voice_script: str,
         lang: str = 'zh'
     ) -> Optional[Path]:
-        """Generate MP3 from voice script using edge-tts."""
-        import edge_tts
-        
-        mp3_file = self._get_mp3_file(chapter_dir, chapter_filename)
-        
-        # Select voice based on language
-        voices = {
-            'zh': 'zh-CN-YunjianNeural',  # Chinese male voice
-            'en': 'en-US-GuyNeural',       # English male voice
-        }
-        voice = voices.get(lang, 'zh-CN-YunjianNeural')
-        
+        """Generate MP3 from voice script using edge-tts (shares in-flight synthesis)."""
+        synthesis = self.start_mp3_synthesis(chapter_dir, chapter_filename, voice_script, lang)
         try:
-            mp3_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            logger.info(f"[Summary] Generating MP3 with voice {voice}...")
-            communicate = edge_tts.Communicate(voice_script, voice)
-            await communicate.save(str(mp3_file))
-            
-            file_size = mp3_file.stat().st_size
-            logger.info(f"[Summary] MP3 generated: {mp3_file} ({file_size / 1024:.1f} KB)")
-            return mp3_file
-            
+            return await synthesis.wait()
         except Exception as e:
             logger.error(f"[Summary] Failed to generate MP3: {e}")
             return None
@@ -153,7 +588,9 @@ class SummaryService:
         chapter_title: str,
         domain: str,
         target_lang: str = 'en',
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        force: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Generate summary for a chapter using LLM.
@@ -163,11 +600,46 @@ class SummaryService:
             chapter_title: Title of the chapter
             domain: Domain/field of the book (e.g., "software engineering")
             model: LLM model to use
+            force: Skip the response cache and always call the LLM
+            on_event: Called (from this thread) with {"type": "field", "field",
+                "index", "value"} as each array item (index) or whole field
+                (index None) of the response completes, and with
+                {"type": "section", "current", "total"} as map-reduce notes finish.
+                Not called on a cache hit.
             
         Returns:
             Summary dict with key_points, conclusions, examples, voice_script
         """
         model = model or self.default_model
+        
+        cache_key = self._summary_cache.key(chapter_content, chapter_title, model, target_lang, domain)
+        if not force:
+            cached = self._summary_cache.get(cache_key)
+            if cached:
+                logger.info(f"[Summary] Cache hit for: {chapter_title} ({cache_key[:8]})")
+                return cached
+        
+        with track_job("summary") as job:
+            summary_data = self._generate_summary(
+                chapter_content, chapter_title, domain, target_lang, model, on_event
+            )
+            if summary_data.get("error"):
+                job.status = "failed"
+        # Repaired responses may be truncated; a later call should get a full one
+        if not summary_data.get("error") and not summary_data.get("repaired"):
+            self._summary_cache.put(cache_key, summary_data)
+        return summary_data
+    
+    def _generate_summary(
+        self,
+        chapter_content: str,
+        chapter_title: str,
+        domain: str,
+        target_lang: str,
+        model: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Call the LLM for a chapter summary (uncached)."""
         llm = self._create_llm(model)
         
         # Map language code to display name
@@ -218,91 +690,201 @@ You must respond with a valid JSON object (no markdown code blocks) containing:
 - ALL content (key_points, conclusions, examples, voice_script) MUST be in {lang_name}
 - Do NOT output in any other language"""
 
-        def build_user_prompt(content_text: str) -> str:
-            return f"""Please generate a comprehensive summary for this chapter.
+        # Choose the mode up front: chapters above the budget are summarized
+        # section by section (map) and the notes combined (reduce)
+        content_tokens = estimate_tokens(chapter_content)
+        if content_tokens <= SUMMARY_DIRECT_TOKENS:
+            mode = "direct"
+            user_prompt = f"""Please generate a comprehensive summary for this chapter.
 
 Chapter Title: {chapter_title}
 
 Chapter Content:
-{content_text}"""
+{chapter_content}"""
+        else:
+            mode = "map_reduce"
+            sections = split_sections(chapter_content, SUMMARY_SECTION_TOKENS)
+            logger.info(
+                f"[Summary] {chapter_title}: ~{content_tokens} tokens, "
+                f"map-reduce over {len(sections)} sections"
+            )
+            notes = self._summarize_sections(llm, model, sections, chapter_title, domain, lang_name, on_event)
+            parts = "\n\n".join(
+                f"## Part {i + 1}/{len(notes)}\n{note}" for i, note in enumerate(notes)
+            )
+            user_prompt = f"""Please generate a comprehensive summary for this chapter.
+The chapter was too long to send at once; below are detailed notes on each of its
+{len(notes)} consecutive parts, in order. Summarize the chapter as a whole.
+
+Chapter Title: {chapter_title}
+
+Chapter Notes:
+{parts}"""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        logger.info(f"[Summary] Sending {len(user_prompt)} chars ({mode})")
+        content, parser = self._stream_json(
+            llm, model, messages, estimate_tokens(system_prompt + user_prompt), on_event
+        )
+        
+        # Fences, trailing prose, truncation and stray commas are repaired
+        # locally instead of paying for another call
+        summary_data = repair_json(content, parser)
+        if not summary_data:
+            logger.error(f"[Summary] No JSON object in LLM response: {content[:500]}...")
+            return {
+                "generated_at": datetime.now().isoformat(),
+                "domain": domain,
+                "model": model,
+                "chapter_title": chapter_title,
+                "key_points": ["Failed to generate - please try again"],
+                "conclusions": [],
+                "examples": [],
+                "voice_script": "",
+                "error": "JSON parse error: no JSON object in response"
+            }
+        
+        missing = [field for field in SUMMARY_FIELDS if field not in summary_data]
+        if missing or not parser.done:
+            logger.warning(
+                f"[Summary] Repaired malformed JSON for: {chapter_title}"
+                + (f" (missing {', '.join(missing)})" if missing else "")
+            )
+            for field in missing:
+                summary_data[field] = SUMMARY_FIELDS[field]()
+            summary_data["repaired"] = True
+        if not summary_data["voice_script"]:
+            summary_data["error"] = "Incomplete summary: no voice_script"
+        
+        # Add metadata
+        summary_data["generated_at"] = datetime.now().isoformat()
+        summary_data["domain"] = domain
+        summary_data["model"] = model
+        summary_data["chapter_title"] = chapter_title
+        summary_data["mode"] = mode
+        
+        logger.info(f"[Summary] Generated successfully for: {chapter_title}")
+        return summary_data
+    
+    def _stream_json(
+        self,
+        llm,
+        model: str,
+        messages: list,
+        prompt_tokens: int,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[str, IncrementalJSONParser]:
+        """
+        Stream a JSON response through the incremental parser.
+        
+        Returns the raw text and the parser; completed fields are reported to
+        on_event while the rest of the response is still streaming. If an
+        attempt is retried (rate limit, JSON-mode fallback) after fields were
+        reported, a {"type": "reset"} event tells the client to discard them.
+        """
+        json_mode = SUMMARY_JSON_MODE and model not in self._json_mode_unsupported
+        runnable = llm.bind(response_format={"type": "json_object"}) if json_mode else llm
+        fields_sent = [False]
+        
+        def emit(event: Dict[str, Any]):
+            if on_event:
+                on_event(event)
+        
+        def reset():
+            if fields_sent[0]:
+                emit({"type": "reset"})
+                fields_sent[0] = False
+        
+        def stream_once():
+            reset()
+            parser = IncrementalJSONParser()
+            output = []
+            for chunk in runnable.stream(messages):
+                llm_usage.add_usage(chunk.usage_metadata)
+                if not chunk.content:
+                    continue
+                if not output:
+                    llm_usage.mark_first_token()
+                output.append(chunk.content)
+                for field, index, value in parser.feed(chunk.content):
+                    fields_sent[0] = True
+                    emit({"type": "field", "field": field, "index": index, "value": value})
+            return "".join(output), parser
+        
+        try:
+            return llm_limiter.run(
+                model,
+                prompt_tokens + SUMMARY_OUTPUT_TOKENS,
+                stream_once,
+                count_tokens=lambda result: prompt_tokens + estimate_tokens(result[0]),
+            )
+        except Exception as e:
+            if json_mode and "response_format" in str(e):
+                logger.warning(f"[Summary] {model} does not support JSON mode, using prompt-only JSON: {e}")
+                self._json_mode_unsupported.add(model)
+                reset()
+                return self._stream_json(llm, model, messages, prompt_tokens, on_event)
+            raise
+    
+    def _summarize_sections(
+        self,
+        llm,
+        model: str,
+        sections: List[str],
+        chapter_title: str,
+        domain: str,
+        lang_name: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[str]:
+        """Map step: take detailed notes on each section in parallel (order preserved)."""
+        system_prompt = f"""You are a senior expert in **{domain}** taking notes on one part of a book chapter.
+Write concise but complete notes in {lang_name} as a markdown bullet list:
+- every key idea and argument in this part
+- conclusions the author draws
+- examples, case studies and analogies (with what each illustrates)
+Output ONLY the notes."""
+        done_lock = threading.Lock()
+        done = [0]
+        
+        def summarize(index: int) -> str:
+            user_prompt = f"""Chapter Title: {chapter_title}
+Part {index + 1} of {len(sections)}:
 
-        def try_generate(content_text: str):
-            """Try to generate summary with given content."""
-            user_prompt = build_user_prompt(content_text)
+{sections[index]}"""
             messages = [
                 SystemMessage(content=system_prompt),
                 HumanMessage(content=user_prompt)
             ]
-            return llm.invoke(messages)
-        
-        # Try with full content first, truncate on token error
-        content_to_use = chapter_content
-        max_retries = 2
+            estimated = estimate_tokens(system_prompt + user_prompt) + SECTION_NOTES_TOKENS
+            response = llm_limiter.run(model, estimated, lambda: llm.invoke(messages))
+            logger.info(f"[Summary] {chapter_title}: notes for part {index + 1}/{len(sections)} done")
+            if on_event:
+                with done_lock:
+                    done[0] += 1
+                    on_event({"type": "section", "current": done[0], "total": len(sections)})
+            return response.content.strip()
         
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"[Summary] Attempt {attempt + 1}: sending {len(content_to_use)} chars")
-                response = try_generate(content_to_use)
-                content = response.content.strip()
-                
-                # Try to parse JSON from response
-                # Handle possible markdown code blocks
-                if content.startswith("```"):
-                    # Extract JSON from code block
-                    lines = content.split("\n")
-                    json_lines = []
-                    in_block = False
-                    for line in lines:
-                        if line.startswith("```") and not in_block:
-                            in_block = True
-                            continue
-                        elif line.startswith("```") and in_block:
-                            break
-                        elif in_block:
-                            json_lines.append(line)
-                    content = "\n".join(json_lines)
-                
-                summary_data = json.loads(content)
-                
-                # Add metadata
-                summary_data["generated_at"] = datetime.now().isoformat()
-                summary_data["domain"] = domain
-                summary_data["model"] = model
-                summary_data["chapter_title"] = chapter_title
-                
-                logger.info(f"[Summary] Generated successfully for: {chapter_title}")
-                return summary_data
-                
-            except Exception as e:
-                error_str = str(e).lower()
-                # Check if it's a token limit error
-                if any(kw in error_str for kw in ['token', 'length', 'too long', 'context', 'maximum']):
-                    if attempt < max_retries - 1:
-                        # Truncate to 60k chars and retry
-                        truncate_size = 60000
-                        logger.warning(f"[Summary] Token limit hit, truncating to {truncate_size} chars and retrying...")
-                        content_to_use = chapter_content[:truncate_size]
-                        continue
-                
-                # Check if it's a JSON parse error
-                if isinstance(e, json.JSONDecodeError):
-                    logger.error(f"[Summary] Failed to parse LLM response as JSON: {e}")
-                    logger.error(f"[Summary] Response was: {response.content[:500]}...")
-                    return {
-                        "generated_at": datetime.now().isoformat(),
-                        "domain": domain,
-                        "model": model,
-                        "chapter_title": chapter_title,
-                        "key_points": ["Failed to generate - please try again"],
-                        "conclusions": [],
-                        "examples": [],
-                        "voice_script": "",
-                        "error": f"JSON parse error: {str(e)}"
-                    }
-                
-                logger.error(f"[Summary] Generation failed: {e}")
-                raise
-
+        # Worker threads don't inherit the usage job of this thread
+        job = llm_usage.current_job()
+        with ThreadPoolExecutor(max_workers=SUMMARY_MAP_CONCURRENCY) as executor:
+            return list(executor.map(lambda i: llm_usage.run_in(job, summarize, i), range(len(sections))))
 
 # Singleton instance
 summary_service = SummaryService()
+
+
+def _collect_tts_metrics():
+    """Seconds of audio synthesized vs. seconds spent synthesizing (for /metrics)."""
+    yield ("tts_audio_seconds_total", "counter", "Seconds of TTS audio synthesized.",
+           [("", {}, TTS_STATS["audio_seconds"])])
+    yield ("tts_synthesis_seconds_total", "counter", "Seconds spent in TTS synthesis.",
+           [("", {}, TTS_STATS["synthesis_seconds"])])
+
+
+metrics.register_cache("summary_llm", lambda: summary_service._summary_cache.stats)
+metrics.register_cache("tts_sentence", lambda: TTS_STATS)
+metrics.add_collector(_collect_tts_metrics)
@@ -10,13 +10,17 @@ import os
 import re
 import json
 import logging
+from collections import deque
 from pathlib import Path
 from typing import Callable, Optional
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from .llm_clients import llm_clients
+from .llm_usage import llm_usage
+from .rate_limiter import llm_limiter, estimate_tokens
+
 # Load environment variables
 load_dotenv()
 
@@ -34,9 +38,104 @@ LANG_NAMES = {
 # 80K chars ≈ 25K tokens, balances context preservation with API limits
 DEFAULT_CHUNK_SIZE = 80000
 
-# Max retries for LLM validation failures
+# Max retries for LLM validation failures (transient API errors are
+# retried with backoff by the rate limiter)
 MAX_RETRIES = 2
 
+# Phrases from the system prompt that must never appear in a translation
+PROMPT_LEAK_PATTERNS = [
+    "Important rules",
+    "IMPORTANT RULES",
+    "Preserve ALL markdown",
+    "Keep ALL markdown formatting",
+    "Keep all image references",
+    "Keep image references",
+    "# Critical Requirements",
+    "# Language Reminder",
+    "Your output must be entirely in",
+    "DO NOT modify image paths",
+]
+
+# Streaming validation: letters of prose judged per sliding window, and the
+# minimum seen before the language check may abort a stream
+STREAM_WINDOW_LETTERS = 1500
+STREAM_MIN_LETTERS = 300
+
+# Chinese-character ratio bounds that count as clearly the wrong language
+# (stricter than detect_language so mixed terminology never aborts)
+STREAM_MIN_ZH_RATIO = 0.1
+STREAM_MAX_ZH_RATIO = 0.6
+
+
+class StreamValidator:
+    """
+    Incremental check of a translation while it streams.
+
+    Catches prompt leaks (matched across delta boundaries) and output in the
+    wrong language (Chinese/Latin letter counts over a sliding window of prose
+    lines; code blocks, tables and images are skipped). feed() returns the
+    reason once the output is clearly wrong so the caller can stop paying for
+    the rest of the stream.
+    """
+    
+    def __init__(self, target_lang: str):
+        self.target_lang = target_lang
+        self.chars = 0
+        self._tail = ""
+        self._tail_size = max(len(p) for p in PROMPT_LEAK_PATTERNS) - 1
+        self._line = ""
+        self._in_code = False
+        # Per-line (chinese, letters) counts inside the window
+        self._window: deque = deque()
+        self._window_zh = 0
+        self._window_letters = 0
+    
+    def feed(self, text: str) -> Optional[str]:
+        """Consume a streamed delta. Returns an abort reason, or None to continue."""
+        self.chars += len(text)
+        
+        scan = self._tail + text
+        for pattern in PROMPT_LEAK_PATTERNS:
+            if pattern in scan:
+                return f"prompt leak '{pattern}'"
+        self._tail = scan[-self._tail_size:]
+        
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        for line in lines:
+            self._add_line(line)
+        return self._check_language()
+    
+    def _add_line(self, line: str):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            self._in_code = not self._in_code
+            return
+        if self._in_code or stripped.startswith("|") or stripped.startswith("!["):
+            return
+        
+        zh = len(re.findall(r'[\u4e00-\u9fff]', stripped))
+        letters = zh + len(re.findall(r'[a-zA-Z]', stripped))
+        if not letters:
+            return
+        self._window.append((zh, letters))
+        self._window_zh += zh
+        self._window_letters += letters
+        while self._window_letters - self._window[0][1] >= STREAM_WINDOW_LETTERS:
+            old_zh, old_letters = self._window.popleft()
+            self._window_zh -= old_zh
+            self._window_letters -= old_letters
+    
+    def _check_language(self) -> Optional[str]:
+        if self._window_letters < STREAM_MIN_LETTERS:
+            return None
+        ratio = self._window_zh / self._window_letters
+        if self.target_lang == LANG_ZH and ratio < STREAM_MIN_ZH_RATIO:
+            return f"output is not Chinese (zh ratio {ratio:.2f})"
+        if self.target_lang == LANG_EN and ratio > STREAM_MAX_ZH_RATIO:
+            return f"output is not English (zh ratio {ratio:.2f})"
+        return None
+
 
 class TranslationService:
     """Service for translating documents using LLM."""
@@ -71,13 +170,13 @@ class TranslationService:
         return self.default_model
     
     def _create_llm(self, model: str, streaming: bool = False):
-        """Create a LangChain ChatOpenAI instance with optional streaming."""
-        return ChatOpenAI(
-            model=model,
-            base_url=self.base_url,
-            api_key=self.api_key,
+        """Get the shared, pooled LangChain ChatOpenAI client with optional streaming."""
+        return llm_clients.get(
+            model,
             temperature=0.3,
             streaming=streaming,
+            base_url=self.base_url,
+            api_key=self.api_key,
         )
     
     def detect_language(self, content: str) -> str:
@@ -91,8 +190,8 @@ class TranslationService:
         chinese_ratio = chinese_chars / total_chars
         return LANG_ZH if chinese_ratio > 0.3 else LANG_EN
     
-    def detect_domain(self, content: str, model: str) -> str:
-        """Detect document domain using LLM."""
+    def detect_domain(self, content: str, model: str) -> Optional[str]:
+        """Detect document domain using LLM. Returns None on failure."""
         logger.info("[Translation] Detecting document domain...")
         llm = self._create_llm(model)
         
@@ -107,13 +206,13 @@ Text sample:
 Domain:"""
         
         try:
-            response = llm.invoke(prompt)
+            response = llm_limiter.run(model, estimate_tokens(prompt) + 20, lambda: llm.invoke(prompt))
             domain = response.content.strip().lower().strip('"\'')
             logger.info(f"[Translation] Detected domain: {domain}")
             return domain
         except Exception as e:
             logger.error(f"[Translation] Failed to detect domain: {e}")
-            return "general"
+            return None
     
     def _chunk_content(self, content: str, max_chars: int = DEFAULT_CHUNK_SIZE) -> list[str]:
         """
@@ -233,16 +332,7 @@ Domain:"""
         Returns False if output appears to be system prompt or wrong language.
         """
         # Check for system prompt keywords
-        invalid_patterns = [
-            "Important rules",
-            "IMPORTANT RULES",
-            "Preserve ALL markdown",
-            "Keep ALL markdown formatting",
-            "Keep all image references",
-            "Keep image references",
-        ]
-        
-        for pattern in invalid_patterns:
+        for pattern in PROMPT_LEAK_PATTERNS:
             if pattern in output:
                 logger.warning(f"[Translation] Validation failed: found '{pattern}' in output")
                 return False
@@ -376,24 +466,55 @@ Your output must be entirely in {target_name}."""
             translated = None
             for attempt in range(MAX_RETRIES + 1):
                 try:
-                    # Use streaming for better handling of long responses
-                    output_chunks = []
-                    for chunk_response in llm.stream(messages):
-                        # Check for cancellation during streaming
-                        if self.is_cancelled(book_id):
-                            logger.info(f"[Translation] Cancelled during streaming at chunk {i+1}/{total_chunks}")
-                            # Save progress before raising
-                            self._save_progress(progress_file, {
-                                'total_chunks': total_chunks,
-                                'completed_chunks': sorted(completed_chunks),
-                                'domain': effective_domain,
-                                'model': model,
-                                'source_lang': source_lang,
-                                'target_lang': target_lang
-                            })
-                            raise InterruptedError(f"Translation cancelled for {book_id}")
-                        if chunk_response.content:
-                            output_chunks.append(chunk_response.content)
+                    # Use streaming for better handling of long responses.
+                    # Bad output is aborted early, except on the last attempt
+                    # whose output is kept regardless (see below)
+                    def stream_once():
+                        # Fresh per call: the rate limiter may re-run this after a 429
+                        validator = StreamValidator(target_lang) if attempt < MAX_RETRIES else None
+                        output_chunks = []
+                        stream = llm.stream(messages)
+                        for chunk_response in stream:
+                            # Check for cancellation during streaming
+                            if self.is_cancelled(book_id):
+                                logger.info(f"[Translation] Cancelled during streaming at chunk {i+1}/{total_chunks}")
+                                # Save progress before raising
+                                self._save_progress(progress_file, {
+                                    'total_chunks': total_chunks,
+                                    'completed_chunks': sorted(completed_chunks),
+                                    'domain': effective_domain,
+                                    'model': model,
+                                    'source_lang': source_lang,
+                                    'target_lang': target_lang
+                                })
+                                raise InterruptedError(f"Translation cancelled for {book_id}")
+                            llm_usage.add_usage(chunk_response.usage_metadata)
+                            if chunk_response.content:
+                                if not output_chunks:
+                                    llm_usage.mark_first_token()
+                                output_chunks.append(chunk_response.content)
+                                if validator:
+                                    abort_reason = validator.feed(chunk_response.content)
+                                    if abort_reason:
+                                        # Closing the generator drops the HTTP response
+                                        stream.close()
+                                        return output_chunks, abort_reason
+                        return output_chunks, None
+                    
+                    # Held in a rate-limiter slot for the whole stream; the
+                    # translation is about as long as the source chunk
+                    output_chunks, abort_reason = llm_limiter.run(
+                        model,
+                        estimate_tokens(system_prompt) + 2 * estimate_tokens(chunk),
+                        stream_once,
+                        count_tokens=lambda result: estimate_tokens(user_prompt + system_prompt + "".join(result[0])),
+                    )
+                    if abort_reason:
+                        logger.warning(
+                            f"[Translation] Chunk {i+1} stream aborted after {sum(map(len, output_chunks))} chars: "
+                            f"{abort_reason}, attempt {attempt+1}"
+                        )
+                        continue
                     output = "".join(output_chunks)
                     
                     # Validate output
@@ -410,9 +531,9 @@ Your output must be entirely in {target_name}."""
                     # Re-raise cancellation
                     raise
                 except Exception as e:
+                    # The rate limiter already retried 429s and transient errors
                     logger.error(f"[Translation] Chunk {i+1} failed: {e}")
-                    if attempt == MAX_RETRIES:
-                        raise
+                    raise
             
             # Save chunk to separate file
             self._save_chunk(target_dir, i, translated)
@@ -456,9 +577,15 @@ Your output must be entirely in {target_name}."""
         target_lang: str,
         model: str,
         book_id: str,
-        progress_callback: Optional[Callable[[int, str], None]] = None
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        domain_resolver: Optional[Callable[[str], str]] = None
     ) -> Path:
-        """Translate a source markdown document to target language."""
+        """
+        Translate a source markdown document to target language.
+        
+        domain_resolver(content) supplies the (cached) book domain; without it
+        the domain is detected by the LLM.
+        """
         logger.info(f"[Translation] Starting: {source_md_path} -> {target_lang}")
         
         content = source_md_path.read_text(encoding='utf-8')
@@ -483,7 +610,10 @@ Your output must be entirely in {target_name}."""
         else:
             if progress_callback:
                 progress_callback(1, "Detecting document domain...")
-            domain = self.detect_domain(content, model)
+            if domain_resolver:
+                domain = domain_resolver(content)
+            else:
+                domain = self.detect_domain(content, model) or "general"
         
         if progress_callback:
             progress_callback(3, "Starting translation...")
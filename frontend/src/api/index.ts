@@ -48,6 +48,39 @@ export async function fetchBook(bookId: string): Promise<Book> {
     return response.json();
 }
 
+export interface BookBootstrap {
+    book: Book;
+    lang: 'en' | 'zh';
+    languages: BookLanguages;
+    chapters: Chapter[];
+    summary_status: AllSummariesStatus | null;
+    first_chapter: { filename: string; content: string } | null;
+}
+
+/**
+ * Fetch book, languages, chapters and summary status in one request
+ */
+export async function fetchBookBootstrap(
+    bookId: string,
+    options: { lang?: string; includeContent?: boolean } = {}
+): Promise<BookBootstrap> {
+    const params = new URLSearchParams();
+    if (options.lang) {
+        params.set('lang', options.lang);
+    }
+    if (options.includeContent) {
+        params.set('include_content', 'true');
+    }
+    const query = params.toString();
+    const response = await fetch(
+        `${API_BASE}/books/${encodeURIComponent(bookId)}/bootstrap${query ? `?${query}` : ''}`
+    );
+    if (!response.ok) {
+        throw new Error('Failed to fetch book');
+    }
+    return response.json();
+}
+
 /**
  * Fetch all chapters of a book
  */
@@ -332,6 +365,25 @@ export async function getChapterContentForLang(
     return data.content;
 }
 
+/**
+ * Get server-rendered HTML of a chapter for a specific language
+ * (image URLs are already resolved by the backend)
+ */
+export async function getChapterHtmlForLang(
+    bookId: string,
+    lang: string,
+    chapterFilename: string
+): Promise<string> {
+    const response = await fetch(
+        `${API_BASE}/books/${encodeURIComponent(bookId)}/chapters/${lang}/${encodeURIComponent(chapterFilename)}/html`
+    );
+    if (!response.ok) {
+        throw new Error('Failed to fetch chapter HTML');
+    }
+    const data = await response.json();
+    return data.html;
+}
+
 // ============= Summary API =============
 
 export interface ChapterSummary {
@@ -345,6 +397,23 @@ export interface ChapterSummary {
     model?: string;
     chapter_title?: string;
     error?: string;
+    // Set when malformed or truncated LLM output was repaired locally
+    repaired?: boolean;
+}
+
+export interface SummaryStreamEvent {
+    type: 'field' | 'reset' | 'section' | 'complete' | 'error';
+    // field: a finished array item (index) or whole field (index null)
+    // reset: the LLM call was retried, fields stream again from scratch
+    field?: string;
+    index?: number | null;
+    value?: unknown;
+    // section: parts of a long chapter summarized so far
+    current?: number;
+    total?: number;
+    summary?: ChapterSummary;
+    has_mp3?: boolean;
+    message?: string;
 }
 
 /**
@@ -372,12 +441,17 @@ export async function generateChapterSummary(
     bookId: string,
     lang: string,
     chapterFilename: string,
-    model?: string
+    model?: string,
+    force = false
 ): Promise<ChapterSummary> {
     const url = new URL(`${window.location.origin}${API_BASE}/books/${encodeURIComponent(bookId)}/chapters/${lang}/${encodeURIComponent(chapterFilename)}/summary`);
     if (model) {
         url.searchParams.set('model', model);
     }
+    if (force) {
+        // Bypass the server's response cache (explicit regenerate)
+        url.searchParams.set('force', 'true');
+    }
 
     const response = await fetch(url.toString(), {
         method: 'POST',
@@ -390,6 +464,78 @@ export async function generateChapterSummary(
     return data.summary;
 }
 
+/**
+ * Generate a new summary for a chapter, receiving fields as they complete (SSE)
+ */
+export async function streamChapterSummary(
+    bookId: string,
+    lang: string,
+    chapterFilename: string,
+    onEvent: (event: SummaryStreamEvent) => void,
+    model?: string,
+    force = false,
+    signal?: AbortSignal
+): Promise<ChapterSummary> {
+    const url = new URL(`${window.location.origin}${API_BASE}/books/${encodeURIComponent(bookId)}/chapters/${lang}/${encodeURIComponent(chapterFilename)}/summary/stream`);
+    if (model) {
+        url.searchParams.set('model', model);
+    }
+    if (force) {
+        // Bypass the server's response cache (explicit regenerate)
+        url.searchParams.set('force', 'true');
+    }
+
+    const response = await fetch(url.toString(), { method: 'POST', signal });
+    if (!response.ok) {
+        const error = await response.json();
+        throw new Error(error.detail || 'Failed to generate summary');
+    }
+
+    const reader = response.body?.getReader();
+    if (!reader) {
+        throw new Error('Failed to generate summary');
+    }
+
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary: ChapterSummary | null = null;
+
+    try {
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop() || '';
+
+            for (const line of lines) {
+                if (!line.startsWith('data: ')) continue;
+                let data: SummaryStreamEvent;
+                try {
+                    data = JSON.parse(line.slice(6)) as SummaryStreamEvent;
+                } catch {
+                    continue;  // ignore parse errors
+                }
+                if (data.type === 'error') {
+                    throw new Error(data.message || 'Failed to generate summary');
+                }
+                if (data.type === 'complete' && data.summary) {
+                    summary = data.summary;
+                }
+                onEvent(data);
+            }
+        }
+    } finally {
+        reader.releaseLock();
+    }
+
+    if (!summary) {
+        throw new Error('Summary stream ended unexpectedly');
+    }
+    return summary;
+}
+
 /**
  * Save edited summary for a chapter
  */
@@ -444,6 +590,18 @@ export function getSummaryMp3Url(
     return `${API_BASE}/books/${encodeURIComponent(bookId)}/chapters/${lang}/${encodeURIComponent(chapterFilename)}/summary/mp3`;
 }
 
+/**
+ * Get streaming MP3 URL - starts playback while edge-tts is still synthesizing
+ * (serves the cached file once it exists)
+ */
+export function getSummaryMp3StreamUrl(
+    bookId: string,
+    lang: string,
+    chapterFilename: string
+): string {
+    return `${getSummaryMp3Url(bookId, lang, chapterFilename)}/stream`;
+}
+
 // ============= Batch Summary API =============
 
 export interface ChapterSummaryStatus {
@@ -31,9 +31,10 @@ const { Text } = Typography;
 interface BatchSummaryPanelProps {
     bookId: string;
     lang: string;
+    initialStatus?: AllSummariesStatus | null;  // Preloaded by the book bootstrap request
 }
 
-const BatchSummaryPanel: React.FC<BatchSummaryPanelProps> = ({ bookId, lang }) => {
+const BatchSummaryPanel: React.FC<BatchSummaryPanelProps> = ({ bookId, lang, initialStatus }) => {
     const [status, setStatus] = useState<AllSummariesStatus | null>(null);
     const [loading, setLoading] = useState(false);
     const [generating, setGenerating] = useState(false);
@@ -43,9 +44,15 @@ const BatchSummaryPanel: React.FC<BatchSummaryPanelProps> = ({ bookId, lang }) =
 
     const audioRef = useRef<HTMLAudioElement | null>(null);
     const abortControllerRef = useRef<AbortController | null>(null);
+    const initialStatusUsedRef = useRef(false);
 
-    // Load status on mount
+    // Load status on mount (use the bootstrap status once if available)
     useEffect(() => {
+        if (initialStatus && !initialStatusUsedRef.current) {
+            initialStatusUsedRef.current = true;
+            setStatus(initialStatus);
+            return;
+        }
         loadStatus();
     }, [bookId, lang]);
 
@@ -2,7 +2,7 @@
  * ChapterSummary component - Display and edit chapter summaries
  * 
  * Features:
- * - Generate summary button (calls LLM API)
+ * - Generate summary button (calls LLM API, fields appear as they stream in)
  * - Display key points, conclusions, examples
  * - Editable voice script for podcast
  * - Save edited content
@@ -18,16 +18,16 @@ import {
     CheckCircleOutlined,
     ExperimentOutlined,
     SoundOutlined,
-    PlayCircleOutlined,
-    LoadingOutlined
+    PlayCircleOutlined
 } from '@ant-design/icons';
 import {
     getChapterSummary,
-    generateChapterSummary,
+    streamChapterSummary,
     saveChapterSummary,
-    generateSummaryMp3,
     getSummaryMp3Url,
-    type ChapterSummary as ChapterSummaryType
+    getSummaryMp3StreamUrl,
+    type ChapterSummary as ChapterSummaryType,
+    type SummaryStreamEvent
 } from '../api';
 
 const { Text, Paragraph } = Typography;
@@ -47,11 +47,14 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
     const [summary, setSummary] = useState<ChapterSummaryType | null>(null);
     const [loading, setLoading] = useState(false);
     const [generating, setGenerating] = useState(false);
+    // Long chapters: parts summarized so far while generating
+    const [sectionProgress, setSectionProgress] = useState<{ current: number; total: number } | null>(null);
     const [saving, setSaving] = useState(false);
     const [editing, setEditing] = useState(false);
     const [editedScript, setEditedScript] = useState('');
     const [hasMp3, setHasMp3] = useState(false);
-    const [generatingMp3, setGeneratingMp3] = useState(false);
+    // Play from the streaming endpoint while the MP3 is being synthesized
+    const [streamingMp3, setStreamingMp3] = useState(false);
     const audioRef = useRef<HTMLAudioElement | null>(null);
 
     // Cleanup audio when chapter changes or unmounts
@@ -90,6 +93,7 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
             const result = await getChapterSummary(bookId, lang, chapterFilename);
             setSummary(result.summary);
             setHasMp3(result.has_mp3);
+            setStreamingMp3(false);
             if (result.summary?.voice_script) {
                 setEditedScript(result.summary.voice_script);
             }
@@ -100,33 +104,74 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
         }
     };
 
+    // Show each field of the summary as soon as the server has parsed it
+    const applyStreamEvent = (event: SummaryStreamEvent) => {
+        if (event.type === 'section' && event.current !== undefined && event.total !== undefined) {
+            setSectionProgress({ current: event.current, total: event.total });
+            return;
+        }
+        if (event.type === 'reset') {
+            // Retried call: drop the fields of the failed attempt
+            setSummary(null);
+            return;
+        }
+        if (event.type !== 'field' || !event.field) return;
+        const field = event.field as keyof ChapterSummaryType;
+        setSummary((prev) => {
+            const next: ChapterSummaryType = prev
+                ? { ...prev }
+                : { key_points: [], conclusions: [], examples: [], voice_script: '' };
+            if (event.index === null || event.index === undefined) {
+                (next as unknown as Record<string, unknown>)[field] = event.value;
+            } else {
+                const items = [...((next[field] as string[] | undefined) || [])];
+                items[event.index] = event.value as string;
+                (next as unknown as Record<string, unknown>)[field] = items;
+            }
+            return next;
+        });
+    };
+
     const handleGenerate = async () => {
+        const regenerate = summary !== null;
         setGenerating(true);
+        setSectionProgress(null);
+        stopAudio();
+        setHasMp3(false);  // MP3 is deleted on regenerate
+        setStreamingMp3(false);
+        setEditing(false);
+        // Fields stream in from scratch
+        setSummary(null);
         try {
-            const data = await generateChapterSummary(bookId, lang, chapterFilename);
+            // Regenerating an existing summary must produce a fresh one, not the cached response
+            const data = await streamChapterSummary(
+                bookId, lang, chapterFilename, applyStreamEvent, undefined, regenerate
+            );
             setSummary(data);
             setEditedScript(data.voice_script || '');
-            setHasMp3(false);  // MP3 is deleted on regenerate
             message.success('Summary generated successfully');
         } catch (error) {
+            // Show the last saved state instead of a half-streamed summary
+            loadSummary();
             message.error('Failed to generate summary');
             console.error('Generate error:', error);
         } finally {
             setGenerating(false);
+            setSectionProgress(null);
         }
     };
 
-    const handleGenerateMp3 = async () => {
-        setGeneratingMp3(true);
-        try {
-            await generateSummaryMp3(bookId, lang, chapterFilename);
-            setHasMp3(true);
-            message.success('MP3 generated successfully');
-        } catch (error) {
+    // Start synthesis and play it as audio arrives; the server caches the MP3
+    const handleGenerateMp3 = () => {
+        setStreamingMp3(true);
+        setHasMp3(true);
+    };
+
+    const handleMp3Error = () => {
+        if (streamingMp3) {
             message.error('Failed to generate MP3');
-            console.error('Generate MP3 error:', error);
-        } finally {
-            setGeneratingMp3(false);
+            setStreamingMp3(false);
+            setHasMp3(false);
         }
     };
 
@@ -139,6 +184,13 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
                 ...summary,
                 voice_script: editedScript,
             });
+            // Server drops the MP3 when the script changes; regenerating only
+            // synthesizes the edited sentences
+            if (editedScript !== summary.voice_script) {
+                stopAudio();
+                setHasMp3(false);
+                setStreamingMp3(false);
+            }
             setSummary(updated);
             setEditing(false);
             message.success('Summary saved successfully');
@@ -174,6 +226,11 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
                     >
                         Generate Summary
                     </Button>
+                    {sectionProgress && (
+                        <Text type="secondary">
+                            Summarizing part {sectionProgress.current}/{sectionProgress.total}...
+                        </Text>
+                    )}
                 </Space>
             </Card>
         );
@@ -286,13 +343,14 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
                     ) : (
                         <div>
                             <Paragraph style={{ whiteSpace: 'pre-wrap', marginBottom: 8 }}>
-                                {summary.voice_script}
+                                {summary.voice_script || (generating && <Spin size="small" />)}
                             </Paragraph>
                             <Space style={{ marginBottom: 8 }}>
                                 <Button
                                     size="small"
                                     icon={<EditOutlined />}
                                     onClick={() => setEditing(true)}
+                                    disabled={generating}
                                 >
                                     Edit Script
                                 </Button>
@@ -300,16 +358,20 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
                                     <audio
                                         ref={audioRef}
                                         controls
-                                        src={getSummaryMp3Url(bookId, lang, chapterFilename)}
+                                        autoPlay={streamingMp3}
+                                        src={streamingMp3
+                                            ? getSummaryMp3StreamUrl(bookId, lang, chapterFilename)
+                                            : getSummaryMp3Url(bookId, lang, chapterFilename)}
+                                        onError={handleMp3Error}
                                         style={{ height: 32 }}
                                     />
                                 ) : (
                                     <Button
                                         size="small"
                                         type="primary"
-                                        icon={generatingMp3 ? <LoadingOutlined /> : <PlayCircleOutlined />}
+                                        icon={<PlayCircleOutlined />}
                                         onClick={handleGenerateMp3}
-                                        loading={generatingMp3}
+                                        disabled={generating}
                                     >
                                         Generate MP3
                                     </Button>
@@ -352,7 +414,7 @@ const ChapterSummary: React.FC<ChapterSummaryProps> = ({
         >
             <Collapse
                 items={collapseItems}
-                defaultActiveKey={['voice_script']}
+                defaultActiveKey={generating ? ['key_points', 'voice_script'] : ['voice_script']}
                 size="small"
             />
         </Card>
@@ -25,6 +25,7 @@ interface LanguageSelectorProps {
     onLanguageChange: (lang: 'en' | 'zh') => void;
     currentLang: 'en' | 'zh';
     showTranslation?: boolean;  // Only show translation controls on source page
+    initialLanguageInfo?: BookLanguages;  // Preloaded by the book bootstrap request
 }
 
 const LANG_OPTIONS = [
@@ -40,7 +41,8 @@ const LanguageSelector: React.FC<LanguageSelectorProps> = ({
     bookId,
     onLanguageChange,
     currentLang,
-    showTranslation = false
+    showTranslation = false,
+    initialLanguageInfo
 }) => {
     const [models, setModels] = useState<string[]>([]);
     const [selectedModel, setSelectedModel] = useState<string>('');
@@ -66,6 +68,15 @@ const LanguageSelector: React.FC<LanguageSelectorProps> = ({
 
     // Load language info when bookId changes
     useEffect(() => {
+        // Already resolved by the bootstrap request, no need to refetch. The page
+        // seeds its chapters for the source language from the same payload, so
+        // onLanguageChange isn't needed here.
+        if (initialLanguageInfo) {
+            setLanguageInfo(initialLanguageInfo);
+            setLoadingLang(false);
+            return;
+        }
+
         const loadLanguageInfo = async () => {
             setLoadingLang(true);
             try {
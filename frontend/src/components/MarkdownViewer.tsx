@@ -1,5 +1,8 @@
 /**
  * MarkdownViewer component - renders markdown content
+ *
+ * Accepts either raw markdown (rendered in the browser) or HTML that was
+ * already rendered by the backend (/html endpoint).
  */
 
 import React from 'react';
@@ -8,11 +11,12 @@ import { Spin, Typography } from 'antd';
 
 interface MarkdownViewerProps {
     content: string | null;
+    html?: string | null;  // Optional: server-rendered HTML, takes precedence over content
     loading: boolean;
     bookId?: string;  // Optional: used to resolve image paths
 }
 
-const MarkdownViewer: React.FC<MarkdownViewerProps> = ({ content, loading, bookId }) => {
+const MarkdownViewer: React.FC<MarkdownViewerProps> = ({ content, html, loading, bookId }) => {
     if (loading) {
         return (
             <div style={{ padding: 48, textAlign: 'center' }}>
@@ -21,6 +25,15 @@ const MarkdownViewer: React.FC<MarkdownViewerProps> = ({ content, loading, bookI
         );
     }
 
+    if (html) {
+        return (
+            <div
+                className="markdown-content"
+                dangerouslySetInnerHTML={{ __html: html }}
+            />
+        );
+    }
+
     if (!content) {
         return (
             <div style={{ padding: 48, textAlign: 'center' }}>
@@ -19,13 +19,16 @@ import LanguageSelector from '../components/LanguageSelector';
 import ChapterSummary from '../components/ChapterSummary';
 import BatchSummaryPanel from '../components/BatchSummaryPanel';
 import { useBookStore } from '../store/useBookStore';
-import { getChaptersForLang, getChapterContentForLang } from '../api';
+import { getChaptersForLang, getChapterContentForLang, getChapterHtmlForLang } from '../api';
 
 const { Header, Sider, Content } = Layout;
 
 // Special key for source markdown
 const SOURCE_KEY = '__SOURCE__';
 
+// Use backend-rendered chapter HTML instead of parsing markdown in the browser
+const SERVER_RENDER = import.meta.env.VITE_SERVER_RENDER === 'true';
+
 const BookDetailPage: React.FC = () => {
     const { bookId } = useParams<{ bookId: string }>();
     const navigate = useNavigate();
@@ -36,22 +39,22 @@ const BookDetailPage: React.FC = () => {
     const [currentLang, setCurrentLang] = useState<'en' | 'zh'>('en');
     const [langChapters, setLangChapters] = useState<Array<{ name: string, filename: string, order: number }>>([]);
     const [langChapterContent, setLangChapterContent] = useState<string | null>(null);
+    const [langChapterHtml, setLangChapterHtml] = useState<string | null>(null);
     const [langContentLoading, setLangContentLoading] = useState(false);
     const [selectedChapterFilename, setSelectedChapterFilename] = useState<string | null>(null);
 
     const {
         currentBook,
         currentBookLoading,
+        bootstrap,
         chapters,
         chaptersLoading,
-        currentChapterFilename,
         currentChapterContent,
         chapterContentLoading,
         extracting,
         extractProgress,
-        loadBook,
+        loadBookBootstrap,
         loadChapters,
-        loadChapterContent,
         startExtraction,
         checkExtractionStatus,
         cancelExtraction,
@@ -60,8 +63,8 @@ const BookDetailPage: React.FC = () => {
 
     useEffect(() => {
         if (bookId) {
-            loadBook(bookId);
-            loadChapters(bookId);
+            // Book, chapters, languages and first chapter in one request
+            loadBookBootstrap(bookId);
             // Check if there's an ongoing extraction
             checkExtractionStatus(bookId);
         }
@@ -69,7 +72,25 @@ const BookDetailPage: React.FC = () => {
         return () => {
             clearCurrentBook();
         };
-    }, [bookId, loadBook, loadChapters, checkExtractionStatus, clearCurrentBook]);
+    }, [bookId, loadBookBootstrap, checkExtractionStatus, clearCurrentBook]);
+
+    // Start in the language the bootstrap resolved (source language), with its
+    // chapters and first chapter, as a language switch would
+    useEffect(() => {
+        if (bootstrap) {
+            setCurrentLang(bootstrap.lang);
+            setLangChapters(bootstrap.chapters);
+            const first = bootstrap.first_chapter;
+            setSelectedChapterFilename(first?.filename ?? null);
+            if (SERVER_RENDER && first) {
+                // The payload only carries markdown; fetch the rendered chapter
+                handleLangChapterClick(first.filename, bootstrap.lang);
+            } else {
+                setLangChapterHtml(null);
+                setLangChapterContent(first?.content ?? null);
+            }
+        }
+    }, [bootstrap]);
 
 
     const handleChapterSelect = (key: string) => {
@@ -79,14 +100,9 @@ const BookDetailPage: React.FC = () => {
         } else {
             setViewMode('chapter');
             setSelectedChapterFilename(key);
-            if (bookId) {
-                // If we have lang chapters loaded, use lang content loading
-                if (langChapters.length > 0) {
-                    handleLangChapterClick(key);
-                } else {
-                    loadChapterContent(bookId, key);
-                }
-            }
+            // Every chapter load goes through the language-aware (and
+            // server-render-aware) path, including the source language
+            handleLangChapterClick(key);
         }
     };
 
@@ -94,6 +110,7 @@ const BookDetailPage: React.FC = () => {
         // Reload chapters after re-split
         if (bookId) {
             loadChapters(bookId);
+            handleLanguageChange(currentLang);
             setViewMode('chapter');
         }
     };
@@ -121,6 +138,7 @@ const BookDetailPage: React.FC = () => {
                 })));
                 // Clear current chapter content
                 setLangChapterContent(null);
+                setLangChapterHtml(null);
                 setViewMode('chapter');
             } catch (error) {
                 console.error('Failed to load chapters for language:', error);
@@ -129,12 +147,23 @@ const BookDetailPage: React.FC = () => {
     };
 
     // Load chapter content for current language
-    const handleLangChapterClick = async (filename: string) => {
+    const handleLangChapterClick = async (filename: string, lang: 'en' | 'zh' = currentLang) => {
         if (!bookId) return;
         setViewMode('chapter');
         setLangContentLoading(true);
         try {
-            const content = await getChapterContentForLang(bookId, currentLang, filename);
+            if (SERVER_RENDER) {
+                try {
+                    const html = await getChapterHtmlForLang(bookId, lang, filename);
+                    setLangChapterHtml(html);
+                    return;
+                } catch (error) {
+                    console.warn('Server render failed, falling back to markdown:', error);
+                }
+            }
+            // html takes precedence over content, so drop any stale render
+            setLangChapterHtml(null);
+            const content = await getChapterContentForLang(bookId, lang, filename);
             setLangChapterContent(content);
         } catch (error) {
             console.error('Failed to load chapter content:', error);
@@ -257,6 +286,7 @@ const BookDetailPage: React.FC = () => {
                     currentLang={currentLang}
                     onLanguageChange={handleLanguageChange}
                     showTranslation={viewMode === 'source'}
+                    initialLanguageInfo={bootstrap?.languages}
                 />
             </Header>
             <Layout>
@@ -279,8 +309,8 @@ const BookDetailPage: React.FC = () => {
                             selectedKeys={
                                 viewMode === 'source'
                                     ? [SOURCE_KEY]
-                                    : currentChapterFilename
-                                        ? [currentChapterFilename]
+                                    : selectedChapterFilename
+                                        ? [selectedChapterFilename]
                                         : []
                             }
                             items={menuItems}
@@ -309,6 +339,7 @@ const BookDetailPage: React.FC = () => {
                                 <BatchSummaryPanel
                                     bookId={bookId}
                                     lang={currentLang}
+                                    initialStatus={bootstrap?.lang === currentLang ? bootstrap.summary_status : null}
                                 />
                             )}
                             {/* Chapter Summary */}
@@ -321,6 +352,7 @@ const BookDetailPage: React.FC = () => {
                             )}
                             <MarkdownViewer
                                 content={langChapterContent ?? currentChapterContent}
+                                html={langChapterHtml}
                                 loading={langContentLoading || chapterContentLoading}
                                 bookId={bookId}
                             />
@@ -3,10 +3,11 @@
  */
 
 import { create } from 'zustand';
-import type { Book, Chapter, ExtractProgress } from '../api';
+import type { Book, BookBootstrap, Chapter, ExtractProgress } from '../api';
 import {
     fetchBooks,
     fetchBook,
+    fetchBookBootstrap,
     fetchChapters,
     fetchChapterContent,
     extractBook,
@@ -23,6 +24,8 @@ interface BookState {
     // Current book
     currentBook: Book | null;
     currentBookLoading: boolean;
+    // Languages and summary status resolved together with the book
+    bootstrap: BookBootstrap | null;
 
     // Chapters
     chapters: Chapter[];
@@ -40,6 +43,7 @@ interface BookState {
     // Actions
     loadBooks: () => Promise<void>;
     loadBook: (bookId: string) => Promise<void>;
+    loadBookBootstrap: (bookId: string) => Promise<void>;
     loadChapters: (bookId: string) => Promise<void>;
     loadChapterContent: (bookId: string, chapterFilename: string) => Promise<void>;
     startExtraction: (bookId: string) => Promise<void>;
@@ -56,6 +60,7 @@ export const useBookStore = create<BookState>((set, get) => ({
 
     currentBook: null,
     currentBookLoading: false,
+    bootstrap: null,
 
     chapters: [],
     chaptersLoading: false,
@@ -91,6 +96,30 @@ export const useBookStore = create<BookState>((set, get) => ({
         }
     },
 
+    loadBookBootstrap: async (bookId: string) => {
+        set({ currentBookLoading: true, chaptersLoading: true, chapters: [] });
+        try {
+            const data = await fetchBookBootstrap(bookId, { includeContent: true });
+            set({
+                currentBook: data.book,
+                currentBookLoading: false,
+                bootstrap: data,
+                chapters: data.chapters,
+                chaptersLoading: false,
+                currentChapterFilename: data.first_chapter?.filename ?? null,
+                currentChapterContent: data.first_chapter?.content ?? null,
+            });
+        } catch (error) {
+            set({
+                currentBook: null,
+                currentBookLoading: false,
+                bootstrap: null,
+                chapters: [],
+                chaptersLoading: false,
+            });
+        }
+    },
+
     loadChapters: async (bookId: string) => {
         set({ chaptersLoading: true, chapters: [] });
         try {
@@ -208,6 +237,7 @@ export const useBookStore = create<BookState>((set, get) => ({
         const { extracting } = get();
         set({
             currentBook: null,
+            bootstrap: null,
             chapters: [],
             currentChapterFilename: null,
             currentChapterContent: null,
@@ -6,16 +6,41 @@
 1. 基本用法: python merge_audio_video.py audio.mp3 video.mp4
 2. 指定输出: python merge_audio_video.py audio.mp3 video.mp4 -o output.mp4
 3. 自定义参数: python merge_audio_video.py audio.mp3 video.mp4 --fps 30
+4. 强制重新编码: python merge_audio_video.py audio.mp3 video.mp4 --transcode
+5. 静态图片视频: python merge_audio_video.py audio.mp3 static/bf.png -o output.mp4
+6. 并行分段编码: python merge_audio_video.py audio.mp3 video.mp4 --transcode -j 4
 
 特性:
 - 自动循环视频以匹配音频长度
 - 保持视频原始分辨率和帧率
 - 支持自定义输出参数
+
+快速模式（默认，需要 ffmpeg）:
+- 用 ffmpeg -stream_loop 循环背景视频，视频流直接复制，不重新编码
+- 在关键帧处截断，只把音频编码为 AAC 后封装
+- 指定了 --fps / --bitrate、背景视频编码无法直接放入 MP4 或 ffmpeg 失败时，
+  回退到 moviepy 重新编码
+
+并行分段编码（重新编码时指定 -j/--jobs N）:
+- 按 GOP 边界把时间线切成 N 段，每段由独立的 ffmpeg 进程并行编码
+- 各段无损拼接（concat 复制），再封装 AAC 音频，并显示每段的编码进度
+
+静态图片模式（第二个参数为图片时）:
+- 一张图片 + 音频，以极低帧率（默认 1 fps）和 -tune stillimage 编码
+- 长时间播客视频也只需几秒即可生成，文件体积远小于循环视频
 """
 
 import argparse
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Callable, List, Optional
 
 try:
     # moviepy 2.x 版本
@@ -26,17 +51,20 @@ except ImportError:
 
 
 def merge_audio_video(audio_path: str, video_path: str, output_path: str = None, 
-                       fps: int = None, preset: str = 'medium', bitrate: str = None):
+                       fps: int = None, preset: str = None, bitrate: str = None,
+                       transcode: bool = False, jobs: int = 1) -> bool:
     """
-    将音频和视频合成为最终视频文件
+    将音频和视频合成为最终视频文件，返回是否成功
     
     参数:
         audio_path: MP3 音频文件路径
-        video_path: MP4 视频文件路径
+        video_path: MP4 视频文件路径（或图片路径，使用静态图片模式）
         output_path: 输出文件路径（默认自动生成）
         fps: 输出视频帧率（默认使用原视频帧率）
-        preset: 编码预设 (ultrafast, fast, medium, slow) - 影响编码速度和质量
+        preset: 编码预设 (ultrafast, veryfast, fast, medium, slow) - 影响编码速度和质量（默认: 静态图片 veryfast，视频 medium）
         bitrate: 视频比特率，如 '2000k' (默认自动计算以保持500MB/30分钟)
+        transcode: 强制重新编码（默认先尝试视频流复制的快速模式）
+        jobs: 重新编码时的并行分段数（大于 1 时用 ffmpeg 并行分段编码）
     """
     print("=" * 60)
     print("🎬 音频视频合成工具")
@@ -45,11 +73,40 @@ def merge_audio_video(audio_path: str, video_path: str, output_path: str = None,
     # 检查文件是否存在
     if not os.path.exists(audio_path):
         print(f"❌ 错误: 音频文件不存在 - {audio_path}")
-        return
+        return False
     
     if not os.path.exists(video_path):
         print(f"❌ 错误: 视频文件不存在 - {video_path}")
-        return
+        return False
+    
+    # 确定输出文件
+    if output_path is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_path = f'merged_video_{timestamp}.mp4'
+    
+    # 确保输出目录存在
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    
+    # 静态图片模式
+    if os.path.splitext(video_path)[1].lower() in IMAGE_EXTENSIONS:
+        return still_image_merge(audio_path, video_path, output_path, fps or STILL_IMAGE_FPS,
+                                 preset or STILL_IMAGE_PRESET)
+    
+    preset = preset or 'medium'
+    
+    # 快速模式：不需要改变帧率/比特率时，直接复制视频流
+    if not transcode and fps is None and bitrate is None:
+        if stream_copy_merge(audio_path, video_path, output_path):
+            return True
+        print("\n🔁 回退到重新编码模式")
+    
+    # 并行分段编码
+    if jobs > 1:
+        if parallel_transcode_merge(audio_path, video_path, output_path, jobs, fps, preset, bitrate):
+            return True
+        print("\n🔁 回退到 moviepy 单进程编码")
     
     print(f"\n📁 加载文件...")
     print(f"  音频: {os.path.basename(audio_path)}")
@@ -101,16 +158,6 @@ def merge_audio_video(audio_path: str, video_path: str, output_path: str = None,
         # moviepy 1.x
         final_video = final_video.set_audio(audio_clip)
     
-    # 确定输出文件
-    if output_path is None:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_path = f'merged_video_{timestamp}.mp4'
-    
-    # 确保输出目录存在
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
     print(f"\n🎥 正在渲染最终视频...")
     print(f"  输出: {output_path}")
     
@@ -205,6 +252,380 @@ def merge_audio_video(audio_path: str, video_path: str, output_path: str = None,
     print(f"  文件大小: {output_size / 1024 / 1024:.2f} MB")
     print(f"  视频时长: {format_duration(audio_duration)}")
     print("=" * 60)
+    return True
+
+
+# 可以直接复制进 MP4 容器的视频编码
+STREAM_COPY_CODECS = {'h264', 'hevc', 'mpeg4', 'av1'}
+
+# 作为背景时使用静态图片模式的文件类型
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.bmp'}
+
+# 并行分段编码的关键帧间隔（秒）；分段边界对齐到 GOP
+SEGMENT_GOP_SECONDS = 2
+
+# 静态图片模式的默认帧率、关键帧间隔（秒）和编码预设
+STILL_IMAGE_FPS = 1
+STILL_IMAGE_GOP_SECONDS = 120
+STILL_IMAGE_PRESET = 'veryfast'
+
+
+def find_ffmpeg() -> Optional[str]:
+    """查找 ffmpeg：优先系统 PATH，其次 moviepy 自带的 imageio-ffmpeg"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def probe_video(ffmpeg: str, video_path: str) -> dict:
+    """
+    获取视频编码、时长和关键帧时间
+
+    有 ffprobe 时读取每个关键帧的时间；否则解析 ffmpeg -i 的输出，
+    此时 keyframes 为 None。
+    """
+    info = {'codec': None, 'duration': None, 'fps': None, 'keyframes': None}
+
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=codec_name,avg_frame_rate:format=duration',
+             '-of', 'default=noprint_wrappers=1', video_path],
+            capture_output=True, text=True
+        )
+        for line in result.stdout.splitlines():
+            key, _, value = line.partition('=')
+            if key == 'codec_name':
+                info['codec'] = value
+            elif key == 'duration' and value not in ('', 'N/A'):
+                info['duration'] = float(value)
+            elif key == 'avg_frame_rate' and '/' in value:
+                num, den = value.split('/')
+                if float(den):
+                    info['fps'] = float(num) / float(den)
+
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path],
+            capture_output=True, text=True
+        )
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(',')
+            if 'K' in flags and pts not in ('', 'N/A'):
+                keyframes.append(float(pts))
+        info['keyframes'] = sorted(keyframes) or None
+        return info
+
+    # 没有 ffprobe：从 ffmpeg -i 的输出中解析
+    result = subprocess.run([ffmpeg, '-hide_banner', '-i', video_path], capture_output=True, text=True)
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info['duration'] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    match = re.search(r'Video: (\w+)', result.stderr)
+    if match:
+        info['codec'] = match.group(1)
+    match = re.search(r'(\d+(?:\.\d+)?) fps', result.stderr)
+    if match:
+        info['fps'] = float(match.group(1))
+    return info
+
+
+def get_audio_duration(audio_path: str) -> float:
+    """获取音频时长：MP3 直接按帧统计，其他格式用 moviepy"""
+    if audio_path.lower().endswith('.mp3'):
+        from mp3_concat import iter_frames
+        with open(audio_path, 'rb') as f:
+            data = f.read()
+        samples = 0
+        sample_rate = None
+        for _, header in iter_frames(data):
+            samples += header.samples
+            sample_rate = header.sample_rate
+        if sample_rate:
+            return samples / sample_rate
+
+    clip = AudioFileClip(audio_path)
+    try:
+        return clip.duration
+    finally:
+        clip.close()
+
+
+def keyframe_aligned_end(target: float, video_duration: float, keyframes: Optional[List[float]]) -> float:
+    """
+    循环播放背景视频时，返回不早于 target 的第一个关键帧时间
+
+    在关键帧处截断可以保证最后一个 GOP 完整，不会出现花屏；
+    没有关键帧信息时直接返回 target。
+    """
+    if not keyframes or not video_duration:
+        return target
+    loop = int(target // video_duration)
+    for offset in (loop, loop + 1):
+        for keyframe in keyframes:
+            end = offset * video_duration + keyframe
+            if end >= target - 1e-3:
+                return end
+    return target
+
+
+def run_ffmpeg(cmd: List[str], duration: float, label: str = '进度',
+               on_progress: Optional[Callable[[float], None]] = None):
+    """
+    运行 ffmpeg 并显示进度（解析 -progress 输出）
+
+    指定 on_progress 时不打印，改为回调进度百分比（用于多个 ffmpeg 并行）。
+    失败时抛出 RuntimeError，包含 ffmpeg 的错误输出。
+    """
+    cmd = cmd[:1] + ['-hide_banner', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1'] + cmd[1:]
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key == 'out_time_us' and value.isdigit() and duration:
+                percent = min(100.0, int(value) / 1e6 / duration * 100)
+                if on_progress:
+                    on_progress(percent)
+                else:
+                    print(f"\r  {label}: {percent:5.1f}%", end='', flush=True)
+        process.wait()
+        if not on_progress:
+            print()
+        if process.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"ffmpeg 退出码 {process.returncode}: {message[-500:]}")
+
+
+def stream_copy_merge(audio_path: str, video_path: str, output_path: str) -> bool:
+    """
+    快速模式：循环复制背景视频流（不重新编码），并封装 AAC 音频
+
+    返回 True 表示成功；不满足条件或 ffmpeg 失败时返回 False，由调用方回退到重新编码。
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("⚠️  未找到 ffmpeg，无法使用快速模式")
+        return False
+
+    info = probe_video(ffmpeg, video_path)
+    if info['codec'] not in STREAM_COPY_CODECS or not info['duration']:
+        print(f"⚠️  背景视频编码 ({info['codec']}) 无法直接复制到 MP4，需要重新编码")
+        return False
+
+    audio_duration = get_audio_duration(audio_path)
+    end = keyframe_aligned_end(audio_duration, info['duration'], info['keyframes'])
+
+    print(f"\n⚡ 快速模式（视频流复制，不重新编码）")
+    print(f"  音频时长: {format_duration(audio_duration)}")
+    print(f"  视频时长: {format_duration(info['duration'])}（{info['codec']}，循环 {int(end // info['duration']) + 1} 次）")
+    if end > audio_duration:
+        print(f"  在关键帧处截断: {end:.2f}s（末尾补 {end - audio_duration:.2f}s 静音）")
+
+    tmp_output = f"{output_path}.part.mp4"
+    cmd = [
+        ffmpeg, '-y',
+        '-stream_loop', '-1', '-i', video_path,
+        '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'copy',
+        '-c:a', 'aac', '-b:a', '128k', '-af', 'apad',
+        '-t', f"{end:.3f}",
+        '-movflags', '+faststart',
+        tmp_output,
+    ]
+    try:
+        run_ffmpeg(cmd, end, '封装进度')
+        os.replace(tmp_output, output_path)
+    except Exception as e:
+        print(f"⚠️  快速模式失败: {e}")
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        return False
+
+    output_size = os.path.getsize(output_path)
+    print(f"\n✅ 合成成功！")
+    print(f"  输出文件: {output_path}")
+    print(f"  文件大小: {output_size / 1024 / 1024:.2f} MB")
+    print(f"  视频时长: {format_duration(end)}")
+    print("=" * 60)
+    return True
+
+
+def parallel_transcode_merge(audio_path: str, video_path: str, output_path: str, workers: int,
+                             fps: Optional[int] = None, preset: str = 'medium',
+                             bitrate: Optional[str] = None) -> bool:
+    """
+    并行分段编码：按 GOP 边界切分时间线，多个 ffmpeg 进程同时编码，再无损拼接
+
+    每段从循环背景视频的对应位置开始编码固定帧数，开头必为关键帧，
+    所以各段可以用 concat 直接复制拼接。返回 False 时由调用方回退到 moviepy。
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("⚠️  未找到 ffmpeg，无法使用并行分段编码")
+        return False
+
+    info = probe_video(ffmpeg, video_path)
+    if not info['duration']:
+        print("⚠️  无法读取背景视频时长，无法使用并行分段编码")
+        return False
+
+    audio_duration = get_audio_duration(audio_path)
+    fps = fps or round(info['fps'] or 30)
+    bitrate = bitrate or '2000k'
+
+    # 按 GOP 切分：每段包含整数个 GOP
+    gop = fps * SEGMENT_GOP_SECONDS
+    total_frames = int(audio_duration * fps) + 1
+    total_gops = (total_frames + gop - 1) // gop
+    gops_per_segment = max(1, (total_gops + workers - 1) // workers)
+    segments = []
+    for start_frame in range(0, total_frames, gops_per_segment * gop):
+        segments.append((start_frame, min(gops_per_segment * gop, total_frames - start_frame)))
+
+    # 每个 x264 进程分到的线程数
+    threads = max(1, (os.cpu_count() or 1) // len(segments))
+
+    print(f"\n🧩 并行分段编码")
+    print(f"  音频时长: {format_duration(audio_duration)}")
+    print(f"  分段: {len(segments)} 段 × 约 {format_duration(gops_per_segment * gop / fps)}（GOP {SEGMENT_GOP_SECONDS}s）")
+    print(f"  帧率: {fps} fps，视频比特率: {bitrate}，编码预设: {preset}")
+
+    segments_dir = tempfile.mkdtemp(prefix='segments_', dir=os.path.dirname(os.path.abspath(output_path)))
+    progress = [0.0] * len(segments)
+    lock = threading.Lock()
+    last_print = [0.0]
+
+    def report(index: int, percent: float):
+        with lock:
+            progress[index] = percent
+            now = time.monotonic()
+            if now - last_print[0] < 0.5 and percent < 100:
+                return
+            last_print[0] = now
+            parts = ' '.join(f"[{i + 1}]{p:3.0f}%" for i, p in enumerate(progress))
+            print(f"\r  分段进度: {parts}  总计 {sum(progress) / len(progress):5.1f}%", end='', flush=True)
+
+    def encode(index: int, start_frame: int, frame_count: int) -> str:
+        segment_file = os.path.join(segments_dir, f"segment_{index:03d}.mp4")
+        offset = (start_frame / fps) % info['duration']
+        cmd = [
+            ffmpeg, '-y',
+            '-ss', f"{offset:.6f}", '-stream_loop', '-1', '-i', video_path,
+            '-an', '-vf', f"fps={fps},format=yuv420p",
+            '-frames:v', str(frame_count),
+            '-c:v', 'libx264', '-preset', preset, '-b:v', bitrate,
+            '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+            '-threads', str(threads),
+            segment_file,
+        ]
+        run_ffmpeg(cmd, frame_count / fps, on_progress=lambda p: report(index, p))
+        report(index, 100.0)
+        return segment_file
+
+    tmp_output = f"{output_path}.part.mp4"
+    try:
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [pool.submit(encode, i, s, n) for i, (s, n) in enumerate(segments)]
+            segment_files = [f.result() for f in futures]
+        print(f"\n  编码耗时: {time.monotonic() - start:.1f} 秒")
+
+        concat_list = os.path.join(segments_dir, 'segments.txt')
+        with open(concat_list, 'w', encoding='utf-8') as f:
+            for segment_file in segment_files:
+                f.write(f"file '{os.path.basename(segment_file)}'\n")
+
+        cmd = [
+            ffmpeg, '-y',
+            '-f', 'concat', '-safe', '0', '-i', concat_list,
+            '-i', audio_path,
+            '-map', '0:v:0', '-map', '1:a:0',
+            '-c:v', 'copy',
+            '-c:a', 'aac', '-b:a', '128k',
+            '-t', f"{audio_duration:.3f}",
+            '-movflags', '+faststart',
+            tmp_output,
+        ]
+        run_ffmpeg(cmd, audio_duration, '拼接进度')
+        os.replace(tmp_output, output_path)
+    except Exception as e:
+        print(f"\n⚠️  并行分段编码失败: {e}")
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        return False
+    finally:
+        shutil.rmtree(segments_dir, ignore_errors=True)
+
+    output_size = os.path.getsize(output_path)
+    print(f"\n✅ 合成成功！")
+    print(f"  输出文件: {output_path}")
+    print(f"  文件大小: {output_size / 1024 / 1024:.2f} MB")
+    print(f"  视频时长: {format_duration(audio_duration)}")
+    print("=" * 60)
+    return True
+
+
+def still_image_merge(audio_path: str, image_path: str, output_path: str,
+                      fps: int = STILL_IMAGE_FPS, preset: str = STILL_IMAGE_PRESET) -> bool:
+    """
+    静态图片模式：一张图片 + 音频，以极低帧率编码为 MP4
+
+    画面不变，x264 用 -tune stillimage 且关键帧间隔很长，除关键帧外
+    每帧几乎不占空间，编码速度和文件大小主要取决于音频。
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("❌ 错误: 静态图片模式需要 ffmpeg（pip install imageio-ffmpeg 或安装系统 ffmpeg）")
+        return False
+
+    audio_duration = get_audio_duration(audio_path)
+
+    print(f"\n🖼️  静态图片模式")
+    print(f"  图片: {os.path.basename(image_path)}")
+    print(f"  音频时长: {format_duration(audio_duration)}")
+    print(f"  帧率: {fps} fps，编码预设: {preset}")
+
+    tmp_output = f"{output_path}.part.mp4"
+    cmd = [
+        ffmpeg, '-y',
+        '-loop', '1', '-framerate', str(fps), '-i', image_path,
+        '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        # H.264 要求宽高为偶数
+        '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p',
+        '-c:v', 'libx264', '-tune', 'stillimage', '-preset', preset,
+        '-r', str(fps), '-g', str(fps * STILL_IMAGE_GOP_SECONDS),
+        '-c:a', 'aac', '-b:a', '128k',
+        '-t', f"{audio_duration:.3f}",
+        '-movflags', '+faststart',
+        tmp_output,
+    ]
+    try:
+        run_ffmpeg(cmd, audio_duration, '编码进度')
+        os.replace(tmp_output, output_path)
+    except Exception as e:
+        print(f"❌ 渲染失败: {e}")
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        return False
+
+    output_size = os.path.getsize(output_path)
+    print(f"\n✅ 合成成功！")
+    print(f"  输出文件: {output_path}")
+    print(f"  文件大小: {output_size / 1024 / 1024:.2f} MB")
+    print(f"  视频时长: {format_duration(audio_duration)}")
+    print("=" * 60)
+    return True
 
 
 def format_duration(seconds: float) -> str:
@@ -225,9 +646,18 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 示例:
-  # 基本用法（默认优化：30分钟≈500MB）
+  # 基本用法（快速模式：视频流复制，不重新编码）
   %(prog)s audio.mp3 background.mp4 -o output.mp4
   
+  # 强制重新编码（默认优化：30分钟≈500MB）
+  %(prog)s audio.mp3 background.mp4 -o output.mp4 --transcode
+  
+  # 并行分段编码（按 CPU 核数切分，缩短重新编码时间）
+  %(prog)s audio.mp3 background.mp4 -o output.mp4 --transcode -j 8
+  
+  # 静态图片视频（1 fps，几秒生成，文件很小）
+  %(prog)s audio.mp3 static/bf.png -o output.mp4
+  
   # 自定义比特率（更高质量）
   %(prog)s audio.mp3 background.mp4 -o output.mp4 --bitrate 3000k
   
@@ -240,7 +670,11 @@ def main():
   # 合成播客（默认已优化）
   %(prog)s shoedog/video/merged_*.mp3 background.mp4 -o 鞋狗完整版.mp4
   
-压缩说明:
+快速模式说明:
+  默认用 ffmpeg 循环复制背景视频流，只编码音频，几乎瞬间完成
+  指定 --fps / --bitrate / --transcode 或背景视频无法复制时使用重新编码
+
+压缩说明（重新编码时）:
   默认设置针对手机观看优化，30分钟视频约500MB
   - 视频比特率: 2000kbps
   - 音频比特率: 128kbps
@@ -249,13 +683,17 @@ def main():
     )
     
     parser.add_argument('audio', help='输入的音频文件（MP3）')
-    parser.add_argument('video', help='背景视频文件（MP4）')
+    parser.add_argument('video', help='背景视频文件（MP4），或图片（PNG/JPG，静态图片模式）')
     parser.add_argument('-o', '--output', help='输出文件路径（默认: merged_video_YYYYMMDD_HHMMSS.mp4）')
-    parser.add_argument('--fps', type=int, help='输出视频帧率（默认: 使用原视频帧率）')
+    parser.add_argument('--fps', type=int, help=f'输出视频帧率（默认: 使用原视频帧率；静态图片模式为 {STILL_IMAGE_FPS}）')
     parser.add_argument('--bitrate', help='视频比特率，如 2000k, 3000k（默认: 2000k，适合手机）')
-    parser.add_argument('--preset', default='medium', 
-                        choices=['ultrafast', 'fast', 'medium', 'slow'],
-                        help='编码预设（默认: medium）- fast=更快, slow=更好质量')
+    parser.add_argument('--preset',
+                        choices=['ultrafast', 'veryfast', 'fast', 'medium', 'slow'],
+                        help=f'编码预设（默认: medium，静态图片模式为 {STILL_IMAGE_PRESET}）- fast=更快, slow=更好质量')
+    parser.add_argument('--transcode', action='store_true',
+                        help='强制重新编码（默认先尝试视频流复制的快速模式）')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='重新编码时的并行分段数，建议设为 CPU 核数（默认: 1，使用 moviepy 单进程编码）')
     
     args = parser.parse_args()
     
@@ -264,7 +702,9 @@ def main():
     print("=" * 60)
     
     try:
-        merge_audio_video(args.audio, args.video, args.output, args.fps, args.preset, args.bitrate)
+        if not merge_audio_video(args.audio, args.video, args.output, args.fps, args.preset, args.bitrate,
+                                 args.transcode, args.jobs):
+            raise SystemExit(1)
     except FileNotFoundError as e:
         print(f"\n❌ 文件未找到错误:")
         print(f"  {e}")
@@ -4,16 +4,41 @@ Markdown to HTML Merger
 
 This script merges multiple Markdown files from a directory into a single HTML page
 with a fixed sidebar navigation and eye-friendly color scheme.
+
+Build mode (--build) converts files in a process pool, caches per-file HTML by
+content hash so unchanged chapters are not reconverted, and streams the page to disk.
+
+Fragments mode (--fragments) writes a light shell page with the sidebar plus one
+HTML fragment file per section, fetched on navigation or when near the viewport.
 """
 
 import argparse
+import hashlib
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from urllib.parse import quote
 
 import markdown
 
 
+# Markdown extensions used for every conversion
+MARKDOWN_EXTENSIONS = [
+    'extra',          # Tables, fenced code blocks, etc.
+    'codehilite',     # Syntax highlighting
+    'toc',            # Table of contents
+    'nl2br',          # New line to break
+]
+
+# Bump when conversion settings change to invalidate the build cache
+BUILD_CACHE_VERSION = 1
+
+# Default cache directory name (inside the input directory)
+BUILD_CACHE_DIR = ".merge_cache"
+
+
 # HTML template with fixed sidebar and eye-friendly colors
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="zh-CN">
@@ -315,6 +340,109 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 """
 
 
+# Script for fragments mode: lazy section loading + IntersectionObserver highlighting
+FRAGMENT_SCRIPT = """    <script>
+        document.addEventListener('DOMContentLoaded', function() {{
+            const links = document.querySelectorAll('#sidebar nav a');
+            const sections = Array.from(document.querySelectorAll('.section'));
+            const loading = new Map();
+            
+            // 加载章节片段（每个章节只请求一次）
+            function loadSection(section) {{
+                if (!loading.has(section.id)) {{
+                    const request = fetch(section.dataset.src)
+                        .then(function(response) {{
+                            if (!response.ok) {{
+                                throw new Error('HTTP ' + response.status);
+                            }}
+                            return response.text();
+                        }})
+                        .then(function(html) {{
+                            section.innerHTML = html;
+                            section.classList.remove('pending');
+                        }})
+                        .catch(function(error) {{
+                            loading.delete(section.id);
+                            section.innerHTML = '<p>加载失败: ' + error.message + '</p>';
+                        }});
+                    loading.set(section.id, request);
+                }}
+                return loading.get(section.id);
+            }}
+            
+            // 章节接近视口时预加载
+            const loader = new IntersectionObserver(function(entries) {{
+                entries.forEach(function(entry) {{
+                    if (entry.isIntersecting) {{
+                        loader.unobserve(entry.target);
+                        loadSection(entry.target);
+                    }}
+                }});
+            }}, {{ rootMargin: '1500px 0px' }});
+            
+            // 导航高亮显示：高亮视口顶部的第一个可见章节
+            const visible = new Set();
+            const tracker = new IntersectionObserver(function(entries) {{
+                entries.forEach(function(entry) {{
+                    if (entry.isIntersecting) {{
+                        visible.add(entry.target);
+                    }} else {{
+                        visible.delete(entry.target);
+                    }}
+                }});
+                const index = sections.findIndex(function(section) {{
+                    return visible.has(section);
+                }});
+                links.forEach((link) => link.classList.remove('active'));
+                if (index >= 0 && links[index]) {{
+                    links[index].classList.add('active');
+                }}
+            }}, {{ rootMargin: '-100px 0px 0px 0px' }});
+            
+            sections.forEach(function(section) {{
+                loader.observe(section);
+                tracker.observe(section);
+            }});
+            
+            // 点击导航：先加载目标章节再跳转
+            function jumpTo(section) {{
+                loadSection(section).then(function() {{
+                    section.scrollIntoView();
+                    history.replaceState(null, '', '#' + section.id);
+                }});
+            }}
+            
+            links.forEach(function(link, index) {{
+                link.addEventListener('click', function(event) {{
+                    event.preventDefault();
+                    jumpTo(sections[index]);
+                }});
+            }});
+            
+            if (location.hash) {{
+                const target = document.getElementById(location.hash.slice(1));
+                if (target) {{
+                    jumpTo(target);
+                }}
+            }}
+        }});
+    </script>
+"""
+
+# Shell page for fragments mode: same layout as HTML_TEMPLATE, sections loaded lazily
+FRAGMENT_SHELL_TEMPLATE = (
+    HTML_TEMPLATE[:HTML_TEMPLATE.index('    </style>')]
+    + """        /* 未加载的章节占位 */
+        .section.pending {{
+            min-height: 100vh;
+        }}
+"""
+    + HTML_TEMPLATE[HTML_TEMPLATE.index('    </style>'):HTML_TEMPLATE.index('    <script>')]
+    + FRAGMENT_SCRIPT
+    + "</body>\n</html>\n"
+)
+
+
 def get_markdown_files(directory: Path) -> List[Path]:
     """
     Get all markdown files in a directory, sorted by name.
@@ -340,15 +468,108 @@ def convert_markdown_to_html(md_content: str) -> str:
     Returns:
         HTML string
     """
-    md = markdown.Markdown(extensions=[
-        'extra',          # Tables, fenced code blocks, etc.
-        'codehilite',     # Syntax highlighting
-        'toc',            # Table of contents
-        'nl2br',          # New line to break
-    ])
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
     return md.convert(md_content)
 
 
+def get_section_title(md_file: Path) -> str:
+    """
+    Get navigation title from a markdown filename.
+    
+    Removes numbering prefix if exists (e.g., "01_Intro" -> "Intro").
+    """
+    section_title = md_file.stem
+    if section_title and len(section_title) > 3 and section_title[2] == '_':
+        section_title = section_title[3:]
+    return section_title
+
+
+# Per-process Markdown instance for build mode workers
+_worker_md = None
+
+
+def _init_build_worker() -> None:
+    """Create one reusable Markdown instance per worker process."""
+    global _worker_md
+    _worker_md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+
+
+def _convert_in_worker(md_content: str) -> str:
+    """Convert markdown with the worker's Markdown instance."""
+    _worker_md.reset()
+    return _worker_md.convert(md_content)
+
+
+def _content_hash(md_content: str) -> str:
+    """Cache key for a markdown file's content."""
+    hasher = hashlib.sha256(f"v{BUILD_CACHE_VERSION}\n".encode('utf-8'))
+    hasher.update(md_content.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def convert_files_cached(
+    md_files: List[Path],
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+):
+    """
+    Convert markdown files to HTML, yielding (md_file, html) in input order.
+    
+    Files whose content hash is in the cache are not reconverted; the rest
+    are converted in a process pool and written to the cache.
+    
+    Args:
+        md_files: Markdown files to convert
+        cache_dir: Directory for cached HTML (None disables caching)
+        workers: Number of worker processes (default: CPU count)
+    """
+    contents = [md_file.read_text(encoding='utf-8') for md_file in md_files]
+    hashes = [_content_hash(content) for content in contents]
+    
+    cached = {}
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for idx, content_hash in enumerate(hashes):
+            cache_file = cache_dir / f"{content_hash}.html"
+            if cache_file.exists():
+                cached[idx] = cache_file
+    
+    pending = [idx for idx in range(len(md_files)) if idx not in cached]
+    print(f"  Cached: {len(cached)}, to convert: {len(pending)}")
+    
+    pool = None
+    results = iter(())
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                   initializer=_init_build_worker)
+        results = pool.map(_convert_in_worker, [contents[idx] for idx in pending])
+    
+    try:
+        for idx, md_file in enumerate(md_files):
+            if idx in cached:
+                html_content = cached[idx].read_text(encoding='utf-8')
+            else:
+                print(f"  Converted: {md_file.name}")
+                html_content = next(results)
+                if cache_dir is not None:
+                    cache_file = cache_dir / f"{hashes[idx]}.html"
+                    tmp_file = cache_file.with_suffix('.tmp')
+                    tmp_file.write_text(html_content, encoding='utf-8')
+                    os.replace(tmp_file, cache_file)
+            yield md_file, html_content
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    
+    # Drop cache entries that no longer belong to any input file
+    if cache_dir is not None:
+        live = {f"{content_hash}.html" for content_hash in hashes}
+        for cache_file in cache_dir.glob("*.html"):
+            if cache_file.name not in live:
+                cache_file.unlink()
+
+
 def merge_markdown_files(
     input_dir: Path,
     output_file: Path = None,
@@ -403,11 +624,7 @@ def merge_markdown_files(
         
         # Create section ID from filename
         section_id = f"section-{idx}"
-        section_title = md_file.stem
-        
-        # Remove numbering prefix if exists (e.g., "01_" -> "")
-        if section_title and len(section_title) > 3 and section_title[2] == '_':
-            section_title = section_title[3:]
+        section_title = get_section_title(md_file)
         
         # Add to navigation
         nav_items.append(f'                <li><a href="#{section_id}">{section_title}</a></li>')
@@ -429,6 +646,176 @@ def merge_markdown_files(
     print(f"✓ Output: {output_file}")
 
 
+def build_merged_html(
+    input_dir: Path,
+    output_file: Path = None,
+    title: str = None,
+    workers: int = None,
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+) -> None:
+    """
+    Build mode: merge markdown files into a single HTML page using a
+    process pool, a per-file HTML cache and streamed output.
+    
+    Produces the same page as merge_markdown_files().
+    
+    Args:
+        input_dir: Directory containing markdown files
+        output_file: Output HTML file path (default: merged.html in input directory)
+        title: Page title (default: directory name)
+        workers: Number of worker processes (default: CPU count)
+        cache_dir: Cache directory (default: .merge_cache in input directory)
+        use_cache: Whether to read/write the per-file HTML cache
+        
+    Raises:
+        FileNotFoundError: If input directory doesn't exist
+        ValueError: If no markdown files found
+    """
+    if not input_dir.exists():
+        raise FileNotFoundError(f"Directory not found: {input_dir}")
+    
+    if not input_dir.is_dir():
+        raise ValueError(f"Path is not a directory: {input_dir}")
+    
+    md_files = get_markdown_files(input_dir)
+    
+    if not md_files:
+        raise ValueError(f"No markdown files found in: {input_dir}")
+    
+    if title is None:
+        title = input_dir.name
+    
+    if output_file is None:
+        output_file = input_dir / "merged.html"
+    
+    if not use_cache:
+        cache_dir = None
+    elif cache_dir is None:
+        cache_dir = input_dir / BUILD_CACHE_DIR
+    
+    print(f"Found {len(md_files)} markdown files in: {input_dir}")
+    print(f"Building into: {output_file}")
+    
+    nav_items = [
+        f'                <li><a href="#section-{idx}">{get_section_title(md_file)}</a></li>'
+        for idx, md_file in enumerate(md_files, 1)
+    ]
+    
+    # Split the template around the content so sections can be streamed
+    head_template, tail_template = HTML_TEMPLATE.split('{content}')
+    head = head_template.format(title=title, nav_items='\n'.join(nav_items))
+    tail = tail_template.format()
+    
+    tmp_output = output_file.with_name(output_file.name + '.tmp')
+    with open(tmp_output, 'w', encoding='utf-8') as f:
+        f.write(head)
+        sections = convert_files_cached(md_files, cache_dir, workers)
+        for idx, (md_file, html_content) in enumerate(sections, 1):
+            if idx > 1:
+                f.write('\n\n')
+            f.write(f'        <section id="section-{idx}" class="section">\n{html_content}\n        </section>')
+        f.write(tail)
+    os.replace(tmp_output, output_file)
+    
+    print(f"\n✓ Successfully built {len(md_files)} files into HTML")
+    print(f"✓ Output: {output_file}")
+
+
+def build_fragmented_html(
+    input_dir: Path,
+    output_file: Path = None,
+    title: str = None,
+    workers: int = None,
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+) -> None:
+    """
+    Fragments mode: write a light shell page with the sidebar, plus one HTML
+    fragment file per section in <output stem>_sections/.
+    
+    The shell fetches fragments on navigation or when they approach the
+    viewport, so it must be opened over HTTP (e.g. with serve_html.py).
+    
+    Args:
+        input_dir: Directory containing markdown files
+        output_file: Output HTML file path (default: merged.html in input directory)
+        title: Page title (default: directory name)
+        workers: Number of worker processes (default: CPU count)
+        cache_dir: Cache directory (default: .merge_cache in input directory)
+        use_cache: Whether to read/write the per-file HTML cache
+        
+    Raises:
+        FileNotFoundError: If input directory doesn't exist
+        ValueError: If no markdown files found
+    """
+    if not input_dir.exists():
+        raise FileNotFoundError(f"Directory not found: {input_dir}")
+    
+    if not input_dir.is_dir():
+        raise ValueError(f"Path is not a directory: {input_dir}")
+    
+    md_files = get_markdown_files(input_dir)
+    
+    if not md_files:
+        raise ValueError(f"No markdown files found in: {input_dir}")
+    
+    if title is None:
+        title = input_dir.name
+    
+    if output_file is None:
+        output_file = input_dir / "merged.html"
+    
+    if not use_cache:
+        cache_dir = None
+    elif cache_dir is None:
+        cache_dir = input_dir / BUILD_CACHE_DIR
+    
+    fragments_dir = output_file.parent / f"{output_file.stem}_sections"
+    fragments_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"Found {len(md_files)} markdown files in: {input_dir}")
+    print(f"Writing shell: {output_file}")
+    print(f"Writing fragments: {fragments_dir}")
+    
+    nav_items = []
+    placeholders = []
+    fragment_names = set()
+    
+    for idx, md_file in enumerate(md_files, 1):
+        section_id = f"section-{idx}"
+        fragment_name = f"{section_id}.html"
+        fragment_names.add(fragment_name)
+        nav_items.append(f'                <li><a href="#{section_id}">{get_section_title(md_file)}</a></li>')
+        # The folder is named after the output file: spaces, '#', '?' or
+        # non-ASCII characters must be URL-encoded for fetch()
+        fragment_src = quote(f"{fragments_dir.name}/{fragment_name}")
+        placeholders.append(
+            f'        <section id="{section_id}" class="section pending" '
+            f'data-src="{fragment_src}"></section>'
+        )
+    
+    sections = convert_files_cached(md_files, cache_dir, workers)
+    for idx, (md_file, html_content) in enumerate(sections, 1):
+        fragment_file = fragments_dir / f"section-{idx}.html"
+        fragment_file.write_text(html_content, encoding='utf-8')
+    
+    # Remove fragments left over from a previous build with more sections
+    for fragment_file in fragments_dir.glob("section-*.html"):
+        if fragment_file.name not in fragment_names:
+            fragment_file.unlink()
+    
+    html = FRAGMENT_SHELL_TEMPLATE.format(
+        title=title,
+        nav_items='\n'.join(nav_items),
+        content='\n'.join(placeholders),
+    )
+    output_file.write_text(html, encoding='utf-8')
+    
+    print(f"\n✓ Successfully built {len(md_files)} section fragments")
+    print(f"✓ Output: {output_file}")
+
+
 def main() -> int:
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(
@@ -456,14 +843,57 @@ def main() -> int:
         help="Page title (default: directory name)",
     )
     
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Build mode: parallel conversion with per-file HTML cache and streamed output",
+    )
+    
+    parser.add_argument(
+        "--fragments",
+        action="store_true",
+        help="Write a light shell page plus lazily loaded per-section fragments "
+             "(open it over HTTP, e.g. with serve_html.py)",
+    )
+    
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="Number of worker processes in build/fragments mode (default: CPU count)",
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Build/fragments mode: don't read or write the per-file HTML cache",
+    )
+    
     args = parser.parse_args()
     
     try:
-        merge_markdown_files(
-            input_dir=args.input_dir,
-            output_file=args.output,
-            title=args.title,
-        )
+        if args.fragments:
+            build_fragmented_html(
+                input_dir=args.input_dir,
+                output_file=args.output,
+                title=args.title,
+                workers=args.workers,
+                use_cache=not args.no_cache,
+            )
+        elif args.build:
+            build_merged_html(
+                input_dir=args.input_dir,
+                output_file=args.output,
+                title=args.title,
+                workers=args.workers,
+                use_cache=not args.no_cache,
+            )
+        else:
+            merge_markdown_files(
+                input_dir=args.input_dir,
+                output_file=args.output,
+                title=args.title,
+            )
         return 0
     
     except (FileNotFoundError, ValueError) as e:
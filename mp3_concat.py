@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+MP3 帧级拼接（无需解码）
+
+直接按 MPEG 帧把多个 MP3 文件首尾相接写入输出文件：
+- 跳过每个文件开头的 ID3v2 标签和结尾的 ID3v1 / APEv2 标签
+- 丢弃 Xing / Info / VBRI 头帧（其中记录的帧数只对单个文件有效）
+- 校验所有文件的 MPEG 版本、层、采样率、声道数和码率一致
+
+参数不一致时抛出 IncompatibleMP3Error，调用方可回退到解码重编码方式。
+相比 pydub 解码后再编码，帧级拼接不占用大量内存、速度快且无损。
+
+使用方法:
+    python mp3_concat.py -o merged.mp3 01.mp3 02.mp3 03.mp3
+"""
+
+import argparse
+import os
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+class MP3FormatError(ValueError):
+    """文件不是可解析的 MP3"""
+
+
+class IncompatibleMP3Error(ValueError):
+    """多个 MP3 的编码参数不一致，无法按帧直接拼接"""
+
+
+# 码率表（kbps），按 (是否 MPEG1, 层) 索引
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# 采样率表（Hz），按版本位索引：0=MPEG2.5, 2=MPEG2, 3=MPEG1
+_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+
+_VERSION_NAMES = {0: "MPEG2.5", 2: "MPEG2", 3: "MPEG1"}
+
+
+class FrameHeader(NamedTuple):
+    """单个 MPEG 音频帧头"""
+    version: int        # 版本位：0=MPEG2.5, 2=MPEG2, 3=MPEG1
+    layer: int          # 1 / 2 / 3
+    bitrate: int        # kbps
+    sample_rate: int    # Hz
+    channels: int       # 1 或 2
+    length: int         # 整帧字节数（含帧头）
+    samples: int        # 每帧采样数
+
+    @property
+    def params(self) -> Tuple[int, int, int, int, int]:
+        """拼接时必须一致的参数"""
+        return (self.version, self.layer, self.sample_rate, self.channels, self.bitrate)
+
+    def describe(self) -> str:
+        mode = "单声道" if self.channels == 1 else "立体声"
+        return (f"{_VERSION_NAMES[self.version]} Layer {self.layer}, "
+                f"{self.sample_rate} Hz, {self.bitrate} kbps, {mode}")
+
+
+def parse_frame_header(data: bytes, pos: int) -> Optional[FrameHeader]:
+    """
+    解析 pos 处的帧头，不是合法帧头时返回 None
+    """
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_idx = (b2 >> 4) & 0x0F
+    sample_rate_idx = (b2 >> 2) & 0x03
+    if version == 1 or layer_bits == 0 or bitrate_idx in (0, 15) or sample_rate_idx == 3:
+        return None
+
+    layer = 4 - layer_bits
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_idx]
+    sample_rate = _SAMPLE_RATES[version][sample_rate_idx]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        samples = 1152
+        length = 144 * bitrate * 1000 // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate * 1000 // sample_rate + padding
+
+    return FrameHeader(version, layer, bitrate, sample_rate, channels, length, samples)
+
+
+def _audio_bounds(data: bytes) -> Tuple[int, int]:
+    """
+    返回去掉首尾标签后的音频数据范围 [start, end)
+    """
+    start = 0
+    # ID3v2 可能出现多次（某些编码器会重复写入）
+    while data[start:start + 3] == b"ID3" and start + 10 <= len(data):
+        flags = data[start + 5]
+        size = 0
+        for b in data[start + 6:start + 10]:
+            size = (size << 7) | (b & 0x7F)
+        start += 10 + size + (10 if flags & 0x10 else 0)
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    # APEv2 标签尾部（32 字节 footer，size 包含 footer 本身）
+    if end - start >= 32 and data[end - 32:end - 24] == b"APETAGEX":
+        ape_size = int.from_bytes(data[end - 20:end - 16], "little")
+        ape_flags = int.from_bytes(data[end - 12:end - 8], "little")
+        end -= ape_size + (32 if ape_flags & 0x80000000 else 0)
+
+    return start, max(start, end)
+
+
+def _is_info_frame(data: bytes, pos: int, header: FrameHeader) -> bool:
+    """
+    判断帧是否为 Xing / Info / VBRI 头帧（不包含音频）
+    """
+    if header.layer != 3:
+        return False
+    if header.version == 3:
+        side_info = 17 if header.channels == 1 else 32
+    else:
+        side_info = 9 if header.channels == 1 else 17
+    tag = data[pos + 4 + side_info:pos + 8 + side_info]
+    return tag in (b"Xing", b"Info") or data[pos + 36:pos + 40] == b"VBRI"
+
+
+def iter_frames(data: bytes) -> Iterator[Tuple[int, FrameHeader]]:
+    """
+    遍历音频数据中的所有 MPEG 帧，返回 (偏移, 帧头)
+
+    遇到无法解析的字节时逐字节重新同步；第一帧需要后一帧确认，避免把
+    标签中的偶然 0xFF 字节当作帧头。
+    """
+    start, end = _audio_bounds(data)
+    pos = start
+    synced = False
+
+    while pos + 4 <= end:
+        header = parse_frame_header(data, pos)
+        if header is None or pos + header.length > end:
+            pos += 1
+            synced = False
+            continue
+
+        if not synced:
+            next_pos = pos + header.length
+            if next_pos + 4 <= end:
+                next_header = parse_frame_header(data, next_pos)
+                if next_header is None or next_header.sample_rate != header.sample_rate:
+                    pos += 1
+                    continue
+            synced = True
+
+        yield pos, header
+        pos += header.length
+
+
+def read_audio_frames(mp3_file: str) -> bytes:
+    """
+    读取文件中的全部音频帧（去掉标签和 Xing/Info 头帧）
+
+    用于边拼接边输出的场景（如 HTTP 流式响应）；调用方需自行保证各文件编码参数一致。
+    """
+    with open(mp3_file, "rb") as f:
+        data = f.read()
+
+    frames = []
+    for pos, header in iter_frames(data):
+        if not frames and _is_info_frame(data, pos, header):
+            continue
+        frames.append(data[pos:pos + header.length])
+    return b"".join(frames)
+
+
+def audio_duration(mp3_file: str) -> float:
+    """
+    计算 MP3 文件的音频时长（秒），不含 Xing/Info 头帧
+    """
+    with open(mp3_file, "rb") as f:
+        data = f.read()
+
+    seconds = 0.0
+    first = True
+    for pos, header in iter_frames(data):
+        if first and _is_info_frame(data, pos, header):
+            first = False
+            continue
+        first = False
+        seconds += header.samples / header.sample_rate
+    return seconds
+
+
+def concat_mp3_files(input_files: List[str], output_file: str) -> dict:
+    """
+    按帧拼接多个 MP3 文件
+
+    先写入临时文件，全部成功后再重命名为 output_file；参数不一致时删除
+    临时文件并抛出 IncompatibleMP3Error。
+
+    参数:
+        input_files: 按顺序排列的 MP3 文件路径
+        output_file: 输出文件路径
+
+    返回:
+        {"frames": 帧数, "duration": 时长（秒）, "format": 编码参数描述}
+    """
+    if not input_files:
+        raise ValueError("没有需要拼接的 MP3 文件")
+
+    tmp_file = f"{output_file}.part"
+    reference: Optional[FrameHeader] = None
+    frames = 0
+    samples = 0
+
+    try:
+        with open(tmp_file, "wb") as out:
+            for mp3_file in input_files:
+                with open(mp3_file, "rb") as f:
+                    data = f.read()
+
+                file_frames = 0
+                for pos, header in iter_frames(data):
+                    if file_frames == 0 and _is_info_frame(data, pos, header):
+                        file_frames += 1
+                        continue
+                    file_frames += 1
+
+                    if reference is None:
+                        reference = header
+                    elif header.params != reference.params:
+                        raise IncompatibleMP3Error(
+                            f"{os.path.basename(mp3_file)} 的编码参数 ({header.describe()}) "
+                            f"与前面的文件 ({reference.describe()}) 不一致"
+                        )
+
+                    out.write(data[pos:pos + header.length])
+                    frames += 1
+                    samples += header.samples
+
+                if file_frames == 0:
+                    raise MP3FormatError(f"{os.path.basename(mp3_file)} 中没有找到 MP3 音频帧")
+
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    return {
+        "frames": frames,
+        "duration": samples / reference.sample_rate,
+        "format": reference.describe(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按帧拼接 MP3 文件（无需解码）')
+    parser.add_argument('inputs', nargs='+', help='按顺序排列的输入 MP3 文件')
+    parser.add_argument('-o', '--output', required=True, help='输出 MP3 文件')
+    args = parser.parse_args()
+
+    try:
+        result = concat_mp3_files(args.inputs, args.output)
+    except (MP3FormatError, IncompatibleMP3Error) as e:
+        print(f"✗ 拼接失败: {e}")
+        raise SystemExit(1)
+
+    print(f"✓ 拼接完成: {args.output}")
+    print(f"  格式: {result['format']}")
+    print(f"  帧数: {result['frames']}，时长: {result['duration']:.1f} 秒")
+
+
+if __name__ == "__main__":
+    main()
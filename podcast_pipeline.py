@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+整书播客一键生成：片头 + 各章总结语音 + 片尾 → 完整音频 → 视频
+
+使用方法:
+1. 基本用法: python podcast_pipeline.py resources/shoedog/shoedog
+2. 指定背景: python podcast_pipeline.py resources/shoedog/shoedog --background static/bg-1.mp4
+3. 只生成音频: python podcast_pipeline.py resources/shoedog/shoedog --no-video
+4. 指定输出目录: python podcast_pipeline.py resources/shoedog/shoedog -o ./podcast
+5. 片头片尾念出本书书名: python podcast_pipeline.py resources/shoedog/shoedog --personalize-intro
+
+流程:
+1. 片头 / 片尾: 默认直接使用 static/ 中的 MP3；--personalize-intro 时用文案合成
+   （书名替换为本书，句子级 TTS 缓存），合成失败则回退到 static/ 中的 MP3
+2. 章节: 按顺序收集 summaries/ 中已生成的 *_voice.mp3
+3. 音频: 按帧拼接 片头 + 各章 + 片尾
+4. 视频: 背景为图片时用静态图片模式，为视频时用视频流复制（见 merge_audio_video.py）
+
+缓存说明:
+- 每一步的输入都计算内容哈希并记录在输出目录的 podcast.json 中
+- 输入没有变化的步骤直接跳过；新增一章只会重新拼接音频和封装视频
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from mp3_concat import concat_mp3_files
+
+STATIC_DIR = Path(__file__).parent / "static"
+INTRO_TEMPLATE = STATIC_DIR / "00_AI拆书开头.md"
+OUTRO_TEMPLATE = STATIC_DIR / "99_AI拆书结尾.md"
+INTRO_MP3 = STATIC_DIR / "00_AI拆书开头.mp3"
+OUTRO_MP3 = STATIC_DIR / "99_AI拆书结尾.mp3"
+DEFAULT_BACKGROUND = STATIC_DIR / "bf.png"
+
+# 片头片尾固定使用中文语音（文案为中文）
+INTRO_VOICE = "zh-CN-YunjianNeural"
+
+# 流水线变化时递增，使所有缓存失效
+PIPELINE_VERSION = 1
+
+STATE_FILE = "podcast.json"
+
+# 小于等于该大小的章节 MP3 视为无效
+MIN_MP3_SIZE = 1024
+
+
+def read_book_title(chapter_dir: str) -> Optional[str]:
+    """从书籍目录的 description.md 中读取 title"""
+    description = Path(chapter_dir).parent / "description.md"
+    if not description.exists():
+        return None
+    for line in description.read_text(encoding='utf-8').splitlines():
+        key, _, value = line.partition(':')
+        if key.strip() == 'title' and value.strip():
+            return value.strip()
+    return None
+
+
+def collect_chapter_audio(chapter_dir: str) -> List[str]:
+    """
+    按章节顺序收集已生成的总结语音（summaries/<章节>_voice.mp3）
+    """
+    chapter_dir = Path(chapter_dir)
+    summaries_dir = chapter_dir / "summaries"
+    files = []
+    for chapter in sorted(chapter_dir.glob("*.md")):
+        # 只取编号章节（如 01_xxx.md），跳过整书源文件
+        if not (len(chapter.stem) > 2 and chapter.stem[:2].isdigit() and chapter.stem[2] == '_'):
+            continue
+        mp3_file = summaries_dir / f"{chapter.stem}_voice.mp3"
+        if mp3_file.exists() and mp3_file.stat().st_size > MIN_MP3_SIZE:
+            files.append(str(mp3_file))
+    return files
+
+
+def render_intro_text(template: Path, title: Optional[str]) -> str:
+    """读取片头/片尾文案，把书名号中的书名替换为本书书名"""
+    text = template.read_text(encoding='utf-8')
+    if title:
+        text = re.sub(r'《[^》]*》', f'《{title}》', text)
+    return text
+
+
+class PodcastPipeline:
+    """
+    带内容哈希缓存的播客生成流水线
+
+    每一步的缓存键记录在 output_dir/podcast.json 中，键不变且输出文件存在时跳过该步。
+    """
+
+    def __init__(self, output_dir: str, on_step: Optional[Callable[[str, str, str], None]] = None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.output_dir / STATE_FILE
+        self.state = self._load_state()
+        # 本次运行用到的文件，结束时只保留这些文件的哈希记录
+        self._used_files = set()
+        # 回调: (步骤, 状态 cached/built/ready/skipped, 说明)
+        self.on_step = on_step or (lambda step, status, message: None)
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        tmp_file = self.state_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def file_hash(self, path: str) -> str:
+        """
+        文件内容哈希；按 (路径, 大小, 修改时间) 记忆，未变化的文件不重复读取
+        """
+        self._used_files.add(path)
+        stat = os.stat(path)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        hashes = self.state.setdefault("file_hashes", {})
+        cached = hashes.get(path)
+        if cached and cached["fingerprint"] == fingerprint:
+            return cached["sha256"]
+
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(block)
+        hashes[path] = {"fingerprint": fingerprint, "sha256": hasher.hexdigest()}
+        return hashes[path]["sha256"]
+
+    def _step_key(self, *parts: str) -> str:
+        return hashlib.sha256(
+            "\n".join([f"v{PIPELINE_VERSION}", *parts]).encode('utf-8')
+        ).hexdigest()
+
+    def _is_fresh(self, step: str, key: str, output: Path) -> bool:
+        return self.state.get("steps", {}).get(step) == key and output.exists()
+
+    def _mark_built(self, step: str, key: str):
+        self.state.setdefault("steps", {})[step] = key
+        self._save_state()
+
+    async def build_intro(
+        self,
+        step: str,
+        template: Path,
+        static_mp3: Path,
+        title: Optional[str],
+        personalize: bool = False,
+    ) -> Path:
+        """
+        片头或片尾：默认直接使用 static/ 中的 MP3，无需联网合成
+
+        personalize 时把文案中的书名换成本书再合成（句子级 TTS 缓存，只有书名那句
+        需要新合成）；合成失败时回退到 static/ 中的 MP3
+        """
+        if not personalize or not title:
+            self.on_step(step, "static", static_mp3.name)
+            return static_mp3
+
+        from tts_cache import TTSCache
+
+        output = self.output_dir / f"{step}.mp3"
+        text = render_intro_text(template, title)
+        key = self._step_key(step, INTRO_VOICE, text)
+        if self._is_fresh(step, key, output):
+            self.on_step(step, "cached", output.name)
+            return output
+
+        try:
+            result = await TTSCache().synthesize_to_file(text, str(output), INTRO_VOICE)
+        except Exception as e:
+            self.on_step(step, "static", f"{static_mp3.name}（合成失败: {e}）")
+            return static_mp3
+        self._mark_built(step, key)
+        self.on_step(step, "built", f"{output.name}（合成 {result['synthesized']}/{result['sentences']} 句）")
+        return output
+
+    def build_audio(self, parts: List[str], name: str) -> Path:
+        """按帧拼接所有音频"""
+        output = self.output_dir / f"{name}.mp3"
+        key = self._step_key("audio", *(self.file_hash(p) for p in parts))
+        if self._is_fresh("audio", key, output):
+            self.on_step("audio", "cached", output.name)
+            return output
+
+        result = concat_mp3_files(parts, str(output))
+        self._mark_built("audio", key)
+        self.on_step("audio", "built", f"{output.name}（{len(parts)} 段，{result['duration'] / 60:.1f} 分钟）")
+        return output
+
+    def build_video(self, audio: Path, background: str, name: str) -> Path:
+        """封装视频：图片背景用静态图片模式，视频背景用视频流复制"""
+        from merge_audio_video import merge_audio_video
+
+        output = self.output_dir / f"{name}.mp4"
+        key = self._step_key("video", self.file_hash(str(audio)), self.file_hash(background))
+        if self._is_fresh("video", key, output):
+            self.on_step("video", "cached", output.name)
+            return output
+
+        if output.exists():
+            output.unlink()
+        if not merge_audio_video(str(audio), background, str(output)) or not output.exists():
+            raise RuntimeError("视频生成失败")
+        self._mark_built("video", key)
+        self.on_step("video", "built", output.name)
+        return output
+
+    async def run(
+        self,
+        chapter_audio: List[str],
+        title: Optional[str],
+        name: str = "podcast",
+        background: Optional[str] = str(DEFAULT_BACKGROUND),
+        personalize_intro: bool = False,
+    ) -> Dict[str, Optional[str]]:
+        """
+        运行完整流水线
+
+        参数:
+            chapter_audio: 按顺序排列的章节 MP3
+            title: 书名（替换片头中的书名）
+            name: 输出文件名（不含扩展名）
+            background: 背景图片或视频；为 None 时只生成音频
+            personalize_intro: 用本书书名重新合成片头片尾（需要联网 TTS）
+
+        返回:
+            {"audio": 音频路径, "video": 视频路径或 None}
+        """
+        if not chapter_audio:
+            raise ValueError("没有可用的章节语音，请先生成章节总结 MP3")
+
+        intro = await self.build_intro("intro", INTRO_TEMPLATE, INTRO_MP3, title, personalize_intro)
+        outro = await self.build_intro("outro", OUTRO_TEMPLATE, OUTRO_MP3, title, personalize_intro)
+        self.on_step("chapters", "ready", f"{len(chapter_audio)} 章")
+
+        audio = await asyncio.to_thread(self.build_audio, [str(intro), *chapter_audio, str(outro)], name)
+
+        video = None
+        if background:
+            video = await asyncio.to_thread(self.build_video, audio, background, name)
+        else:
+            self.on_step("video", "skipped", "未指定背景")
+
+        hashes = self.state.get("file_hashes", {})
+        self.state["file_hashes"] = {p: h for p, h in hashes.items() if p in self._used_files}
+        self._save_state()
+
+        return {"audio": str(audio), "video": str(video) if video else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='整书播客一键生成：片头 + 各章总结语音 + 片尾 → 音频 → 视频',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('chapter_dir', help='章节目录（包含 summaries/ 子目录）')
+    parser.add_argument('-o', '--output-dir', help='输出目录（默认: <章节目录>/podcast）')
+    parser.add_argument('--title', help='书名（默认: 读取 description.md 的 title）')
+    parser.add_argument('--name', default='podcast', help='输出文件名，不含扩展名（默认: podcast）')
+    parser.add_argument('--background', default=str(DEFAULT_BACKGROUND),
+                        help='背景图片或视频（默认: static/bf.png）')
+    parser.add_argument('--no-video', action='store_true', help='只生成音频')
+    parser.add_argument('--personalize-intro', action='store_true',
+                        help='片头片尾念出本书书名（需要联网 TTS，默认使用 static/ 中的 MP3）')
+    args = parser.parse_args()
+
+    title = args.title or read_book_title(args.chapter_dir)
+    output_dir = args.output_dir or os.path.join(args.chapter_dir, 'podcast')
+    chapter_audio = collect_chapter_audio(args.chapter_dir)
+
+    print("=" * 60)
+    print(f"🎙️  整书播客生成: 《{title or '未知书名'}》")
+    print(f"  章节语音: {len(chapter_audio)} 个")
+    print(f"  输出目录: {output_dir}")
+    print("=" * 60)
+
+    icons = {"cached": "✓ 缓存", "built": "✅ 生成", "ready": "📚 就绪", "skipped": "⏭️  跳过", "static": "📁 内置"}
+
+    def report(step: str, status: str, message: str):
+        print(f"[{step}] {icons.get(status, status)}: {message}")
+
+    pipeline = PodcastPipeline(output_dir, on_step=report)
+    try:
+        result = asyncio.run(pipeline.run(
+            chapter_audio,
+            title,
+            name=args.name,
+            background=None if args.no_video else args.background,
+            personalize_intro=args.personalize_intro,
+        ))
+    except Exception as e:
+        print(f"\n❌ 生成失败: {e}")
+        raise SystemExit(1)
+
+    print("=" * 60)
+    print(f"🎧 音频: {result['audio']}")
+    if result['video']:
+        print(f"🎬 视频: {result['video']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,42 @@ Simple HTTP Server
 
 A lightweight HTTP server for serving static files.
 Uses Python's built-in http.server module - no external dependencies required.
+
+Production mode (--production) uses a threaded HTTP/1.1 server with keep-alive,
+sendfile, gzip negotiation, conditional GET (ETag / Last-Modified) and compact,
+sampled access logging. Use --debug to keep the detailed per-request logging.
 """
 
 import argparse
+import gzip
 import http.server
+import io
 import os
+import random
 import socketserver
 import sys
+import threading
 import webbrowser
+from collections import OrderedDict
 from pathlib import Path
 
 
+# Content types worth compressing
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Files smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+
+# Max number of gzipped files kept in memory
+GZIP_CACHE_ENTRIES = 256
+
+
 class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with detailed logging."""
     
@@ -94,6 +119,152 @@ class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         print(f"{'='*60}\n")
 
 
+class ProductionHTTPRequestHandler(QuietHTTPRequestHandler):
+    """
+    HTTP/1.1 request handler for production serving.
+    
+    Adds keep-alive, sendfile for uncompressed files, gzip negotiation with
+    an in-memory cache of compressed files, ETag / If-None-Match support and
+    compact access-style logging sampled by `log_sample_rate`.
+    """
+    
+    protocol_version = "HTTP/1.1"
+    timeout = 15  # Idle keep-alive connections are closed after this many seconds
+    
+    verbose = False  # Use the detailed per-request logging instead
+    log_sample_rate = 1.0  # Fraction of successful requests to log (errors always logged)
+    
+    _gzip_cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _gzip_lock = threading.Lock()
+    
+    def _accepts_gzip(self) -> bool:
+        """Check whether the client accepts gzip encoding."""
+        accept = self.headers.get('Accept-Encoding', '')
+        return any(part.split(';')[0].strip() == 'gzip' for part in accept.split(','))
+    
+    def _get_gzipped(self, path: str, etag: str, f) -> bytes:
+        """Get gzipped file content, compressing and caching it if needed."""
+        with self._gzip_lock:
+            cached = self._gzip_cache.get(path)
+            if cached and cached[0] == etag:
+                self._gzip_cache.move_to_end(path)
+                return cached[1]
+        
+        body = gzip.compress(f.read(), compresslevel=6)
+        
+        with self._gzip_lock:
+            self._gzip_cache[path] = (etag, body)
+            self._gzip_cache.move_to_end(path)
+            while len(self._gzip_cache) > GZIP_CACHE_ENTRIES:
+                self._gzip_cache.popitem(last=False)
+        return body
+    
+    def _is_not_modified(self, etag: str, mtime: float) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since."""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            from email.utils import parsedate_to_datetime
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+    
+    def send_head(self):
+        """Serve regular files with conditional GET and gzip; delegate the rest."""
+        self._body_length = '-'
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path) or self.path.endswith('/'):
+            # Directories (index / listing / redirect) and 404s
+            return super().send_head()
+        
+        ctype = self.guess_type(path)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(http.HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        
+        try:
+            fs = os.fstat(f.fileno())
+            etag = f'"{fs.st_mtime_ns:x}-{fs.st_size:x}"'
+            last_modified = self.date_time_string(fs.st_mtime)
+            compressible = ctype.startswith(COMPRESSIBLE_TYPES)
+            
+            if self._is_not_modified(etag, fs.st_mtime):
+                f.close()
+                self._body_length = 0
+                self.send_response(http.HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return None
+            
+            if compressible and fs.st_size >= GZIP_MIN_SIZE and self._accepts_gzip():
+                body = self._get_gzipped(path, etag, f)
+                f.close()
+                f = io.BytesIO(body)
+                length = len(body)
+                encoding = 'gzip'
+            else:
+                length = fs.st_size
+                encoding = None
+            
+            self._body_length = length
+            self.send_response(http.HTTPStatus.OK)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("ETag", etag)
+            if compressible:
+                self.send_header("Vary", "Accept-Encoding")
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+    
+    def copyfile(self, source, outputfile):
+        """Use sendfile for real files, regular copy otherwise."""
+        if isinstance(source, io.BufferedReader):
+            outputfile.flush()
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+    
+    def log_request(self, code='-', size='-'):
+        """Log errors always, successful requests by sample rate."""
+        if size == '-':
+            size = getattr(self, '_body_length', '-')
+        status = getattr(code, 'value', code)
+        is_error = isinstance(status, int) and status >= 400
+        if self.verbose or is_error or random.random() < self.log_sample_rate:
+            super().log_request(code, size)
+    
+    def log_message(self, format, *args):
+        """Compact access-log line, or detailed output in debug mode."""
+        if self.verbose:
+            return super().log_message(format, *args)
+        sys.stderr.write(
+            f'{self.client_address[0]} - - [{self.log_date_time_string()}] {format % args}\n'
+        )
+
+
+class ThreadingHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server; one slow client no longer blocks the others."""
+    
+    daemon_threads = True
+    request_queue_size = 64
+
+
 def find_html_file(directory: Path) -> Path:
     """
     Find the first HTML file in the directory.
@@ -122,6 +293,9 @@ def serve_directory(
     directory: Path,
     port: int = 8000,
     open_browser: bool = True,
+    production: bool = False,
+    debug: bool = False,
+    log_sample_rate: float = 1.0,
 ) -> None:
     """
     Start an HTTP server to serve files from a directory.
@@ -130,6 +304,9 @@ def serve_directory(
         directory: Directory to serve
         port: Port number (default: 8000)
         open_browser: Whether to automatically open browser (default: True)
+        production: Use the threaded, keep-alive, compressed server (default: False)
+        debug: Production mode only - keep the detailed per-request logging
+        log_sample_rate: Production mode only - fraction of successful requests to log
         
     Raises:
         FileNotFoundError: If directory doesn't exist
@@ -145,15 +322,24 @@ def serve_directory(
     os.chdir(directory)
     
     # Create server
-    Handler = QuietHTTPRequestHandler
+    if production:
+        Handler = ProductionHTTPRequestHandler
+        Handler.verbose = debug
+        Handler.log_sample_rate = log_sample_rate
+        server_class = ThreadingHTTPServer
+    else:
+        Handler = QuietHTTPRequestHandler
+        server_class = socketserver.TCPServer
     
     try:
-        with socketserver.TCPServer(("", port), Handler) as httpd:
+        with server_class(("", port), Handler) as httpd:
             server_url = f"http://localhost:{port}"
             
             print("\n" + "="*60)
             print(f"🚀 HTTP Server started!")
             print(f"📁 Serving directory: {directory.absolute()}")
+            if production:
+                print(f"⚙️  Mode: production (threaded, keep-alive, gzip, log sample {log_sample_rate:g})")
             print(f"🌐 Server URL: {server_url}")
             print("="*60)
             
@@ -210,6 +396,9 @@ Examples:
   
   # Don't auto-open browser
   python serve_html.py . --no-browser
+  
+  # Production mode, log 10% of successful requests
+  python serve_html.py shoedog/shoedog --production --log-sample 0.1
         """,
     )
     
@@ -235,6 +424,25 @@ Examples:
         help="Don't automatically open browser",
     )
     
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Threaded HTTP/1.1 server with keep-alive, sendfile, gzip and conditional GET",
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Production mode: keep the detailed per-request logging",
+    )
+    
+    parser.add_argument(
+        "--log-sample",
+        type=float,
+        default=1.0,
+        help="Production mode: fraction of successful requests to log (default: 1.0)",
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -242,6 +450,9 @@ Examples:
             directory=args.directory,
             port=args.port,
             open_browser=not args.no_browser,
+            production=args.production,
+            debug=args.debug,
+            log_sample_rate=args.log_sample,
         )
         return 0
     
@@ -9,19 +9,57 @@
 4. 合并模式（增量生成+合并mp3）: python text_to_speech.py -d ./video --merge
 5. 指定合并输出文件: python text_to_speech.py -d ./video --merge -o final.mp3
 6. 指定语音: python text_to_speech.py "Hello" -v en-US-AriaNeural
+7. 并发批量生成: python text_to_speech.py -d ./video -j 4
+8. 使用句子级缓存: python text_to_speech.py -d ./video --cache
+
+并发模式说明:
+- 同时合成最多 N 个文件（-j/--concurrency，默认 1 即逐个生成）
+- 临时性失败自动重试（指数退避，--retries 控制次数）
+- 先写入临时文件再重命名，中断后不会留下不完整的 mp3
+
+句子级缓存说明（--cache，见 tts_cache.py）:
+- 按句子合成并缓存到共享目录，修改稿件后只重新合成改动的句子
+- 片头片尾等固定文案在不同书籍之间复用
 
 合并模式说明:
 - 第一步: 检查每个md是否有对应的mp3，没有的才生成（增量）
 - 第二步: 合并所有mp3为一个最终文件（按时间命名）
-- 需要安装: pip install pydub
+- 优先按 MP3 帧直接拼接（无需解码，快速无损）
+- 编码参数不一致时回退到 pydub 解码合并（需要安装: pip install pydub）
 """
 
 import asyncio
 import argparse
+import aiohttp
 import edge_tts
 import os
+import random
+import time
 from datetime import datetime
 
+from mp3_concat import IncompatibleMP3Error, MP3FormatError, concat_mp3_files
+
+
+# 并发模式下的默认重试次数和退避基数（秒）
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF = 2.0
+
+
+def is_transient_tts_error(error: Exception) -> bool:
+    """
+    是否为值得重试的临时错误：网络 / 超时 / 限流（429、5xx）
+
+    语音名错误、空文本、服务端拒绝（4xx）等重试也不会成功，直接失败
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (
+        asyncio.TimeoutError,
+        ConnectionError,
+        aiohttp.ClientError,
+        edge_tts.exceptions.WebSocketError,
+    ))
+
 
 def read_text_until_separator(file_path: str) -> str:
     """
@@ -69,7 +107,92 @@ async def text_to_speech(text: str, output_file: str, voice: str = "zh-CN-Yunjia
     print(f"✓ 生成成功! 文件大小: {file_size / 1024:.2f} KB")
 
 
-async def process_directory(directory: str, voice: str, output_dir: str = None, merge: bool = False, merge_output: str = None):
+async def synthesize_with_retry(text: str, output_file: str, voice: str,
+                                retries: int = DEFAULT_RETRIES, label: str = ""):
+    """
+    合成单个文件，遇到网络 / 超时 / 限流错误时按指数退避重试，其他错误直接抛出
+    
+    先写入临时文件，成功后再重命名为最终文件，避免中断后留下不完整的 mp3
+    （否则下次运行会被当作"已存在"跳过）。
+    
+    参数:
+        text: 要转换的文本
+        output_file: 输出的 MP3 文件路径
+        voice: 语音名称
+        retries: 最大重试次数
+        label: 日志前缀（如 "[3/30] xxx.md"）
+    """
+    tmp_file = f"{output_file}.part"
+    
+    for attempt in range(retries + 1):
+        try:
+            communicate = edge_tts.Communicate(text, voice)
+            await communicate.save(tmp_file)
+            os.replace(tmp_file, output_file)
+            return
+        except Exception as e:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            if attempt == retries or not is_transient_tts_error(e):
+                raise
+            delay = RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, 1)
+            print(f"{label} ⚠ 第 {attempt + 1} 次失败: {e}，{delay:.1f} 秒后重试")
+            await asyncio.sleep(delay)
+
+
+async def synthesize_files(jobs: list, voice: str, concurrency: int = 1,
+                           retries: int = DEFAULT_RETRIES, cache=None):
+    """
+    以有限并发批量合成多个文件
+    
+    参数:
+        jobs: (标签, 输入 md 路径, 输出 mp3 路径) 列表
+        voice: 语音名称
+        concurrency: 同时进行的合成任务数
+        retries: 每个文件的最大重试次数
+        cache: 句子级缓存（tts_cache.TTSCache），为 None 时整文件合成
+    
+    返回:
+        (成功数, 失败数)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    succeeded = 0
+    failed = 0
+    
+    async def run(label: str, input_path: str, output_file: str):
+        nonlocal succeeded, failed
+        async with semaphore:
+            try:
+                # 读取文本（只到分隔线）
+                text = read_text_until_separator(input_path)
+                if not text:
+                    print(f"{label} ⚠ 跳过: 文件内容为空")
+                    return
+                
+                print(f"{label} 开始生成 ({len(text)} 字符)")
+                start = time.monotonic()
+                cache_info = ""
+                if cache is not None:
+                    result = await cache.synthesize_to_file(text, output_file, voice, retries=retries)
+                    cache_info = f", 合成 {result['synthesized']}/{result['sentences']} 句"
+                else:
+                    await synthesize_with_retry(text, output_file, voice, retries, label)
+                
+                file_size = os.path.getsize(output_file)
+                print(f"{label} ✓ 完成: {os.path.basename(output_file)} "
+                      f"({file_size / 1024:.2f} KB, {time.monotonic() - start:.1f} 秒{cache_info})")
+                succeeded += 1
+            except Exception as e:
+                print(f"{label} ✗ 错误: {e}")
+                failed += 1
+    
+    await asyncio.gather(*(run(*job) for job in jobs))
+    return succeeded, failed
+
+
+async def process_directory(directory: str, voice: str, output_dir: str = None, merge: bool = False,
+                            merge_output: str = None, concurrency: int = 1,
+                            retries: int = DEFAULT_RETRIES, use_cache: bool = False):
     """
     批量处理目录中的所有 md 文件
     
@@ -79,6 +202,9 @@ async def process_directory(directory: str, voice: str, output_dir: str = None,
         output_dir: 输出目录（默认与输入目录相同）
         merge: 是否合并所有文件为一个 mp3
         merge_output: 合并模式下的输出文件名
+        concurrency: 同时合成的文件数（默认 1）
+        retries: 每个文件失败后的最大重试次数
+        use_cache: 是否使用句子级 TTS 缓存
     """
     if not os.path.exists(directory):
         print(f"错误: 目录 '{directory}' 不存在")
@@ -108,6 +234,7 @@ async def process_directory(directory: str, voice: str, output_dir: str = None,
     
     # 第一步：为每个 md 生成对应的 mp3（如果不存在）
     mp3_files = []
+    jobs = []
     
     for idx, filename in enumerate(md_files, 1):
         input_path = os.path.join(directory, filename)
@@ -120,27 +247,21 @@ async def process_directory(directory: str, voice: str, output_dir: str = None,
         
         # 检查 mp3 是否已存在
         if os.path.exists(output_file):
-            print(f"\n[{idx}/{len(md_files)}] ✓ 已存在: {filename} -> {os.path.basename(output_file)}")
+            print(f"[{idx}/{len(md_files)}] ✓ 已存在: {filename} -> {os.path.basename(output_file)}")
             continue
         
-        print(f"\n[{idx}/{len(md_files)}] 生成: {filename}")
-        
-        try:
-            # 读取文本（只到分隔线）
-            text = read_text_until_separator(input_path)
-            
-            if not text:
-                print(f"  ⚠ 跳过: 文件内容为空")
-                continue
-            
-            print(f"  提取字符数: {len(text)}")
-            
-            # 生成语音
-            await text_to_speech(text, output_file, voice)
-            
-        except Exception as e:
-            print(f"  ✗ 错误: {e}")
-            continue
+        jobs.append((f"[{idx}/{len(md_files)}] {filename}", input_path, output_file))
+    
+    if jobs:
+        print(f"\n需要生成 {len(jobs)} 个文件（并发数: {max(1, concurrency)}）\n")
+        cache = None
+        if use_cache:
+            # 延迟导入：tts_cache 依赖本模块
+            from tts_cache import TTSCache
+            cache = TTSCache()
+            print(f"使用句子级缓存: {cache.cache_dir}")
+        succeeded, failed = await synthesize_files(jobs, voice, concurrency, retries, cache)
+        print(f"\n生成完成: 成功 {succeeded} 个，失败 {failed} 个")
     
     print("\n" + "=" * 60)
     print(f"✓ 音频文件准备完成！")
@@ -168,6 +289,21 @@ async def process_directory(directory: str, voice: str, output_dir: str = None,
         if final_output_dir and not os.path.exists(final_output_dir):
             os.makedirs(final_output_dir)
         
+        try:
+            print("正在合并音频文件（按帧拼接）...")
+            result = concat_mp3_files(existing_mp3s, final_output)
+            
+            file_size = os.path.getsize(final_output)
+            print(f"✓ 合并成功！")
+            print(f"  输出文件: {final_output}")
+            print(f"  音频格式: {result['format']}")
+            print(f"  音频时长: {result['duration'] / 60:.1f} 分钟")
+            print(f"  文件大小: {file_size / 1024 / 1024:.2f} MB")
+            return
+        except (IncompatibleMP3Error, MP3FormatError) as e:
+            print(f"⚠ 无法按帧拼接: {e}")
+            print("回退到解码合并...")
+        
         try:
             # 尝试导入 pydub
             from pydub import AudioSegment
@@ -242,6 +378,8 @@ def main():
   批量处理模式（每个md生成一个mp3）:
     %(prog)s -d ./video
     %(prog)s -d ./video --output-dir ./mp3_output
+    %(prog)s -d ./video -j 4            # 同时合成 4 个文件
+    %(prog)s -d ./video --cache         # 句子级缓存，只合成改动过的句子
   
   合并模式（增量生成各个mp3 + 合并）:
     %(prog)s -d ./video --merge
@@ -261,6 +399,13 @@ def main():
     parser.add_argument('-v', '--voice', default='zh-CN-YunjianNeural', 
                         help='语音名称（默认: zh-CN-YunjianNeural 中文男声）')
     parser.add_argument('--list-voices', action='store_true', help='列出所有可用的语音')
+    parser.add_argument('-j', '--concurrency', type=int, default=1,
+                        help='批量处理模式下同时合成的文件数（默认: 1）')
+    parser.add_argument('--retries', type=int, default=None,
+                        help=f'批量处理模式下网络 / 超时 / 限流错误的重试次数'
+                             f'（默认: 并发模式 {DEFAULT_RETRIES}，-j 1 时不重试）')
+    parser.add_argument('--cache', action='store_true',
+                        help='批量处理模式下使用句子级 TTS 缓存（TTS_CACHE_DIR，默认 resources/.tts_cache）')
     
     args = parser.parse_args()
     
@@ -271,8 +416,12 @@ def main():
     
     # 批量处理模式
     if args.directory:
+        # 与之前的顺序模式保持一致：-j 1 默认失败即停，不重试
+        if args.retries is None:
+            args.retries = DEFAULT_RETRIES if args.concurrency > 1 else 0
         merge_output = args.output if args.merge else None
-        asyncio.run(process_directory(args.directory, args.voice, args.output_dir, args.merge, merge_output))
+        asyncio.run(process_directory(args.directory, args.voice, args.output_dir, args.merge, merge_output,
+                                      args.concurrency, args.retries, args.cache))
         return
     
     # 单文件/文本模式
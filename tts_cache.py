@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+句子级 TTS 缓存（内容寻址）
+
+每个句子的合成结果按 (规范化后的句子, 语音) 的哈希保存在共享缓存目录中，
+整段音频由句子音频按帧拼接而成：
+- 修改稿件中的一句话，只需要重新合成这一句
+- 片头片尾等固定文案在所有书籍之间复用，只合成一次
+- 同一句子的并发请求共享同一次合成
+
+缓存目录默认为 resources/.tts_cache，可用环境变量 TTS_CACHE_DIR 指定；
+总大小超过 TTS_CACHE_MAX_MB（默认 2048 MB）时按最近使用时间淘汰。
+
+使用方法:
+    python tts_cache.py static/00_AI拆书开头.md -o intro.mp3
+    python tts_cache.py --prune
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from audiobook import markdown_to_text, split_sentences
+from mp3_concat import audio_duration, concat_mp3_files
+from text_to_speech import DEFAULT_RETRIES, synthesize_with_retry
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "resources" / ".tts_cache"
+
+DEFAULT_MAX_MB = 2048
+
+# 默认同时合成的句子数
+DEFAULT_CONCURRENCY = 6
+
+# 小于等于该大小的缓存文件视为无效
+MIN_SENTENCE_SIZE = 256
+
+# 只有标点、没有可朗读文字的句子（edge-tts 不会返回音频）
+_SPEAKABLE_RE = re.compile(r'\w')
+
+# 进程内累计统计（供后端 /metrics 导出）：句子缓存命中 / 未命中次数，
+# 合成出的音频时长与合成耗时（秒）
+TTS_STATS = {"hits": 0, "misses": 0, "audio_seconds": 0.0, "synthesis_seconds": 0.0}
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    规范化句子：统一 Unicode 形式、合并空白
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', sentence)).strip()
+
+
+def speakable_sentences(text: str) -> List[str]:
+    """
+    把文本切分为规范化后的句子，去掉没有可朗读文字的部分
+    """
+    sentences = (normalize_sentence(s) for s in split_sentences(text))
+    return [s for s in sentences if _SPEAKABLE_RE.search(s)]
+
+
+class TTSCache:
+    """句子级内容寻址 TTS 缓存"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("TTS_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("TTS_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        # 正在合成的句子：key -> Task
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def key(self, sentence: str, voice: str) -> str:
+        return hashlib.sha256(f"{voice}\n{normalize_sentence(sentence)}".encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def get(self, sentence: str, voice: str) -> Optional[Path]:
+        """
+        查找已缓存的句子音频；命中时更新修改时间（用于按最近使用淘汰）
+        """
+        path = self.path(self.key(sentence, voice))
+        try:
+            if path.stat().st_size > MIN_SENTENCE_SIZE:
+                os.utime(path)
+                return path
+        except OSError:
+            pass
+        return None
+
+    async def fetch(self, sentence: str, voice: str, retries: int = DEFAULT_RETRIES) -> Path:
+        """
+        获取句子音频，未命中时合成；同一句子的并发请求共享一次合成
+        """
+        cached = self.get(sentence, voice)
+        if cached:
+            TTS_STATS["hits"] += 1
+            return cached
+        TTS_STATS["misses"] += 1
+
+        key = self.key(sentence, voice)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize(normalize_sentence(sentence), voice, key, retries))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 调用方取消时不中断合成，结果仍会写入缓存
+        return await asyncio.shield(task)
+
+    async def _synthesize(self, sentence: str, voice: str, key: str, retries: int) -> Path:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        start = time.monotonic()
+        await synthesize_with_retry(sentence, str(path), voice, retries, label=f"[句子 {key[:8]}]")
+        TTS_STATS["synthesis_seconds"] += time.monotonic() - start
+        try:
+            TTS_STATS["audio_seconds"] += audio_duration(str(path))
+        except OSError:
+            pass
+        return path
+
+    async def iter_sentence_audio(
+        self,
+        sentences: List[str],
+        voice: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+    ) -> AsyncIterator[Path]:
+        """
+        按顺序返回每个句子的音频文件，未命中的句子在后台并发预先合成
+
+        第一句就绪即可返回，适合边合成边播放。
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(sentence: str) -> Path:
+            async with semaphore:
+                return await self.fetch(sentence, voice, retries)
+
+        tasks = [asyncio.ensure_future(fetch(s)) for s in sentences]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize_to_file(
+        self,
+        text: str,
+        output_file: str,
+        voice: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+    ) -> dict:
+        """
+        用缓存的句子音频拼接出整段文本的 MP3，只合成缺失的句子
+
+        返回:
+            {"sentences": 句子数, "synthesized": 本次合成数, "duration": 时长（秒）}
+        """
+        sentences = speakable_sentences(text)
+        if not sentences:
+            raise ValueError("没有可朗读的文本")
+
+        missing = {self.key(s, voice) for s in sentences if self.get(s, voice) is None}
+        paths = [str(p) async for p in self.iter_sentence_audio(sentences, voice, concurrency, retries)]
+        result = concat_mp3_files(paths, output_file)
+
+        if missing:
+            self.prune()
+        return {
+            "sentences": len(sentences),
+            "synthesized": len(missing),
+            "duration": result["duration"],
+        }
+
+    def prune(self) -> int:
+        """
+        缓存超过大小上限时，按最近使用时间删除最旧的文件
+
+        返回删除的文件数
+        """
+        if self.max_bytes <= 0 or not self.cache_dir.exists():
+            return 0
+
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用句子级缓存合成文本（只合成缓存中没有的句子）')
+    parser.add_argument('input', nargs='?', help='Markdown 或文本文件')
+    parser.add_argument('-o', '--output', help='输出 MP3 文件（默认: 与输入同名的 .mp3）')
+    parser.add_argument('-v', '--voice', default='zh-CN-YunjianNeural',
+                        help='语音名称（默认: zh-CN-YunjianNeural）')
+    parser.add_argument('-j', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'同时合成的句子数（默认: {DEFAULT_CONCURRENCY}）')
+    parser.add_argument('--cache-dir', help='缓存目录（默认: TTS_CACHE_DIR 或 resources/.tts_cache）')
+    parser.add_argument('--prune', action='store_true', help='按大小上限清理缓存后退出')
+    args = parser.parse_args()
+
+    cache = TTSCache(args.cache_dir)
+
+    if args.prune:
+        removed = cache.prune()
+        print(f"✓ 已清理 {removed} 个缓存文件: {cache.cache_dir}")
+        return
+
+    if not args.input:
+        parser.error('需要指定输入文件')
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        text = markdown_to_text(f.read())
+    output = args.output or os.path.splitext(args.input)[0] + '.mp3'
+
+    try:
+        result = asyncio.run(cache.synthesize_to_file(text, output, args.voice, args.concurrency))
+    except Exception as e:
+        print(f"✗ 生成失败: {e}")
+        raise SystemExit(1)
+
+    print(f"✓ 生成完成: {output}")
+    print(f"  句子数: {result['sentences']}（本次合成 {result['synthesized']} 句，其余来自缓存）")
+    print(f"  时长: {result['duration']:.1f} 秒")
+
+
+if __name__ == "__main__":
+    main()